@@ -0,0 +1,125 @@
+import datetime
+import random
+from typing import Optional, Sequence, Tuple
+
+from availability import AvailabilityIndex
+
+
+# How many free candidates to take from the index (or the fallback
+# query) per pool. Concurrent bookings try them in random order, so they
+# rarely wait on one row.
+MAX_CANDIDATES = 16
+
+# Overlap checks run on the typed start_on/end_on columns. Rows the
+# backfill has not reached yet fall back to the ISO varchar columns.
+_OVERLAP = (
+    "SELECT 1 FROM Booking WHERE {col} = %s"
+    " AND ((start_on <= %s AND end_on >= %s)"
+    "      OR (start_on IS NULL AND startDate <= %s AND endDate >= %s)) LIMIT 1"
+)
+CAR_OVERLAP_SQL = _OVERLAP.format(col="carid")
+DRIVER_OVERLAP_SQL = _OVERLAP.format(col="driverId")
+
+CAR_LOCK_SQL = "SELECT Car_id FROM Car WHERE Car_id = %s AND status = 'Available' FOR UPDATE"
+DRIVER_LOCK_SQL = "SELECT driverId FROM Driver WHERE driverId = %s AND status = 'Available' FOR UPDATE"
+
+# Fallback when every index candidate turned out to be taken (the index
+# is stale): ask the database itself for free rows.
+_NOT_BOOKED = (
+    " AND NOT EXISTS ("
+    "SELECT 1 FROM Booking b WHERE b.{col} = {key}"
+    " AND ((b.start_on <= %s AND b.end_on >= %s)"
+    "      OR (b.start_on IS NULL AND b.startDate <= %s AND b.endDate >= %s))) LIMIT %s"
+)
+FREE_CARS_SQL = ("SELECT Car_id FROM Car WHERE status = 'Available' AND Car_type = %s"
+                 + _NOT_BOOKED.format(col="carid", key="Car.Car_id"))
+FREE_DRIVERS_SQL = ("SELECT driverId FROM Driver WHERE status = 'Available'"
+                    + _NOT_BOOKED.format(col="driverId", key="Driver.driverId"))
+
+
+def reserve_car_and_driver(
+    conn,
+    index: AvailabilityIndex,
+    car_type: str,
+    start: datetime.date,
+    end: datetime.date,
+) -> Optional[Tuple[str, int]]:
+    """Reserve a car of *car_type* and a driver for ``[start, end]``.
+
+    Candidates come from the in-memory *index*; if all of them turn out
+    to be taken (the index is stale), free rows are looked up in the
+    database instead. Each candidate is locked with ``SELECT ... FOR
+    UPDATE`` on its own Car/Driver row and checked against the Booking
+    table, so two transactions can never hand out the same vehicle for
+    overlapping dates even when their indexes are stale (e.g. in
+    different worker processes). Only candidate rows are locked, never
+    whole tables.
+
+    The transaction is left open so the caller can insert the Booking
+    row and commit while still holding the locks. Returns
+    ``(car_id, driver_id)``, or ``None`` (after rolling back) when no
+    car or no driver is free for those dates.
+    """
+    # Close whatever read-only transaction the request already has open,
+    # then run this one at READ COMMITTED: after waiting on a row lock we
+    # must see the booking the previous holder just committed.
+    conn.commit()
+    cur = conn.cursor()
+    cur.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+
+    # Always lock car before driver: a consistent lock order means two
+    # bookings can wait on each other's rows but never deadlock.
+    car_id = _reserve(
+        cur,
+        index.free_cars(car_type, start, end, limit=MAX_CANDIDATES),
+        CAR_LOCK_SQL, CAR_OVERLAP_SQL, start, end,
+    )
+    if car_id is None:
+        car_id = _reserve_from_db(cur, FREE_CARS_SQL, (car_type,), CAR_LOCK_SQL, CAR_OVERLAP_SQL,
+                                  start, end)
+    if car_id is None:
+        conn.rollback()
+        return None
+
+    driver_id = _reserve(
+        cur,
+        index.free_drivers(start, end, limit=MAX_CANDIDATES),
+        DRIVER_LOCK_SQL, DRIVER_OVERLAP_SQL, start, end,
+    )
+    if driver_id is None:
+        driver_id = _reserve_from_db(cur, FREE_DRIVERS_SQL, (), DRIVER_LOCK_SQL, DRIVER_OVERLAP_SQL,
+                                     start, end)
+    if driver_id is None:
+        conn.rollback()
+        return None
+
+    return car_id, driver_id
+
+
+def _reserve(cur, candidates: Sequence, lock_sql: str, overlap_sql: str,
+             start: datetime.date, end: datetime.date):
+    candidates = list(candidates)
+    random.shuffle(candidates)
+    for candidate in candidates:
+        cur.execute(lock_sql, (candidate,))
+        if cur.fetchone() is None:
+            continue            # deleted or taken out of service meanwhile
+        cur.execute(overlap_sql, (candidate, end, start, str(end), str(start)))
+        if cur.fetchone() is None:
+            return candidate
+    return None
+
+
+def _reserve_from_db(cur, free_sql: str, params: tuple, lock_sql: str, overlap_sql: str,
+                     start: datetime.date, end: datetime.date):
+    # A candidate only fails here if another booking for these dates
+    # committed (or it left service) after the lookup, so each round the
+    # lookup returns fewer rows and the loop ends.
+    while True:
+        cur.execute(free_sql, params + (end, start, str(end), str(start), MAX_CANDIDATES))
+        candidates = [row[0] for row in cur.fetchall()]
+        if not candidates:
+            return None
+        found = _reserve(cur, candidates, lock_sql, overlap_sql, start, end)
+        if found is not None:
+            return found
@@ -0,0 +1,189 @@
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from db_pool import ConnectionPool, PoolTimeout
+
+log = logging.getLogger("car_rental.audit")
+
+
+class AuditBuffer:
+    """Write-behind buffer for append-only audit rows.
+
+    append() only enqueues; a background thread writes the rows with one
+    ``executemany`` + commit per batch, as soon as *batch_size* rows are
+    waiting or *flush_interval* seconds after the oldest one arrived.
+
+    Nothing is dropped. A batch that fails with a transient error
+    (*is_transient*: lost connection, lock timeout; pool timeouts too) is
+    retried with backoff. Any other error means some row is bad, so the
+    batch is written row by row and the rows the database still rejects
+    go to *dead_letter_path* (JSON lines) with a log line, instead of
+    wedging the writer. Once *max_buffer* rows are queued append() blocks
+    the caller until the writer catches up. stop() flushes whatever is
+    left; rows it cannot write because the database is down also go to
+    the dead-letter file.
+    """
+
+    def __init__(
+        self,
+        pool,
+        sql: str,
+        *,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_buffer: int = 10000,
+        max_backoff: float = 30.0,
+        dead_letter_path: Optional[str] = None,
+        is_transient: Callable[[BaseException], bool] = ConnectionPool.is_disconnect,
+    ):
+        self.pool = pool
+        self.sql = sql
+        self.dead_letter_path = dead_letter_path
+        self.is_transient = is_transient
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_buffer)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.written = self.batches = self.failures = self.blocked = self.dead = 0
+        self.last_flush_ms = 0.0
+
+    def append(self, row: Sequence) -> None:
+        try:
+            self._queue.put_nowait(tuple(row))
+        except queue.Full:
+            self.blocked += 1
+            self._queue.put(tuple(row))           # backpressure, never drop
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Flush everything queued so far and stop the writer."""
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._queue.put(None)                     # wake the writer
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "blocked_appends": self.blocked,
+            "dead_lettered": self.dead,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+        }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+            # the stop sentinel may have been swallowed mid-batch
+            if self._stopping and self._queue.empty():
+                return
+
+    def _collect(self) -> List[tuple]:
+        """Block for the first row, then gather more until full or due."""
+        first = self._queue.get()
+        if first is None:
+            return self._drain_nowait()
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                row = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if row is None:
+                batch.extend(self._drain_nowait())
+                break
+            batch.append(row)
+        return batch
+
+    def _drain_nowait(self) -> List[tuple]:
+        rows = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if row is not None:
+                rows.append(row)
+
+    def _write(self, batch: List[tuple]) -> None:
+        error = self._insert(batch)
+        if error is None:
+            return
+        if self._retryable(error):
+            self._dead_letter(batch, error)     # still down at shutdown
+            return
+        # the database rejected something in the batch: keep every row it accepts
+        for row in batch:
+            error = self._insert([row])
+            if error is not None:
+                self._dead_letter([row], error)
+
+    def _insert(self, rows: List[tuple]) -> Optional[Exception]:
+        """Commit *rows*, retrying transient errors; the error if that failed."""
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                with self.pool.connection() as conn:
+                    cur = conn.cursor()
+                    cur.executemany(self.sql, rows)
+                    conn.commit()
+                    cur.close()
+            except Exception as exc:
+                self.failures += 1
+                attempt += 1
+                if not self._retryable(exc):
+                    return exc
+                if self._stopping and attempt >= 3:
+                    return exc      # database still down at shutdown; don't hang exit
+                time.sleep(min(self.max_backoff, 0.5 * 2 ** (attempt - 1)))
+                continue
+            self.last_flush_ms = 1000 * (time.perf_counter() - t0)
+            self.written += len(rows)
+            self.batches += 1
+            return None
+
+    def _retryable(self, exc: BaseException) -> bool:
+        return isinstance(exc, PoolTimeout) or self.is_transient(exc)
+
+    def _dead_letter(self, rows: List[tuple], error: BaseException) -> None:
+        self.dead += len(rows)
+        log.error("audit: %d row(s) not written (%r), kept in %s",
+                  len(rows), error, self.dead_letter_path or "this log")
+        at = datetime.datetime.now().isoformat(timespec="seconds")
+        lines = [json.dumps({"at": at, "error": repr(error), "sql": self.sql, "row": list(row)},
+                            default=str) for row in rows]
+        if self.dead_letter_path:
+            try:
+                with open(self.dead_letter_path, "a") as fh:
+                    fh.write("\n".join(lines) + "\n")
+                return
+            except OSError:
+                log.exception("audit: cannot append to %s", self.dead_letter_path)
+        for line in lines:          # last resort: the rows themselves go to the log
+            log.error("audit dead letter: %s", line)
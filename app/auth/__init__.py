@@ -1,5 +1,5 @@
 # app/auth/__init__.py
-import os, MySQLdb
+import os
 from datetime import timedelta, datetime
 from functools import wraps
 
@@ -13,6 +13,8 @@ from flask_login import (
 )
 from passlib.hash import pbkdf2_sha256
 
+from db_backend import backend_from_env
+
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 # ───────────────────  Flask‑Login bootstrap  ────────────────────
@@ -34,20 +36,14 @@ def init_auth(app):
 # ───────────────────  DB helpers  ───────────────────────────────
 def get_db():
     if not hasattr(app, "db_conn"):
-        app.db_conn = MySQLdb.connect(
-            host=os.environ["DB_HOST"],
-            user=os.environ["DB_USER"],
-            passwd=os.environ["DB_PASS"],
-            db=os.environ["DB_NAME"],
-            charset="utf8mb4",
-            autocommit=True
-        )
+        app.db_backend = backend_from_env()      # DB_BACKEND=mysql|sqlite
+        app.db_conn = app.db_backend.connect()
     return app.db_conn
 
 def fetch_user(username):
     """Unifies Cust_User and Admin_User lookup."""
     conn = get_db()
-    cur  = conn.cursor(MySQLdb.cursors.DictCursor)
+    cur  = conn.cursor(app.db_backend.dict_cursor)
     for table, role in (("Cust_User", "customer"), ("Admin_User", "admin")):
         cur.execute(f"SELECT * FROM {table} WHERE username=%s", (username,))
         row = cur.fetchone()
@@ -70,7 +66,7 @@ class User(UserMixin):
 @login_manager.user_loader
 def load_user(user_id):
     conn = get_db()
-    cur  = conn.cursor(MySQLdb.cursors.DictCursor)
+    cur  = conn.cursor(app.db_backend.dict_cursor)
     for table, role in (("Cust_User", "customer"), ("Admin_User", "admin")):
         cur.execute(f"SELECT *, %s AS role FROM {table} WHERE userId=%s", (role, user_id))
         row = cur.fetchone()
@@ -108,6 +104,7 @@ def login():
                 "INSERT INTO Login_History(userId, login_time, ip_addr) VALUES(%s,%s,%s)",
                 (record["userId"], datetime.utcnow(), request.remote_addr)
             )
+            get_db().commit()
 
             flash("Welcome back!", "success")
             return redirect(url_for("main.dashboard"))
@@ -133,6 +130,7 @@ def signup():
             "INSERT INTO Cust_User(username, password_hash) VALUES(%s,%s)",
             (username, password)
         )
+        get_db().commit()
         flash("Account created 🎉 – please log in.", "success")
         return redirect(url_for("auth.login"))
     return render_template("signup.html")
@@ -0,0 +1,294 @@
+import datetime
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from itertools import filterfalse, islice
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+
+def to_date(value) -> Optional[datetime.date]:
+    """Best-effort parse of a Booking date column (ISO or dd-mm-YYYY)."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class _Track:
+    """Sorted bookings of a single vehicle.
+
+    ``max_end[i]`` is the latest end among the first i+1 bookings, so
+    "is this vehicle busy during [s, e]" is one bisect: of the bookings
+    starting on or before *e*, does any end on or after *s*?
+    """
+
+    __slots__ = ("starts", "max_end", "entries")
+
+    def __init__(self):
+        self.starts: List[int] = []
+        self.max_end: List[int] = []
+        self.entries: List[Tuple[int, int, int]] = []   # (start, booking, end)
+
+    def add(self, entry: Tuple[int, int, int]) -> None:
+        idx = bisect_right(self.entries, entry)
+        self.entries.insert(idx, entry)
+        self.starts.insert(idx, entry[0])
+        self.max_end.insert(idx, 0)
+        self._reindex(idx)
+
+    def remove(self, entry: Tuple[int, int, int]) -> None:
+        idx = bisect_left(self.entries, entry)
+        del self.entries[idx], self.starts[idx], self.max_end[idx]
+        self._reindex(idx)
+
+    def busy(self, start: int, end: int) -> bool:
+        i = bisect_right(self.starts, end)
+        return i > 0 and self.max_end[i - 1] >= start
+
+    def _reindex(self, idx: int) -> None:
+        running = self.max_end[idx - 1] if idx else -1
+        for j in range(idx, len(self.entries)):
+            running = max(running, self.entries[j][2])
+            self.max_end[j] = running
+
+
+class _Calendar:
+    """Bookings for one pool of vehicles (a car type, or all drivers).
+
+    Two views of the same intervals (start/end as date ordinals):
+
+    * a per-vehicle _Track, used when only the first few free vehicles
+      are wanted -- each probe is a single bisect;
+    * one list of every booking sorted by start day which, with the
+      longest booking seen (``max_span``), bounds "who is busy" to the
+      bookings starting in ``[start - max_span, end]`` -- O(log n + k),
+      used to list every free vehicle via one C-level set filter.
+    """
+
+    __slots__ = ("members", "_member_set", "_tracks", "_starts", "_entries",
+                 "_by_booking", "max_span")
+
+    def __init__(self):
+        self.members: List[Hashable] = []
+        self._member_set: Set[Hashable] = set()
+        self._tracks: Dict[Hashable, _Track] = {}
+        self._starts: List[int] = []
+        self._entries: List[Tuple[int, int, int, Hashable]] = []  # (start, booking, end, owner)
+        self._by_booking: Dict[int, Tuple[int, int, int, Hashable]] = {}
+        self.max_span = 0
+
+    def add_member(self, owner: Hashable) -> None:
+        if owner not in self._member_set:
+            self._member_set.add(owner)
+            self.members.append(owner)
+
+    def remove_member(self, owner: Hashable) -> None:
+        if owner in self._member_set:
+            self._member_set.discard(owner)
+            self.members.remove(owner)
+
+    def add(self, booking_id: int, owner: Hashable, start: int, end: int) -> None:
+        self.discard(booking_id)
+        entry = (start, booking_id, end, owner)
+        idx = bisect_right(self._entries, entry)
+        self._entries.insert(idx, entry)
+        self._starts.insert(idx, start)
+        self._by_booking[booking_id] = entry
+        self._tracks.setdefault(owner, _Track()).add((start, booking_id, end))
+        self.max_span = max(self.max_span, end - start)
+
+    def discard(self, booking_id: int) -> None:
+        entry = self._by_booking.pop(booking_id, None)
+        if entry is None:
+            return
+        idx = bisect_left(self._entries, entry)
+        del self._entries[idx]
+        del self._starts[idx]
+        start, _, end, owner = entry
+        track = self._tracks[owner]
+        track.remove((start, booking_id, end))
+        if not track.entries:
+            del self._tracks[owner]
+
+    def busy(self, start: int, end: int) -> Set[Hashable]:
+        lo = bisect_left(self._starts, start - self.max_span)
+        hi = bisect_right(self._starts, end)
+        return {e[3] for e in islice(self._entries, lo, hi) if e[2] >= start}
+
+    def free(self, start: int, end: int, limit: Optional[int]) -> List[Hashable]:
+        if limit is None:
+            busy = self.busy(start, end)
+            return list(filterfalse(busy.__contains__, self.members))
+
+        found: List[Hashable] = []
+        tracks = self._tracks
+        for owner in self.members:
+            track = tracks.get(owner)
+            if track is None or not track.busy(start, end):
+                found.append(owner)
+                if len(found) >= limit:
+                    break
+        return found
+
+
+class AvailabilityIndex:
+    """In-memory answer to "which cars of type X / which drivers are free
+    between *start* and *end*?".
+
+    Built from the Car, Driver and Booking tables by load(); the booking
+    flow keeps it current through the add_*/remove_* hooks, and it is
+    rebuilt every *refresh_interval* seconds to pick up rows written by
+    other worker processes. The database stays the source of truth:
+    allocation re-checks every candidate under a row lock and falls back
+    to a database lookup when they are all taken, so a stale index costs
+    an extra query, never a double booking or a missed free vehicle.
+
+    Only vehicles whose ``status`` is ``'Available'`` are offered; admins
+    use that flag to take a car or driver out of service.
+    """
+
+    def __init__(self, refresh_interval: float = 300.0):
+        self.refresh_interval = refresh_interval
+        self.loaded_at = 0.0
+        self._lock = threading.RLock()
+        self._cars: Dict[str, _Calendar] = {}
+        self._car_type: Dict[str, str] = {}
+        self._drivers = _Calendar()
+        self._booking_owner: Dict[int, Tuple[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, conn) -> None:
+        """Rebuild the index from the database (future bookings only)."""
+        cur = conn.cursor()
+        cur.execute("SELECT Car_id, Car_type, status FROM Car")
+        cars = cur.fetchall()
+        cur.execute("SELECT driverId, status FROM Driver")
+        drivers = cur.fetchall()
+        # typed columns first; the varchar ones only for rows not backfilled yet
+        cur.execute(
+            "SELECT bookingId, carid, driverId, start_on, end_on, startDate, endDate FROM Booking"
+            " WHERE end_on >= %s OR end_on IS NULL",
+            (datetime.date.today(),),
+        )
+        bookings = cur.fetchall()
+
+        fresh = AvailabilityIndex(self.refresh_interval)
+        for car_id, car_type, status in cars:
+            fresh.add_car(car_id, car_type, in_service=_in_service(status))
+        for driver_id, status in drivers:
+            fresh.add_driver(driver_id, in_service=_in_service(status))
+
+        today = datetime.date.today()
+        for booking_id, car_id, driver_id, start_on, end_on, start, end in bookings:
+            start, end = start_on or to_date(start), end_on or to_date(end)
+            if start is None or end is None or end < today:
+                continue
+            fresh.add_booking(booking_id, car_id, driver_id, start, end)
+
+        with self._lock:
+            self._cars = fresh._cars
+            self._car_type = fresh._car_type
+            self._drivers = fresh._drivers
+            self._booking_owner = fresh._booking_owner
+            self.loaded_at = time.monotonic()
+
+    def needs_refresh(self) -> bool:
+        return time.monotonic() - self.loaded_at > self.refresh_interval
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def free_cars(self, car_type: str, start: datetime.date, end: datetime.date,
+                  limit: Optional[int] = None) -> List[str]:
+        with self._lock:
+            cal = self._cars.get(car_type)
+            if cal is None:
+                return []
+            return cal.free(start.toordinal(), end.toordinal(), limit)
+
+    def free_drivers(self, start: datetime.date, end: datetime.date,
+                     limit: Optional[int] = None) -> List[int]:
+        with self._lock:
+            return self._drivers.free(start.toordinal(), end.toordinal(), limit)
+
+    # ------------------------------------------------------------------
+    # Maintenance hooks
+    # ------------------------------------------------------------------
+    def add_car(self, car_id: str, car_type: str, in_service: bool = True) -> None:
+        with self._lock:
+            self.remove_car(car_id)
+            self._car_type[car_id] = car_type
+            cal = self._cars.setdefault(car_type, _Calendar())
+            if in_service:
+                cal.add_member(car_id)
+
+    def remove_car(self, car_id: str) -> None:
+        with self._lock:
+            car_type = self._car_type.pop(car_id, None)
+            if car_type is not None:
+                self._cars[car_type].remove_member(car_id)
+
+    def set_car_in_service(self, car_id: str, in_service: bool) -> None:
+        with self._lock:
+            car_type = self._car_type.get(car_id)
+            if car_type is None:
+                return
+            if in_service:
+                self._cars[car_type].add_member(car_id)
+            else:
+                self._cars[car_type].remove_member(car_id)
+
+    def add_driver(self, driver_id: int, in_service: bool = True) -> None:
+        with self._lock:
+            if in_service:
+                self._drivers.add_member(driver_id)
+
+    def remove_driver(self, driver_id: int) -> None:
+        """Forget a deleted driver together with the bookings it carried."""
+        with self._lock:
+            self._drivers.remove_member(driver_id)
+            for booking_id in [b for b, (_, d) in self._booking_owner.items() if d == driver_id]:
+                self.remove_booking(booking_id)
+
+    def set_driver_in_service(self, driver_id: int, in_service: bool) -> None:
+        with self._lock:
+            if in_service:
+                self._drivers.add_member(driver_id)
+            else:
+                self._drivers.remove_member(driver_id)
+
+    def add_booking(self, booking_id: int, car_id: str, driver_id: int,
+                    start: datetime.date, end: datetime.date) -> None:
+        with self._lock:
+            self.remove_booking(booking_id)
+            s, e = start.toordinal(), end.toordinal()
+            car_type = self._car_type.get(car_id)
+            if car_type is not None:
+                self._cars[car_type].add(booking_id, car_id, s, e)
+            self._drivers.add(booking_id, driver_id, s, e)
+            self._booking_owner[booking_id] = (car_type, driver_id)
+
+    def remove_booking(self, booking_id: int) -> None:
+        with self._lock:
+            owner = self._booking_owner.pop(booking_id, None)
+            if owner is None:
+                return
+            car_type, _ = owner
+            if car_type is not None:
+                self._cars[car_type].discard(booking_id)
+            self._drivers.discard(booking_id)
+
+
+def _in_service(status) -> bool:
+    return (status or "Available").strip().lower() == "available"
+
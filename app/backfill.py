@@ -0,0 +1,155 @@
+"""Copy the varchar dates, times and prices into their typed columns.
+
+Migration 0005 adds the typed columns and the application writes both
+from then on; this fills in the rows written before that. It walks each
+table in primary-key order, ``--chunk`` rows at a time, and commits after
+every chunk so no lock is held for long. It is safe to stop and re-run:
+only rows whose typed column is still NULL are touched.
+
+    python backfill.py status
+    python backfill.py run [--chunk 1000] [--pause 0.05] [--only Booking.start_on]
+
+Values that cannot be parsed are left NULL and counted as skipped;
+``status`` lists how many rows still need attention per column.
+"""
+import argparse
+import datetime
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional, Tuple
+
+from availability import to_date
+from db_pool import ConnectionPool
+
+
+def to_time(value) -> Optional[datetime.time]:
+    """Parse a Pickup_time / Login_History.Time value (HH:MM or HH:MM:SS)."""
+    if isinstance(value, datetime.time):
+        return value
+    if not value:
+        return None
+    for fmt in ("%H:%M:%S", "%H:%M"):
+        try:
+            return datetime.datetime.strptime(str(value).strip(), fmt).time()
+        except ValueError:
+            continue
+    return None
+
+
+def to_datetime(day, clock) -> Optional[datetime.datetime]:
+    """Login_History keeps the date and the time in separate columns."""
+    day = to_date(day)
+    if day is None:
+        return None
+    return datetime.datetime.combine(day, to_time(clock) or datetime.time())
+
+
+def to_money(value) -> Optional[Decimal]:
+    """A price as DECIMAL(10,2), or None if it is not a number that fits."""
+    try:
+        amount = Decimal(str(value).strip()).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return None
+    return amount if amount.is_finite() and abs(amount) < 10 ** 8 else None
+
+
+@dataclass(frozen=True)
+class Backfill:
+    table: str
+    key: str                    # primary key, walked in order
+    sources: Tuple[str, ...]    # legacy varchar column(s)
+    target: str                 # typed column
+    convert: Callable
+
+    @property
+    def label(self) -> str:
+        return f"{self.table}.{self.target}"
+
+
+BACKFILLS = [
+    Backfill("Booking", "bookingId", ("startDate",), "start_on", to_date),
+    Backfill("Booking", "bookingId", ("endDate",), "end_on", to_date),
+    Backfill("Booking", "bookingId", ("Pickup_time",), "pickup_at", to_time),
+    Backfill("Cust_User", "userId", ("registration_Date",), "registered_on", to_date),
+    Backfill("Login_History", "id", ("Date", "Time"), "logged_at", to_datetime),
+    Backfill("Car", "Car_id", ("price_per_km",), "rate_per_km", to_money),
+]
+
+
+def remaining(conn, job: Backfill) -> int:
+    """Rows that have a legacy value but no typed one yet."""
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT COUNT(*) FROM {job.table} "
+        f" WHERE {job.target} IS NULL AND {job.sources[0]} IS NOT NULL AND {job.sources[0]} <> ''"
+    )
+    (count,) = cur.fetchone()
+    cur.close()
+    conn.rollback()
+    return int(count)
+
+
+def run(conn, job: Backfill, *, chunk: int = 1000, pause: float = 0.05) -> Tuple[int, int]:
+    """Backfill *job* chunk by chunk; returns (rows updated, rows skipped)."""
+    base = f"SELECT {job.key}, {', '.join(job.sources)} FROM {job.table} WHERE {job.target} IS NULL"
+    first = f"{base} ORDER BY {job.key} LIMIT %s"
+    select = f"{base} AND {job.key} > %s ORDER BY {job.key} LIMIT %s"
+    # the IS NULL guard keeps a value the application dual-wrote meanwhile
+    update = f"UPDATE {job.table} SET {job.target} = %s WHERE {job.key} = %s AND {job.target} IS NULL"
+
+    updated = skipped = 0
+    last = None
+    cur = conn.cursor()
+    while True:
+        if last is None:
+            cur.execute(first, (chunk,))
+        else:
+            cur.execute(select, (last, chunk))   # keyset: never rescans done rows
+        rows = cur.fetchall()
+        if not rows:
+            break
+        last = rows[-1][0]
+        values = []
+        for key, *legacy in rows:
+            value = job.convert(*legacy)
+            if value is None:
+                skipped += bool(legacy[0])
+            else:
+                values.append((value, key))
+        if values:
+            cur.executemany(update, values)
+        conn.commit()                       # one short transaction per chunk
+        updated += len(values)
+        if len(rows) < chunk:
+            break
+        time.sleep(pause)
+    cur.close()
+    return updated, skipped
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Backfill the typed date/time/price columns")
+    ap.add_argument("command", choices=["status", "run"], nargs="?", default="status")
+    ap.add_argument("--chunk", type=int, default=1000, help="rows per transaction")
+    ap.add_argument("--pause", type=float, default=0.05, help="seconds to sleep between chunks")
+    ap.add_argument("--only", action="append", metavar="TABLE.COLUMN",
+                    help="limit to these typed columns (repeatable)")
+    args = ap.parse_args(argv)
+
+    jobs = [j for j in BACKFILLS if not args.only or j.label in args.only]
+    pool = ConnectionPool.from_env()
+    with pool.connection() as conn:
+        for job in jobs:
+            if args.command == "run":
+                started = time.monotonic()
+                updated, skipped = run(conn, job, chunk=args.chunk, pause=args.pause)
+                print(f"{job.label:<28} updated={updated} skipped={skipped} "
+                      f"({time.monotonic() - started:.1f}s)")
+            else:
+                print(f"{job.label:<28} remaining={remaining(conn, job)}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
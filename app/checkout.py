@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from ttl_cache import TTLCache
+
+
+BOOKING_REF_SQL = """
+    SELECT bookingId, userId, carid, driverId, cab_route
+      FROM Booking
+     WHERE bookingId = %s
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class BookingRef:
+    """The parts of a Booking row the payment/invoice flow needs."""
+
+    booking_id: int
+    user_id: str
+    car_id: str
+    driver_id: int
+    route: str
+
+
+class BookingResolver:
+    """Resolve a booking id to its BookingRef through a small TTL cache.
+
+    Checkout pages are hit several times per booking (payment, invoice,
+    PDF, polling), so the row is read once and then served from memory.
+    Booking rows are immutable once written; only deletes need
+    invalidate()/clear().
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, conn, booking_id: int) -> Optional[BookingRef]:
+        ref = self.cache.get(booking_id)
+        if ref is not None:
+            return ref
+        cur = conn.cursor()
+        cur.execute(BOOKING_REF_SQL, (booking_id,))
+        row = cur.fetchone()
+        cur.close()
+        if row is None:
+            return None
+        ref = BookingRef(*row)
+        self.cache.put(booking_id, ref)
+        return ref
+
+    def invalidate(self, booking_id: int) -> None:
+        self.cache.invalidate(booking_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
@@ -0,0 +1,112 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+# One round trip: every counter is a (metric, key, value) row. Bookings
+# come back grouped by route, so new routes show up without code changes.
+DASHBOARD_SQL = """
+    SELECT 'customers', NULL, COUNT(*) FROM Cust_User
+    UNION ALL
+    SELECT 'admins', NULL, COUNT(*) FROM Admin_User
+    UNION ALL
+    SELECT 'cars', status, COUNT(*) FROM Car GROUP BY status
+    UNION ALL
+    SELECT 'drivers', status, COUNT(*) FROM Driver GROUP BY status
+    UNION ALL
+    SELECT 'route', cab_route, COUNT(*) FROM Booking GROUP BY cab_route
+    UNION ALL
+    SELECT 'revenue', NULL, COALESCE(SUM(total_amount), 0) FROM Payment
+"""
+
+
+@dataclass(frozen=True)
+class DashboardCounts:
+    """Snapshot of the figures shown on the admin status page."""
+
+    customers: int = 0
+    admins: int = 0
+    cars: int = 0
+    cars_available: int = 0
+    drivers: int = 0
+    drivers_available: int = 0
+    revenue: int = 0
+    routes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def employees(self) -> int:
+        return self.admins + self.drivers
+
+    @property
+    def bookings(self) -> int:
+        return sum(self.routes.values())
+
+    def busiest_routes(self) -> List[str]:
+        """Every route sharing the highest booking count (empty if none)."""
+        if not self.routes:
+            return []
+        top = max(self.routes.values())
+        return sorted(r for r, n in self.routes.items() if n == top and n > 0)
+
+    @classmethod
+    def from_rows(cls, rows) -> "DashboardCounts":
+        scalars: Dict[str, int] = {}
+        routes: Dict[str, int] = {}
+        for metric, key, value in rows:
+            value = int(value or 0)
+            if metric == "route":
+                routes[key or "Unknown"] = routes.get(key or "Unknown", 0) + value
+            elif metric in ("cars", "drivers"):
+                scalars[metric] = scalars.get(metric, 0) + value
+                if (key or "").lower() == "available":
+                    scalars[metric + "_available"] = scalars.get(metric + "_available", 0) + value
+            else:
+                scalars[metric] = value
+        return cls(routes=routes, **scalars)
+
+
+class Dashboard:
+    """Cached aggregate behind ``/status/``.
+
+    The counts are computed by DASHBOARD_SQL and reused for *ttl*
+    seconds, so viewing the page costs nothing until the cache expires or
+    a write path calls invalidate().
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: Optional[DashboardCounts] = None
+        self._loaded_at = 0.0
+        self._generation = 0
+        self.hits = self.misses = 0
+
+    def counts(self, conn) -> DashboardCounts:
+        with self._lock:
+            if self._counts is not None and time.monotonic() - self._loaded_at < self.ttl:
+                self.hits += 1
+                return self._counts
+            self.misses += 1
+            generation = self._generation
+
+        cursor = conn.cursor()
+        cursor.execute(DASHBOARD_SQL)
+        counts = DashboardCounts.from_rows(cursor.fetchall())
+        cursor.close()
+
+        with self._lock:
+            # a write that landed while we were counting makes this stale
+            if generation == self._generation:
+                self._counts, self._loaded_at = counts, time.monotonic()
+        return counts
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._counts = None
+            self._generation += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            age = time.monotonic() - self._loaded_at if self._counts is not None else None
+            return {"hits": self.hits, "misses": self.misses, "age_s": age}
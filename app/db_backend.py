@@ -0,0 +1,370 @@
+"""Database backends: MySQL in production, embedded SQLite offline.
+
+The application keeps writing MySQL-flavoured SQL with ``%s``
+placeholders. A backend supplies the connections (as the connect factory
+of ConnectionPool) and the few things that differ between drivers: the
+cursor classes, how to recognise a duplicate-key error and, for SQLite, a thin translation layer for the MySQL-isms the
+code relies on:
+
+* ``%s`` placeholders (and ``%%``) become ``?`` (and ``%``);
+* ``SET TRANSACTION ...`` / ``SET SESSION ...`` are accepted as no-ops;
+* ``SELECT ... FOR UPDATE`` starts a ``BEGIN IMMEDIATE`` transaction,
+  i.e. it takes SQLite's single write lock instead of row locks;
+* ``STR_TO_DATE``, ``CURDATE`` and ``NOW`` are registered as functions;
+* DATE/DATETIME/TIME/DECIMAL columns come back as the same Python types
+  MySQLdb returns (TIME as a timedelta).
+
+The SQLite schema is translated from ``db/car_rental_db.sql`` on first
+connect, so there is a single schema to maintain. Select a backend with
+``DB_BACKEND=mysql|sqlite``; SQLite uses the file at ``DB_PATH``.
+
+    python db_backend.py sqlite-schema     # print the translated schema
+"""
+import datetime
+import os
+import re
+import sqlite3
+import threading
+from decimal import Decimal
+from typing import Any, Optional
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(APP_DIR, os.pardir, "db", "car_rental_db.sql")
+
+
+class Backend:
+    """What the application needs from a database driver."""
+
+    name = "?"
+    dict_cursor: Any = None       # cursor class yielding dict rows
+    stream_cursor: Any = None     # unbuffered cursor class for large results
+
+    def connect(self):
+        raise NotImplementedError
+
+    def is_duplicate_key(self, exc: BaseException) -> bool:
+        raise NotImplementedError
+
+    def is_transient(self, exc: BaseException) -> bool:
+        """True when retrying the same statement later may succeed
+        (lost connection, lock wait timeout, deadlock)."""
+        raise NotImplementedError
+
+
+# ─── MySQL ───────────────────────────────────────────────────────────
+_ER_DUP_ENTRY = 1062
+_TRANSIENT_CODES = {
+    1205,  # Lock wait timeout exceeded
+    1213,  # Deadlock found when trying to get lock
+    2002,  # Can't connect through socket
+    2003,  # Can't connect to MySQL server
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection to MySQL server at '...', system error
+}
+
+
+class MySQLBackend(Backend):
+    name = "mysql"
+
+    def __init__(self, **params):
+        import MySQLdb
+        import MySQLdb.cursors
+
+        self._mysql = MySQLdb
+        self.params = params
+        self.dict_cursor = MySQLdb.cursors.DictCursor
+        self.stream_cursor = MySQLdb.cursors.SSCursor
+
+    def connect(self):
+        return self._mysql.connect(**self.params)
+
+    def is_duplicate_key(self, exc):
+        return isinstance(exc, self._mysql.IntegrityError) and exc.args[:1] == (_ER_DUP_ENTRY,)
+
+    def is_transient(self, exc):
+        return isinstance(exc, self._mysql.OperationalError) and exc.args[:1] and exc.args[0] in _TRANSIENT_CODES
+
+
+# ─── SQLite ──────────────────────────────────────────────────────────
+# Either a quoted literal (left alone) or a placeholder/escaped percent.
+_PARAM_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|%s|%%")
+_NOOP_RE = re.compile(r"^\s*SET\s+(TRANSACTION|SESSION)\b", re.IGNORECASE)
+_FOR_UPDATE_RE = re.compile(r"\s+FOR\s+UPDATE\s*$", re.IGNORECASE)
+
+# MySQL DATE_FORMAT/STR_TO_DATE specifiers that differ from strptime's
+_MYSQL_FORMAT = {"%i": "%M", "%s": "%S", "%h": "%I", "%p": "%p", "%T": "%H:%M:%S"}
+
+
+def _translate_params(sql: str) -> str:
+    def sub(m):
+        token = m.group(0)
+        if token == "%s":
+            return "?"
+        if token == "%%":
+            return "%"
+        return token
+    return _PARAM_RE.sub(sub, sql)
+
+
+def _str_to_date(value, fmt):
+    if value is None or fmt is None:
+        return None
+    fmt = re.sub(r"%[a-zA-Z]", lambda m: _MYSQL_FORMAT.get(m.group(0), m.group(0)), fmt)
+    try:
+        parsed = datetime.datetime.strptime(str(value), fmt)
+    except ValueError:
+        return None
+    if not re.search(r"%[HIMSp]", fmt):
+        return parsed.date().isoformat()
+    return parsed.isoformat(sep=" ")
+
+
+def _to_timedelta(raw: bytes) -> datetime.timedelta:
+    hours, minutes, *rest = (int(float(p)) for p in raw.decode().split(":"))
+    return datetime.timedelta(hours=hours, minutes=minutes, seconds=rest[0] if rest else 0)
+
+
+def _time_text(value) -> str:
+    if isinstance(value, datetime.timedelta):
+        seconds = int(value.total_seconds())
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+    return value.isoformat()
+
+
+# Adapters/converters are process-wide in sqlite3; these mirror MySQLdb.
+sqlite3.register_adapter(datetime.date, lambda v: v.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda v: v.isoformat(sep=" "))
+sqlite3.register_adapter(datetime.time, _time_text)
+sqlite3.register_adapter(datetime.timedelta, _time_text)
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("date", lambda b: datetime.date.fromisoformat(b.decode()[:10]))
+sqlite3.register_converter("datetime", lambda b: datetime.datetime.fromisoformat(b.decode()))
+sqlite3.register_converter("time", _to_timedelta)
+sqlite3.register_converter("decimal", lambda b: Decimal(b.decode()))
+
+
+class SQLiteCursor:
+    """DB-API cursor taking MySQL-style SQL (see the module docstring)."""
+
+    def __init__(self, conn: "SQLiteConnection"):
+        self.connection = conn
+        self._cur = conn.raw.cursor()
+
+    def execute(self, sql: str, params=None):
+        if _NOOP_RE.match(sql):
+            return 0
+        if _FOR_UPDATE_RE.search(sql):
+            sql = _FOR_UPDATE_RE.sub("", sql)
+            if not self.connection.raw.in_transaction:
+                self._cur.execute("BEGIN IMMEDIATE")
+        if params is not None:
+            # MySQLdb only %-formats when parameters are given; match that
+            sql = _translate_params(sql)
+            self._cur.execute(sql, tuple(params))
+        else:
+            self._cur.execute(sql)
+        return self._cur.rowcount
+
+    def executemany(self, sql: str, seq_of_params):
+        self._cur.executemany(_translate_params(sql), [tuple(p) for p in seq_of_params])
+        return self._cur.rowcount
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+    def fetchmany(self, size: Optional[int] = None):
+        return self._cur.fetchmany(size or self._cur.arraysize)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    def __iter__(self):
+        return iter(self._cur)
+
+    @property
+    def description(self):
+        return self._cur.description
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cur.lastrowid
+
+    def close(self):
+        self._cur.close()
+
+
+class SQLiteDictCursor(SQLiteCursor):
+    def _row(self, row):
+        if row is None:
+            return None
+        return {d[0]: v for d, v in zip(self._cur.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cur.fetchone())
+
+    def fetchmany(self, size: Optional[int] = None):
+        return [self._row(r) for r in super().fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(r) for r in self._cur.fetchall()]
+
+    def __iter__(self):
+        return (self._row(r) for r in self._cur)
+
+
+class SQLiteConnection:
+    """The parts of the MySQLdb connection API the application uses."""
+
+    def __init__(self, raw: sqlite3.Connection):
+        self.raw = raw
+
+    def cursor(self, cursorclass=None):
+        return (cursorclass or SQLiteCursor)(self)
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def ping(self):
+        self.raw.execute("SELECT 1")
+
+    def close(self):
+        self.raw.close()
+
+
+class SQLiteBackend(Backend):
+    name = "sqlite"
+    dict_cursor = SQLiteDictCursor
+    stream_cursor = SQLiteCursor          # sqlite3 already steps rows lazily
+
+    def __init__(self, path: str, *, schema_path: str = SCHEMA_PATH, busy_timeout: float = 30.0):
+        self.path = path
+        self.schema_path = schema_path
+        self.busy_timeout = busy_timeout
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,          # pooled connections change threads
+        )
+        raw.execute("PRAGMA foreign_keys = ON")
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.create_function("STR_TO_DATE", 2, _str_to_date, deterministic=True)
+        raw.create_function("CURDATE", 0, lambda: datetime.date.today().isoformat())
+        raw.create_function("NOW", 0, lambda: datetime.datetime.now().isoformat(sep=" ", timespec="seconds"))
+        self._ensure_schema(raw)
+        return SQLiteConnection(raw)
+
+    def is_duplicate_key(self, exc):
+        return isinstance(exc, sqlite3.IntegrityError) and "UNIQUE constraint failed" in str(exc)
+
+    def is_transient(self, exc):
+        # busy_timeout ran out while another connection held the write lock
+        return isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc)
+
+    def _ensure_schema(self, raw: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            if not raw.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").fetchone():
+                with open(self.schema_path) as fh:
+                    raw.executescript(sqlite_schema(fh.read()))
+            self._schema_ready = True
+
+
+# ─── schema translation ──────────────────────────────────────────────
+_TYPES = [
+    (re.compile(r"\b(?:tiny|small|medium|big)?int\(\d+\)", re.I), "INTEGER"),
+    (re.compile(r"\bvarchar\(\d+\)", re.I), "TEXT COLLATE NOCASE"),   # latin1_swedish_ci
+    (re.compile(r"\bdecimal\(\d+,\s*\d+\)", re.I), "DECIMAL"),
+]
+_TABLE_RE = re.compile(r"CREATE TABLE `(\w+)` \((.*?)\n\)[^;]*;", re.S)
+
+
+def sqlite_schema(mysql_dump: str) -> str:
+    """Translate the mysqldump schema (tables, keys, seed rows) for SQLite."""
+    out = []
+    for stmt in _statements(mysql_dump):
+        if stmt.startswith("DROP TABLE"):
+            out.append(stmt + ";")
+        elif stmt.startswith("CREATE TABLE"):
+            out.extend(_create_table(stmt + ";"))
+        elif stmt.startswith("INSERT INTO"):
+            out.append(stmt.replace("\\'", "''") + ";")
+    return "\n".join(out) + "\n"
+
+
+def _statements(dump: str):
+    lines = [l for l in dump.splitlines() if l.strip() and not l.startswith(("--", "/*"))]
+    for stmt in "\n".join(lines).split(";\n"):
+        stmt = stmt.strip().rstrip(";")
+        if stmt:
+            yield stmt
+
+
+def _create_table(stmt: str):
+    m = _TABLE_RE.match(stmt)
+    table, body = m.group(1), m.group(2)
+    columns, constraints, indexes = [], [], []
+    pk = re.search(r"PRIMARY KEY \(`(\w+)`\)", body).group(1)
+    for line in (l.strip().rstrip(",") for l in body.splitlines()):
+        if not line or line.startswith("PRIMARY KEY"):
+            continue
+        key = re.match(r"(UNIQUE )?KEY `(\w+)` \((.+)\)", line)
+        if key:
+            unique, name, cols = key.groups()
+            indexes.append(
+                f"CREATE {unique or ''}INDEX `{table}_{name}` ON `{table}` ({cols});"
+            )
+            continue
+        if line.startswith("CONSTRAINT"):
+            constraints.append(line)
+            continue
+        column = re.match(r"`(\w+)`", line).group(1)
+        for pattern, repl in _TYPES:
+            line = pattern.sub(repl, line)
+        line = re.sub(r" (?:unsigned|CHARACTER SET \w+|COLLATE (?!NOCASE)\w+)", "", line)
+        if column == pk:
+            if " AUTO_INCREMENT" in line:
+                # only an INTEGER PRIMARY KEY column can autoincrement
+                line = re.sub(r" NOT NULL| AUTO_INCREMENT", "", line) + " PRIMARY KEY AUTOINCREMENT"
+            else:
+                line += " PRIMARY KEY"
+        columns.append(line)
+    body = ",\n  ".join(columns + constraints)
+    return [f"CREATE TABLE `{table}` (\n  {body}\n);"] + indexes
+
+
+def backend_from_env() -> Backend:
+    """The backend chosen by ``DB_BACKEND`` (default: mysql)."""
+    kind = os.getenv("DB_BACKEND", "mysql").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(os.getenv("DB_PATH", os.path.join(APP_DIR, "car_rental.sqlite3")))
+    if kind != "mysql":
+        raise ValueError(f"unknown DB_BACKEND {kind!r} (expected mysql or sqlite)")
+    return MySQLBackend(
+        host=os.getenv("DB_HOST", "db"),
+        user=os.getenv("DB_USER", "root"),
+        passwd=os.getenv("DB_PASSWORD", "root"),
+        db=os.getenv("DB_NAME", "car_rental"),
+    )
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["sqlite-schema"]:
+        raise SystemExit("usage: python db_backend.py sqlite-schema")
+    with open(SCHEMA_PATH) as fh:
+        sys.stdout.write(sqlite_schema(fh.read()))
@@ -0,0 +1,266 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from db_backend import Backend, backend_from_env
+
+
+# MySQL client error codes that mean the socket is dead and the
+# connection must be thrown away rather than handed out again.
+_DISCONNECT_CODES = {
+    2006,  # MySQL server has gone away
+    2013,  # Lost connection to MySQL server during query
+    2055,  # Lost connection to MySQL server at '...', system error
+}
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out within *timeout*."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections.
+
+    Usage
+    -----
+    >>> pool = ConnectionPool.from_env()
+    >>> with pool.connection() as conn:
+    ...     cur = conn.cursor()
+    ...     cur.execute("SELECT 1")
+
+    * at most *max_size* connections exist at any time; callers beyond
+      that block (up to *timeout* seconds) until one is released;
+    * *min_size* connections are opened up-front and kept warm;
+    * connections idle for longer than *ping_interval* are pinged on
+      checkout and transparently replaced if the server went away.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        ping_interval: float = 30.0,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size, max_size >= 1.")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: Deque[tuple] = deque()   # (conn, last_used_monotonic)
+        self._size = 0                        # open connections (idle + in use)
+        self._in_use = 0
+        self._waiting = 0
+
+        # counters exposed through stats()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._reconnects = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples: Deque[float] = deque(maxlen=1024)
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+            self._size += 1
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_env(
+        cls,
+        backend: Optional[Backend] = None,
+        *,
+        wrap: Optional[Callable[[Callable[[], Any]], Callable[[], Any]]] = None,
+    ) -> "ConnectionPool":
+        """Build a pool over *backend* (default: the one ``DB_BACKEND`` names).
+
+        *wrap*, if given, decorates the connect factory (e.g. to time queries).
+
+        Pool sizing is read from ``DB_POOL_MIN`` / ``DB_POOL_MAX`` /
+        ``DB_POOL_TIMEOUT`` / ``DB_POOL_PING_INTERVAL``.
+        """
+        backend = backend or backend_from_env()
+        return cls(
+            wrap(backend.connect) if wrap else backend.connect,
+            min_size=int(os.getenv("DB_POOL_MIN", 2)),
+            max_size=int(os.getenv("DB_POOL_MAX", 10)),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+            ping_interval=float(os.getenv("DB_POOL_PING_INTERVAL", 30)),
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def acquire(self):
+        """Check a live connection out of the pool (blocks while exhausted)."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+
+        with self._cond:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No DB connection available after {self.timeout:.1f}s "
+                        f"(max_size={self.max_size})."
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            if self._idle:
+                conn, last_used = self._idle.pop()      # LIFO keeps hot sockets hot
+            else:
+                conn, last_used = None, 0.0
+                self._size += 1                          # reserve the slot
+            self._in_use += 1
+
+        try:
+            if conn is None:
+                conn = self._connect()
+            elif time.monotonic() - last_used > self.ping_interval:
+                conn = self._ensure_alive(conn)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._wait_samples.append(waited)
+        return conn
+
+    def release(self, conn, *, discard: bool = False) -> None:
+        """Return *conn* to the pool; *discard* closes it instead.
+
+        A connection whose rollback fails is always discarded (its state is
+        unknown); errors other than a disconnect are re-raised afterwards.
+        """
+        error = None
+        if not discard:
+            try:
+                # never hand out a connection with an open transaction/snapshot
+                conn.rollback()
+            except Exception as exc:
+                discard = True
+                if not self.is_disconnect(exc):
+                    error = exc
+
+        try:
+            with self._cond:
+                self._in_use -= 1
+                if discard:
+                    self._size -= 1
+                    self._discarded += 1
+                else:
+                    self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+            if discard:
+                _close_quietly(conn)
+        finally:
+            if error is not None:
+                raise error
+
+    @contextmanager
+    def connection(self):
+        """Context-manager form of acquire()/release()."""
+        conn = self.acquire()
+        try:
+            yield conn
+        except Exception as exc:
+            self.release(conn, discard=self.is_disconnect(exc))
+            raise
+        else:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Close every idle connection (in-use ones close on release)."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    @staticmethod
+    def is_disconnect(exc: Optional[BaseException]) -> bool:
+        """True when *exc* means the underlying socket is unusable."""
+        if exc is None:
+            return False
+        args = getattr(exc, "args", ())
+        return bool(args) and args[0] in _DISCONNECT_CODES
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage, suitable for JSON serialisation."""
+        with self._cond:
+            samples: List[float] = sorted(self._wait_samples)
+            checkouts = self._checkouts
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "reconnects": self._reconnects,
+                "discarded": self._discarded,
+                "checkout_ms": {
+                    "avg": round(1000 * self._wait_total / checkouts, 3) if checkouts else 0.0,
+                    "p50": round(1000 * _percentile(samples, 50), 3),
+                    "p99": round(1000 * _percentile(samples, 99), 3),
+                    "max": round(1000 * self._wait_max, 3),
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _ensure_alive(self, conn):
+        try:
+            conn.ping()
+            return conn
+        except Exception as exc:
+            if not self.is_disconnect(exc):
+                raise
+        _close_quietly(conn)
+        fresh = self._connect()
+        with self._cond:
+            self._reconnects += 1
+        return fresh
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+def _percentile(sorted_samples: List[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(round(pct / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
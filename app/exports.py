@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Iterator, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Export:
+    """A table (or join) that can be streamed out row by row."""
+
+    select: str                 # SELECT ... FROM ... without WHERE/ORDER BY
+    columns: Tuple[str, ...]    # header names, same order as the SELECT list
+    date_expr: str              # typed DATE/DATETIME column the from/to filter applies to
+    order_by: str
+    # (varchar column, STR_TO_DATE format) read where date_expr is still
+    # NULL, i.e. for rows the backfill has not reached yet
+    legacy_date: Optional[Tuple[str, str]] = None
+
+
+EXPORTS = {
+    "bookings": Export(
+        "SELECT bookingId, userId, Cab, startDate, endDate, Pickup_time, Pickup_location, "
+        "       Drop_off_location, driverId, carid, cab_route FROM Booking",
+        ("bookingId", "userId", "cab", "startDate", "endDate", "pickupTime",
+         "pickupLocation", "dropoffLocation", "driverId", "carId", "route"),
+        date_expr="start_on",
+        order_by="bookingId",
+        legacy_date=("startDate", "%Y-%m-%d"),
+    ),
+    "payments": Export(
+        "SELECT p.Payment_id, p.bookingId, p.payment_type, p.status, p.total_amount, "
+        "       b.startDate FROM Payment p LEFT JOIN Booking b ON b.bookingId = p.bookingId",
+        ("paymentId", "bookingId", "paymentType", "status", "totalAmount", "startDate"),
+        date_expr="b.start_on",                # Payment has no date of its own
+        order_by="p.Payment_id",
+        legacy_date=("b.startDate", "%Y-%m-%d"),
+    ),
+    "logins": Export(
+        "SELECT id, user, userId, Date, Time FROM Login_History",
+        ("id", "role", "userId", "date", "time"),
+        date_expr="logged_at",
+        order_by="id",
+        legacy_date=("Date", "%d-%m-%Y"),
+    ),
+}
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def export_query(export: Export, start: Optional[date], end: Optional[date]):
+    """SQL and parameters for *export*, optionally limited to [start, end].
+
+    The end bound is exclusive of the next day, so a DATETIME column
+    includes everything logged on *end*. Rows not backfilled yet are
+    filtered on their legacy varchar date instead of being dropped.
+    """
+    column, column_params = export.date_expr, []
+    if export.legacy_date:
+        legacy, fmt = export.legacy_date
+        column = f"COALESCE({export.date_expr}, STR_TO_DATE({legacy}, %s))"
+        column_params = [fmt]
+    where, params = [], []
+    if start is not None:
+        where.append(f"{column} >= %s")
+        params += column_params + [start.isoformat()]
+    if end is not None:
+        where.append(f"{column} < %s")
+        params += column_params + [(end + timedelta(days=1)).isoformat()]
+    sql = export.select
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return f"{sql} ORDER BY {export.order_by}", params
+
+
+def encode_rows(export: Export, rows, fmt: str, chunk_rows: int = 500) -> Iterator[str]:
+    """Serialise *rows* as CSV or NDJSON, yielding ~*chunk_rows* rows per chunk."""
+    buf = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buf)
+        writer.writerow(export.columns)
+        write = writer.writerow
+    else:
+        def write(row):
+            buf.write(json.dumps(dict(zip(export.columns, row)), default=str))
+            buf.write("\n")
+
+    pending = 0
+    for row in rows:
+        write(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def stream_export(conn, cursor_class, export: Export, fmt: str,
+                  start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Run the export on an unbuffered server-side cursor and yield chunks.
+
+    Rows are read from the socket as the client consumes the response, so
+    memory stays flat whatever the row count. The connection is unusable
+    until the result set is drained, so a caller that stops iterating
+    early must close the connection rather than reuse it.
+    """
+    sql, params = export_query(export, start, end)
+    cur = conn.cursor(cursor_class)
+    # slow downloaders must not trip the server's write timeout mid-stream
+    cur.execute("SET SESSION net_write_timeout = 3600")
+    cur.execute(sql, params)
+    yield from encode_rows(export, _drain(cur), fmt)
+    cur.close()
+    cur = conn.cursor()
+    cur.execute("SET SESSION net_write_timeout = DEFAULT")
+    cur.close()
+
+
+def _drain(cur, batch: int = 1000):
+    while True:
+        rows = cur.fetchmany(batch)
+        if not rows:
+            return
+        yield from rows
@@ -0,0 +1,134 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+ROUTES_SQL = "SELECT route_id, name, distance_km, active FROM Route ORDER BY route_id"
+CAR_RATES_SQL = "SELECT Car_id, Car_type, rate_per_km, price_per_km FROM Car"
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    route_id: int
+    name: str
+    distance_km: int
+
+
+def parse_rate(value) -> Optional[int]:
+    """A per-km rate (DECIMAL, or the legacy varchar) as whole rupees."""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class FareMatrix:
+    """In-memory routes and per-km rates used to price bookings.
+
+    Routes come from the ``Route`` table (adding one is an INSERT) and
+    rates from ``Car.rate_per_km``, both read once by load(). A fare
+    is then ``distance[route] * rate[car]``: two lookups, no query.
+
+    The admin car pages keep rates current through set_car()/remove_car();
+    route edits are picked up by the periodic reload (*refresh_interval*).
+    *version* increases on every change so derived caches can tell when
+    to recompute.
+    """
+
+    def __init__(self, refresh_interval: float = 300.0):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._routes: List[Route] = []
+        self._by_id: Dict[int, Route] = {}
+        self._by_name: Dict[str, Route] = {}
+        self._rates: Dict[str, int] = {}          # car id -> price per km
+        self._car_types: Dict[str, str] = {}      # car id -> Car_type
+        self._loaded_at = 0.0
+        self.version = 0
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def load(self, conn) -> None:
+        cur = conn.cursor()
+        cur.execute(ROUTES_SQL)
+        rows = cur.fetchall()
+        # retired routes stay priceable for bookings made before retirement
+        every = [Route(int(rid), name, int(km)) for rid, name, km, _ in rows]
+        routes = [r for r, row in zip(every, rows) if row[3]]
+        cur.execute(CAR_RATES_SQL)
+        rates, types = {}, {}
+        for car_id, car_type, typed, legacy in cur.fetchall():
+            rate = parse_rate(typed if typed is not None else legacy)
+            if rate is not None:
+                rates[str(car_id)] = rate
+                types[str(car_id)] = car_type
+        cur.close()
+
+        with self._lock:
+            self._routes = routes
+            self._by_id = {r.route_id: r for r in routes}
+            self._by_name = {r.name: r for r in every}
+            self._rates, self._car_types = rates, types
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def needs_refresh(self) -> bool:
+        return time.monotonic() - self._loaded_at > self.refresh_interval
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def routes(self) -> List[Route]:
+        return list(self._routes)
+
+    def route(self, route_id: int) -> Optional[Route]:
+        return self._by_id.get(route_id)
+
+    def route_by_name(self, name: str) -> Optional[Route]:
+        return self._by_name.get(name)
+
+    def car_rate(self, car_id) -> Optional[int]:
+        return self._rates.get(str(car_id))
+
+    def fare(self, route_name: str, car_id) -> Optional[int]:
+        """Total price of *route_name* in car *car_id*, or None if unknown."""
+        route = self._by_name.get(route_name)
+        rate = self._rates.get(str(car_id))
+        if route is None or rate is None:
+            return None
+        return route.distance_km * rate
+
+    def car_rates(self) -> List[Tuple[str, str, int]]:
+        """(car id, car type, per-km rate) for every priced car."""
+        with self._lock:
+            return [(car_id, self._car_types[car_id], rate) for car_id, rate in self._rates.items()]
+
+    def rates_by_type(self) -> Dict[str, List[int]]:
+        """Per-km rates of every car, grouped by car type."""
+        with self._lock:
+            grouped: Dict[str, List[int]] = {}
+            for car_id, rate in self._rates.items():
+                grouped.setdefault(self._car_types[car_id], []).append(rate)
+            return grouped
+
+    # ------------------------------------------------------------------
+    # Maintenance hooks (admin car pages)
+    # ------------------------------------------------------------------
+    def set_car(self, car_id, car_type: str, price_per_km) -> None:
+        rate = parse_rate(price_per_km)
+        with self._lock:
+            if rate is None:
+                self._rates.pop(str(car_id), None)
+                self._car_types.pop(str(car_id), None)
+            else:
+                self._rates[str(car_id)] = rate
+                self._car_types[str(car_id)] = car_type
+            self.version += 1
+
+    def remove_car(self, car_id) -> None:
+        with self._lock:
+            self._rates.pop(str(car_id), None)
+            self._car_types.pop(str(car_id), None)
+            self.version += 1
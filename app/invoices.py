@@ -0,0 +1,104 @@
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class InvoiceRecord:
+    """Everything *invoice.html* shows for one paid booking."""
+
+    booking_id: int
+    customer_name: str
+    customer_email: str
+    customer_phone: str
+    cab: str
+    car_model: str
+    start_date: Any
+    end_date: Any
+    pickup_time: Any
+    pickup_location: str
+    dropoff_location: str
+    driver_name: str
+    driver_phone: str
+    payment_type: str
+    amount: int
+
+    def template_context(self) -> Dict[str, Any]:
+        """Keyword arguments expected by *invoice.html*."""
+        return dict(
+            data=self.booking_id,
+            name=self.customer_name,
+            cab=self.cab,
+            cab_model=self.car_model,
+            sd=self.start_date,
+            ed=self.end_date,
+            p_time=self.pickup_time,
+            p_loc=self.pickup_location,
+            d_loc=self.dropoff_location,
+            dName=self.driver_name,
+            dphone1=self.driver_phone,
+            p_type=self.payment_type,
+            amount=self.amount,
+        )
+
+
+# One round trip instead of the dozen single-column look-ups the invoice
+# routes used to make. The latest Payment row wins if there are several.
+INVOICE_SQL = """
+    SELECT b.bookingId,
+           c.fName, c.lName, c.emailId, c.phone,
+           b.Cab, car.model_name,
+           COALESCE(b.start_on, b.startDate), COALESCE(b.end_on, b.endDate),
+           b.pickup_at, b.Pickup_time,
+           b.Pickup_location, b.Drop_off_location,
+           d.fName, d.lName, d.phone_no,
+           p.payment_type, p.total_amount
+      FROM Booking   b
+      JOIN Cust_User c   ON c.userId    = b.userId
+      JOIN Car       car ON car.Car_id  = b.carid
+      JOIN Driver    d   ON d.driverId  = b.driverId
+      JOIN Payment   p   ON p.bookingId = b.bookingId
+     WHERE b.bookingId = %s
+  ORDER BY p.Payment_id DESC
+     LIMIT 1
+"""
+
+
+def load_invoice(conn, booking_id: int) -> Optional[InvoiceRecord]:
+    """Fetch the invoice for *booking_id*, or None if it is not paid yet."""
+    cur = conn.cursor()
+    cur.execute(INVOICE_SQL, (booking_id,))
+    row = cur.fetchone()
+    cur.close()
+    if row is None:
+        return None
+
+    (bid, c_first, c_last, c_email, c_phone, cab, model, sd, ed, pickup_at, p_time,
+     p_loc, d_loc, d_first, d_last, d_phone, p_type, amount) = row
+    return InvoiceRecord(
+        booking_id=bid,
+        customer_name=f"{c_first} {c_last}",
+        customer_email=c_email,
+        customer_phone=c_phone,
+        cab=cab,
+        car_model=model,
+        start_date=sd,
+        end_date=ed,
+        pickup_time=_clock(pickup_at) or p_time,
+        pickup_location=p_loc,
+        dropoff_location=d_loc,
+        driver_name=f"{d_first} {d_last}",
+        driver_phone=d_phone,
+        payment_type=p_type,
+        amount=amount,
+    )
+
+
+def _clock(value) -> Optional[str]:
+    """HH:MM for a TIME column (MySQLdb returns it as a timedelta)."""
+    if isinstance(value, datetime.timedelta):
+        minutes = int(value.total_seconds()) // 60
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    if isinstance(value, datetime.time):
+        return value.strftime("%H:%M")
+    return None
@@ -0,0 +1,306 @@
+import json
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import parseaddr
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at      REAL    NOT NULL,
+    sender          TEXT    NOT NULL,
+    recipients      TEXT    NOT NULL,          -- JSON list
+    subject         TEXT    NOT NULL,
+    body            TEXT    NOT NULL,
+    status          TEXT    NOT NULL DEFAULT 'pending',  -- pending/sending/dead
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL    NOT NULL,
+    claimed_at      REAL,
+    last_error      TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class MailOutbox:
+    """Durable outbox for transactional mail.
+
+    Request handlers call send()/enqueue(), which is one local SQLite
+    insert; a background thread drains the spool in batches over a single
+    persistent SMTP connection.
+
+    * transient failures (connection drops, 4xx replies) are retried with
+      exponential backoff plus jitter, up to *max_attempts*;
+    * permanent 5xx rejections, and messages out of attempts, are moved
+      to the ``dead`` state and kept for inspection;
+    * rows are claimed inside ``BEGIN IMMEDIATE`` so several processes may
+      share one spool file without sending a message twice.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        batch_size: int = 50,
+        poll_interval: float = 1.0,
+        max_attempts: int = 8,
+        base_backoff: float = 2.0,
+        max_backoff: float = 600.0,
+        idle_disconnect: float = 30.0,
+        smtp_timeout: float = 10.0,
+        on_send: Optional[Callable[[float, bool], None]] = None,
+    ):
+        self.path = path
+        self.host, self.port = host, port
+        self.username, self.password = username, password
+        self.use_tls, self.use_ssl = use_tls, use_ssl
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.idle_disconnect = idle_disconnect
+        self.smtp_timeout = smtp_timeout
+        self.on_send = on_send                      # (seconds, ok) per message, for metrics
+
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_used_at = 0.0
+        self.sent = self.retried = self.dead = self.connects = 0
+
+        with self._tx() as db:
+            db.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Producer side (request handlers)
+    # ------------------------------------------------------------------
+    def enqueue(self, *, subject: str, sender: str, recipients: Iterable[str], body: str) -> int:
+        now = time.time()
+        with self._tx() as db:
+            cur = db.execute(
+                "INSERT INTO outbox (created_at, sender, recipients, subject, body, next_attempt_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (now, sender, json.dumps(list(recipients)), subject, body or "", now),
+            )
+            msg_id = cur.lastrowid
+        self._wake.set()
+        return msg_id
+
+    def send(self, msg) -> int:
+        """Drop-in for ``mail.send(msg)`` with a flask_mail Message."""
+        return self.enqueue(
+            subject=msg.subject, sender=msg.sender, recipients=msg.recipients, body=msg.body
+        )
+
+    # ------------------------------------------------------------------
+    # Consumer side (background sender)
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mail-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the sender after one last drain and close the SMTP socket."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+    def drain_once(self) -> int:
+        """Send every message that is due right now; returns how many went out."""
+        total = 0
+        while True:
+            batch = self._claim_batch()
+            if not batch:
+                break
+            total += self._deliver(batch)
+            if len(batch) < self.batch_size:
+                break
+        return total
+
+    def stats(self) -> Dict[str, int]:
+        with self._tx() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        return {
+            "pending": counts.get("pending", 0) + counts.get("sending", 0),
+            "dead": counts.get("dead", 0),
+            "sent_total": self.sent,
+            "retried_total": self.retried,
+            "dead_total": self.dead,
+            "smtp_connects": self.connects,
+        }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.drain_once()
+            except Exception:
+                self._disconnect()
+            if self._smtp is not None and time.monotonic() - self._smtp_used_at > self.idle_disconnect:
+                self._disconnect()
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        try:
+            self.drain_once()
+        except Exception:
+            pass
+
+    def _timed(self, started: float, ok: bool) -> None:
+        if self.on_send is not None:
+            self.on_send(time.perf_counter() - started, ok)
+
+    def _tx(self) -> "_Tx":
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return _Tx(db)
+
+    def _claim_batch(self) -> List[tuple]:
+        now = time.time()
+        with self._tx() as db:
+            db.execute("BEGIN IMMEDIATE")
+            rows = db.execute(
+                "SELECT id, sender, recipients, subject, body, attempts FROM outbox "
+                " WHERE (status = 'pending' AND next_attempt_at <= ?) "
+                "    OR (status = 'sending' AND claimed_at < ?) "   # sender crashed mid-batch
+                " ORDER BY id LIMIT ?",
+                (now, now - 300, self.batch_size),
+            ).fetchall()
+            if rows:
+                db.executemany(
+                    "UPDATE outbox SET status = 'sending', claimed_at = ? WHERE id = ?",
+                    [(now, r[0]) for r in rows],
+                )
+        return rows
+
+    def _deliver(self, batch: List[tuple]) -> int:
+        sent_ids, retry, dead = [], [], []
+        link_error: Optional[BaseException] = None
+        for msg_id, sender, recipients, subject, body, attempts in batch:
+            if link_error is None:
+                started = time.perf_counter()
+                try:
+                    smtp = self._connection()
+                    smtp.send_message(
+                        _build(sender, json.loads(recipients), subject, body),
+                        from_addr=parseaddr(sender)[1] or sender,
+                        to_addrs=json.loads(recipients),
+                    )
+                    self._smtp_used_at = time.monotonic()
+                    self._timed(started, True)
+                    sent_ids.append(msg_id)
+                    continue
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as exc:
+                    error: BaseException = exc        # this message only
+                except (smtplib.SMTPException, OSError) as exc:
+                    # relay unreachable or socket dropped: reconnect on the
+                    # next drain and push the rest of the batch back as well
+                    self._disconnect()
+                    error = link_error = exc
+                except Exception as exc:
+                    error = exc
+                self._timed(started, False)
+            else:
+                error = link_error
+
+            if _is_permanent(error) or attempts + 1 >= self.max_attempts:
+                dead.append((repr(error), msg_id))
+            else:
+                delay = min(self.max_backoff, self.base_backoff * 2 ** attempts)
+                delay *= random.uniform(0.8, 1.2)
+                retry.append((time.time() + delay, repr(error), msg_id))
+
+        with self._tx() as db:
+            db.execute("BEGIN")
+            db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in sent_ids])
+            db.executemany(
+                "UPDATE outbox SET status = 'pending', attempts = attempts + 1, "
+                "       next_attempt_at = ?, last_error = ? WHERE id = ?",
+                retry,
+            )
+            db.executemany(
+                "UPDATE outbox SET status = 'dead', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                dead,
+            )
+        self.sent += len(sent_ids)
+        self.retried += len(retry)
+        self.dead += len(dead)
+        return len(sent_ids)
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is not None:
+            return self._smtp
+        cls = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = cls(self.host, self.port, timeout=self.smtp_timeout)
+        if self.use_tls:
+            smtp.starttls()
+        if self.username:
+            smtp.login(self.username, self.password)
+        self._smtp = smtp
+        self._smtp_used_at = time.monotonic()
+        self.connects += 1
+        return smtp
+
+    def _disconnect(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+
+
+class _Tx:
+    """``with`` wrapper that commits on success and rolls back on error."""
+
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.db.in_transaction:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def _build(sender: str, recipients: List[str], subject: str, body: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["To"] = ", ".join(recipients)
+    msg["Subject"] = subject
+    msg.set_content(body)
+    return msg
+
+
+def _is_permanent(exc: BaseException) -> bool:
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return exc.smtp_code >= 500
+    return not isinstance(exc, (smtplib.SMTPException, OSError, socket.timeout))
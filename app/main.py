@@ -1,15 +1,13 @@
 from flask import Flask, render_template, redirect, url_for , flash
-import MySQLdb
 import base64
-from flask_weasyprint import HTML,render_pdf
 import re
-from flask_mail import Mail,Message
+from flask_mail import Message
 from Crypto.Cipher import AES
-from passlib.hash import pbkdf2_sha256
 from flask import request
 import datetime
 import time
 from flask import session
+from flask import g, jsonify, send_file, stream_with_context
 import os
 from customer_validation import RegistrationForm
 from booking_validation import BookingForm
@@ -21,7 +19,30 @@ from addDriver_validation import DriverForm
 from feedback_validation import FeedbackForm
 from payment_validation import CardPaymentForm, NetbankingForm
 from crypto_utils import encrypt_answer, decrypt_answer
+from db_pool import ConnectionPool
+from db_backend import backend_from_env
+from metrics import Metrics, gauges
+from query_tracer import query_budget, tracer_from_env
+from allocation import reserve_car_and_driver
+from availability import AvailabilityIndex
+from invoices import load_invoice
+from pdf_cache import PdfCache, fingerprint_files
+from pdf_render import RenderService, RenderQueueFull
+from mail_outbox import MailOutbox
+from dashboard import Dashboard
+from pagination import LISTINGS, BadCursor, keyset_page
+from exports import CONTENT_TYPES, EXPORTS, stream_export
+from ttl_cache import TTLCache
+from passwords import PasswordHasher, HashingBusy
+from audit_log import AuditBuffer
+from checkout import BookingResolver
+from fares import FareMatrix
+from quotes import QuoteService
+import atexit
+import concurrent.futures
+import tempfile
 import hashlib
+import io
 
 from flask_login import (
     LoginManager, UserMixin, login_user, logout_user,
@@ -40,7 +61,8 @@ login_manager.session_protection = "strong"  # re‑auth if IP/UA changes
 login_manager.init_app(app)
 
 app.config.update(
-    SESSION_COOKIE_SECURE=True,      # HTTPS‑only
+    # HTTPS‑only; SESSION_COOKIE_SECURE=0 only for local plain-HTTP load tests
+    SESSION_COOKIE_SECURE=os.getenv("SESSION_COOKIE_SECURE", "1") != "0",
     SESSION_COOKIE_HTTPONLY=True,    # JS cannot touch
     SESSION_COOKIE_SAMESITE="Lax",
     PERMANENT_SESSION_LIFETIME=datetime.timedelta(minutes=30)
@@ -62,20 +84,187 @@ app.config.update(
 
 
 #app.config.update(mail_settings)
-mail = Mail(app)
 
 app.secret_key = os.getenv("SECRET_KEY")
 
-conn = MySQLdb.connect(
-    host=os.getenv("DB_HOST", "db"),
-    user=os.getenv("DB_USER", "root"),
-    passwd=os.getenv("DB_PASSWORD", "root"),
-    db=os.getenv("DB_NAME", "car_rental")
+# ─── Request metrics ─────────────────────────────────────────────────
+# Latency, SQL count/time and template time per endpoint, plus mail and
+# PDF timings, served in Prometheus text format on /metrics.
+metrics = Metrics(token=os.getenv("METRICS_TOKEN") or None)
+metrics.init_app(app)
+
+# Logs requests over their SQL budget (count, time, repeated statements);
+# views declare their own with @query_budget. QUERY_BUDGET_STRICT=1 raises.
+query_tracer = tracer_from_env()
+query_tracer.init_app(app, metrics)
+
+# ─── DB connection pool ──────────────────────────────────────────────
+# One connection is checked out per request (lazily, on first use) and
+# handed back on teardown, so concurrent requests never share a socket.
+# DB_BACKEND=sqlite runs everything against an embedded file (DB_PATH).
+backend = backend_from_env()
+pool = ConnectionPool.from_env(backend, wrap=metrics.instrument)
+
+
+def get_db():
+    """Return the pooled connection bound to the current request."""
+    if "db" not in g:
+        g.db = pool.acquire()
+    return g.db
+
+
+@app.teardown_appcontext
+def release_db(exc):
+    db = g.pop("db", None)
+    if db is not None:
+        pool.release(db, discard=pool.is_disconnect(exc))
+
+
+# ─── Car / driver availability index ─────────────────────────────────
+# Answers "which cars/drivers are free for these dates" from memory;
+# rebuilt from the Booking table on start and every AVAILABILITY_REFRESH s.
+availability = AvailabilityIndex(
+    refresh_interval=float(os.getenv("AVAILABILITY_REFRESH", 300))
+)
+with pool.connection() as _conn:
+    availability.load(_conn)
+
+
+# ─── Rendered invoice PDF cache ──────────────────────────────────────
+# Keyed by a hash of the invoice data + template/CSS version, so any
+# change to the Booking/Payment rows (or the layout) re-renders.
+pdf_cache = PdfCache(
+    os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "car_rental_pdf")),
+    max_bytes=int(os.getenv("PDF_CACHE_MAX_MB", 256)) * 1024 * 1024,
+    salt=fingerprint_files(
+        os.path.join(app.root_path, "templates", "invoice.html"),
+        os.path.join(app.root_path, "static", "css", "invoice.css"),
+    ),
+)
+
+
+# ─── Invoice PDF rendering workers ───────────────────────────────────
+# WeasyPrint runs in warm worker processes instead of the request thread;
+# a render that overruns PDF_RENDER_TIMEOUT has its worker killed and replaced.
+render_service = RenderService(
+    os.path.join(app.root_path, "static"),
+    workers=int(os.getenv("PDF_RENDER_WORKERS", 2)),
+    max_queue=int(os.getenv("PDF_RENDER_QUEUE", 8)),
+    timeout=float(os.getenv("PDF_RENDER_TIMEOUT", 20)),
+    preload=["css/invoice.css"],
+    on_render=metrics.observe_pdf,
+)
+
+
+# ─── Outgoing mail ───────────────────────────────────────────────────
+# Handlers only append to a local SQLite spool; one background thread
+# delivers it over a reused SMTP connection, retrying with backoff.
+outbox = MailOutbox(
+    os.getenv("MAIL_OUTBOX_PATH", os.path.join(tempfile.gettempdir(), "car_rental_outbox.sqlite3")),
+    host=app.config["MAIL_SERVER"],
+    port=app.config["MAIL_PORT"],
+    username=app.config["MAIL_USERNAME"],
+    password=app.config["MAIL_PASSWORD"],
+    use_tls=app.config["MAIL_USE_TLS"],
+    use_ssl=app.config["MAIL_USE_SSL"],
+    on_send=metrics.observe_mail,
+)
+outbox.start()
+atexit.register(outbox.stop)
+
+
+# ─── Login audit trail ───────────────────────────────────────────────
+# sign() appends here; rows reach Login_History in executemany batches.
+login_audit = AuditBuffer(
+    pool,
+    "INSERT INTO Login_History (user, userId, Date, Time, logged_at) VALUES (%s, %s, %s, %s, %s)",
+    batch_size=int(os.getenv("AUDIT_BATCH_SIZE", 200)),
+    flush_interval=float(os.getenv("AUDIT_FLUSH_MS", 500)) / 1000,
+    max_buffer=int(os.getenv("AUDIT_MAX_BUFFER", 10000)),
+    dead_letter_path=os.getenv(
+        "AUDIT_DEAD_LETTER_PATH", os.path.join(tempfile.gettempdir(), "car_rental_audit_dead.jsonl")
+    ),
+    is_transient=backend.is_transient,
+)
+login_audit.start()
+atexit.register(login_audit.stop)
+
+
+# ─── Admin status page counters ──────────────────────────────────────
+# One aggregate query, cached; write paths below call dashboard.invalidate().
+dashboard = Dashboard(ttl=float(os.getenv("DASHBOARD_TTL", 60)))
+
+
+# ─── Password hashing ────────────────────────────────────────────────
+# PBKDF2 runs on its own bounded pool; PBKDF2_ROUNDS raises/lowers the
+# cost and older hashes are upgraded on the next successful login.
+hasher = PasswordHasher(
+    rounds=int(os.getenv("PBKDF2_ROUNDS", 0)) or None,
+    workers=int(os.getenv("PBKDF2_WORKERS", 2)),
+    max_pending=int(os.getenv("PBKDF2_MAX_PENDING", 32)),
 )
-cursor = conn.cursor()
+
+
+@app.errorhandler(HashingBusy)
+def hashing_busy(exc):
+    return "Too many sign-ins at once, please retry in a moment.", 503, {"Retry-After": "2"}
+
+
+# ─── Checkout context ────────────────────────────────────────────────
+# The booking being paid for travels in the session (set by booking())
+# or in the URL; never in module globals shared between users.
+bookings = BookingResolver(ttl=float(os.getenv("BOOKING_CACHE_TTL", 300)))
+
+
+# ─── Routes and fares ────────────────────────────────────────────────
+# Route distances and per-car rates, parsed once; a fare is two lookups.
+fares = FareMatrix(refresh_interval=float(os.getenv("FARES_REFRESH", 300)))
+with pool.connection() as _conn:
+    fares.load(_conn)
+
+
+def get_fares():
+    """Return the fare matrix, reloading it when it has gone stale."""
+    if fares.needs_refresh():
+        fares.load(get_db())
+    return fares
+
+
+def get_availability():
+    """Return the availability index, reloading it when it has gone stale."""
+    if availability.needs_refresh():
+        availability.load(get_db())
+    return availability
+
+
+# Route × car type price grid for /api/quote, rebuilt when fares change.
+quotes = QuoteService(fares, availability)
+
 master_password = os.getenv("MASTER_PASSWORD", "")
 payment_type = ""
 payment_status = ["Paid", "Not Paid"]
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", 50))
+MAX_PAGE_SIZE = 500
+
+def _render_listing(template, listing):
+    """Render one keyset page of an admin table listing.
+
+    Query string: ``size`` (rows per page), ``order`` (asc/desc) and an
+    ``after``/``before`` cursor taken from the template's pager links.
+    """
+    size = request.args.get("size", PAGE_SIZE, type=int)
+    try:
+        page = keyset_page(
+            get_db(), listing,
+            size=max(1, min(size, MAX_PAGE_SIZE)),
+            order=request.args.get("order"),
+            after=request.args.get("after"),
+            before=request.args.get("before"),
+        )
+    except BadCursor:
+        abort(400)
+    return render_template(template, data=page.rows, page=page)
+
 
 def checkstring(inputstring):
     return not any(char.isalpha() for char in inputstring)
@@ -97,21 +286,35 @@ class User(UserMixin):
     def is_admin(self):
         return self.role == "Admin"
 
+# userId -> (row, role). Only hits are cached; write paths that change or
+# remove a user call user_cache.invalidate(userId).
+user_cache = TTLCache(
+    maxsize=int(os.getenv("USER_CACHE_SIZE", 4096)),
+    ttl=float(os.getenv("USER_CACHE_TTL", 60)),
+)
+
+
 @login_manager.user_loader
 def load_user(user_id: str):
-    cur = conn.cursor(MySQLdb.cursors.DictCursor)
-    # try customer first
-    cur.execute("SELECT * FROM Cust_User WHERE userId = %s", (user_id,))
-    row = cur.fetchone()
-    if row:
-        return User(row, "Customer")
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return User(*cached)
 
-    cur.execute("SELECT * FROM Admin_User WHERE userId = %s", (user_id,))
+    cur = get_db().cursor(backend.dict_cursor)
+    # one round trip; a customer wins over an admin with the same id
+    cur.execute("""
+        SELECT userId, fName, lName, 'Customer' AS role FROM Cust_User WHERE userId = %s
+        UNION ALL
+        SELECT userId, fName, lName, 'Admin'    AS role FROM Admin_User WHERE userId = %s
+        ORDER BY role DESC
+        """, (user_id, user_id))
     row = cur.fetchone()
-    if row:
-        return User(row, "Admin")
+    cur.close()
+    if not row:
+        return None
 
-    return None
+    user_cache.put(user_id, (row, row["role"]))
+    return User(row, row["role"])
 
 
 def roles_required(*roles):
@@ -163,7 +366,7 @@ def adduser():
     # ------------------------------------------------------------------  
     # 2) Business rules that depend on DB state ------------------------
     # ------------------------------------------------------------------
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
     cursor.execute("SELECT 1 FROM Cust_User WHERE userId = %s", (data["username"],))
     if cursor.fetchone():
         flash("Sorry, that username is already taken.", category="error")
@@ -172,29 +375,32 @@ def adduser():
     # ------------------------------------------------------------------  
     # 3) Persist the new user ------------------------------------------
     # ------------------------------------------------------------------
-    hash_password = pbkdf2_sha256.hash(data["password"])
+    hash_password = hasher.hash(data["password"])
 
     # AES-encrypt the security answer exactly as before
     cipher = AES.new(b"1234567890123456", AES.MODE_ECB)
     padded = data["answer"].rjust(32).encode("utf-8")
     enc_ans = base64.b64encode(cipher.encrypt(padded)).decode("utf-8")
 
-    current_date = datetime.datetime.now().strftime("%d-%m-%Y")
+    today = datetime.date.today()
 
+    # registration_Date stays filled (dd-mm-YYYY) until the typed column
+    # registered_on has been backfilled everywhere
     cursor.execute(
         """
         INSERT INTO Cust_User
             (userId, fName, lName, emailId, phone,
-             registration_Date, password, reset_Question, reset_Ans_Type)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
+             registration_Date, registered_on, password, reset_Question, reset_Ans_Type)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """,
         (
             data["username"], data["FName"], data["lName"], data["email"],
-            data["phone"], current_date, hash_password,
+            data["phone"], today.strftime("%d-%m-%Y"), today, hash_password,
             str(data["squestion"]), enc_ans,
         ),
     )
-    conn.commit()
+    get_db().commit()
+    dashboard.invalidate()
 
     # ------------------------------------------------------------------  
     # 4) Side-effects (welcome email) ----------------------------------
@@ -208,7 +414,7 @@ def adduser():
         "Thank you for signing up with Car Rental Service.\n"
         "You can now book a cab whenever you need!"
     )
-    mail.send(msg)
+    outbox.send(msg)
 
     flash("Successfully registered — please sign in.", category="success")
     return redirect(url_for("signin"))
@@ -221,7 +427,6 @@ def adduser():
 @app.route('/login')
 
 def signin():
-	print("entered")
 	return render_template('signin.html')
 
 @app.route("/logout")
@@ -246,31 +451,34 @@ def sign():
     username = form.cleaned_data["username"]
     password = form.cleaned_data["password"]
 
-    cur = conn.cursor(MySQLdb.cursors.DictCursor)
+    cur = get_db().cursor(backend.dict_cursor)
 
     # unified lookup
     cur.execute("""
-        SELECT * , 'Customer' AS role FROM Cust_User WHERE userId = %s
+        SELECT userId, fName, lName, password, 'Customer' AS role FROM Cust_User WHERE userId = %s
         UNION ALL
-        SELECT * , 'Admin'    AS role FROM Admin_User WHERE userId = %s
+        SELECT userId, fName, lName, password, 'Admin'    AS role FROM Admin_User WHERE userId = %s
         """, (username, username))
     record = cur.fetchone()
 
-    if not record or not pbkdf2_sha256.verify(password, record["password"]):
+    ok, new_hash = hasher.verify(password, record["password"]) if record else (False, None)
+    if not ok:
         flash("Invalid username or password.", "error")
         return render_template("signin.html"), 401
+    if new_hash:
+        # stored with outdated PBKDF2 parameters: upgrade while we have the plaintext
+        table = "Admin_User" if record["role"] == "Admin" else "Cust_User"
+        cur.execute(f"UPDATE {table} SET password = %s WHERE userId = %s", (new_hash, username))
+        get_db().commit()
 
     user = User(record, record["role"])
     login_user(user, remember=False)        # remember=False → 30‑min absolute lifetime
     flash("Logged in successfully!", "success")
 
-    # audit trail
+    # audit trail (written behind, in batches)
     now = datetime.datetime.now()
-    cur.execute("""
-        INSERT INTO Login_History (user, userId, Date, Time)
-        VALUES (%s, %s, %s, %s)""",
-        (user.role, user.id, now.strftime("%d-%m-%Y"), now.strftime("%H:%M:%S")))
-    conn.commit()
+    login_audit.append((user.role, user.id, now.strftime("%d-%m-%Y"), now.strftime("%H:%M:%S"),
+                       now.replace(microsecond=0)))
 
     # role‑based landing page
     return (
@@ -285,7 +493,6 @@ def sign():
 @app.route('/resetpassword/',methods=['GET','POST'])
 
 def resetdriver():
-	print("Entered")
 	return render_template("resetpassword.html")
 
 @app.route("/reset/", methods=["POST"])
@@ -304,7 +511,7 @@ def resetpasswordform():
     answer_in  = data["answer"]
     new_plain  = data["password"]
 
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # ── 2. Locate user (customer -or- admin) ──────────────────────────
     cursor.execute(
@@ -340,12 +547,13 @@ def resetpasswordform():
         return render_template("resetpassword.html"), 401
 
     # ── 5. Update password ────────────────────────────────────────────
-    new_hash = pbkdf2_sha256.hash(new_plain)
+    new_hash = hasher.hash(new_plain)
     cursor.execute(
         f"UPDATE {table} SET password = %s WHERE userId = %s",
         (new_hash, username),
     )
-    conn.commit()
+    get_db().commit()
+    user_cache.invalidate(username)
 
     flash("Password successfully changed — please log in.", "success")
     return render_template("signin.html")
@@ -356,9 +564,8 @@ def resetpasswordform():
 @login_required
 def bookingdriver():
 	
-	print("entered")
 	#booking()
-	return render_template('booking.html')
+	return render_template('booking.html', cab_routes=get_fares().routes())
 	
 	
 @app.route('/bookingNow/', methods=['POST'])
@@ -371,7 +578,7 @@ def booking():
     if not form.is_valid():
         for e in form.errors:
             flash(e, category="error")
-        return render_template("booking.html"), 400
+        return render_template("booking.html", cab_routes=get_fares().routes()), 400
 
     data = form.cleaned_data     # safe, canonicalised values
     # data example:
@@ -382,13 +589,13 @@ def booking():
     # ------------------------------------------------------------------  
     # 2) Business checks (must hit DB) ---------------------------------
     # ------------------------------------------------------------------
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # Confirm user exists
     cursor.execute("SELECT 1 FROM Cust_User WHERE userId = %s", (data["userId"],))
     if not cursor.fetchone():
         flash("Entered username does not exist.", category="error")
-        return render_template("booking.html"), 404
+        return render_template("booking.html", cab_routes=get_fares().routes()), 404
 
     # Fetch customer meta
     cursor.execute(
@@ -401,65 +608,46 @@ def booking():
     CAB_LIST = ["Hatchback", "Sedan", "SUV"]
     cab_name = CAB_LIST[data["cab"]]
 
-    # Validate car & driver availability
-    cursor.execute(
-        "SELECT Car_id FROM Car WHERE status = 'Available' AND Car_type = %s LIMIT 1",
-        (cab_name,),
-    )
-    car_row = cursor.fetchone()
-    if not car_row:
-        return redirect(url_for("allbooked"))  # shows *Sorry, all cars booked* page
-    carid = car_row[0]
-
-    cursor.execute("SELECT driverId FROM Driver WHERE status = 'Available' LIMIT 1")
-    drv_row = cursor.fetchone()
-    if not drv_row:
-        return redirect(url_for("allbooked"))
-    driverid = drv_row[0]
+    route = get_fares().route(data["route"])
+    if route is None:
+        flash("Please select a valid cab route.", category="error")
+        return render_template("booking.html", cab_routes=get_fares().routes()), 400
+    route_name = route.name
 
     # ------------------------------------------------------------------  
-    # 3) Persist booking; lock car/driver -------------------------------
+    # 3) Reserve car/driver for the dates and persist in one transaction
     # ------------------------------------------------------------------
-    cursor.execute("UPDATE Car    SET status='BOOKED' WHERE Car_id   = %s", (carid,))
-    cursor.execute("UPDATE Driver SET status='BOOKED' WHERE driverId = %s", (driverid,))
-
-    cab_routes = ['Nashik-Pune', 'Nashik-Mumbai', 'Nashik-Nagpur',
-                  'Nashik-Dhule', 'Nashik-Aurangabad']
-    route_name = cab_routes[data["route"]]
+    start_date = datetime.date.fromisoformat(data["startDate"])
+    end_date   = datetime.date.fromisoformat(data["endDate"])
+    reserved = reserve_car_and_driver(
+        get_db(), get_availability(), cab_name, start_date, end_date
+    )
+    if reserved is None:
+        return redirect(url_for("allbooked"))  # shows *Sorry, all cars booked* page
+    carid, driverid = reserved
 
     cursor.execute(
         """
         INSERT INTO Booking
             (userId, Cab, startDate, endDate, Pickup_time,
+             start_on, end_on, pickup_at,
              Pickup_location, Drop_off_location, driverId, carid, cab_route)
-        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+        VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
         """,
         (
             data["userId"], cab_name, data["startDate"], data["endDate"],
-            data["time"], data["pickupLocation"], data["dropoffLocation"],
+            data["time"], start_date, end_date, data["time"],
+            data["pickupLocation"], data["dropoffLocation"],
             driverid, carid, route_name,
         ),
     )
-    conn.commit()
     new_id = cursor.lastrowid
+    get_db().commit()
+    availability.add_booking(new_id, carid, driverid, start_date, end_date)
+    dashboard.invalidate()
 
-    # store
-    session["custid"]      = data["userId"]
-    session["driverid"]    = driverid
-    session["carid"]       = carid
-    session["booking_id"]  = new_id
-    # read
-    custid     = session.get("custid")
-    driverID   = session.get("driverid")
-    CARID      = session.get("carid")
-    b_actual_id = session.get("booking_id")
-
-    cursor.execute(
-        "SELECT bookingId FROM Booking WHERE driverId=%s AND carid=%s "
-        "ORDER BY bookingId DESC LIMIT 1",
-        (driverid, carid),
-    )
-    b_actual_id = cursor.fetchone()[0]
+    # the payment and invoice pages pick the booking up from here
+    session["booking_id"] = new_id
 
     flash("Booking created — proceed to payment.", category="success")
     return redirect(url_for("paymentdriver"))
@@ -469,38 +657,132 @@ def booking():
 
 @app.route("/displaybooking/",methods=['GET','POST'])
 def displaybooking():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Booking""")
-	data5 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("displaybooking.html",data = data5)
+	return _render_listing("displaybooking.html", LISTINGS["bookings"])
 	
 #--------------------------------------------DISPLAY BOOKING END--------------------------------------------------------------------
 #--------------------------------------------ADMIN PAGE -------------------------------------------------------------
 @app.route('/adminpage/',methods=['GET','POST'])
 @roles_required("Admin")
 def adminpage():
-	print("Entered") 	#Testing
 	
 	return render_template("adminpage.html")
+
+
+@app.route("/stats/", methods=["GET"])
+@roles_required("Admin")
+def runtime_stats():
+    """JSON snapshot of runtime counters used for capacity sizing."""
+    return jsonify(
+        db_pool=pool.stats(),
+        pdf_cache=pdf_cache.stats(),
+        pdf_render=render_service.stats(),
+        mail_outbox=outbox.stats(),
+        dashboard=dashboard.stats(),
+        user_cache=user_cache.stats(),
+        passwords=hasher.stats(),
+        login_audit=login_audit.stats(),
+        booking_cache=bookings.stats(),
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Prometheus scrape endpoint (bearer METRICS_TOKEN if one is set)."""
+    return metrics.view()
+
+
+def _service_gauges():
+    lines = []
+    for prefix, stats in (("db_pool", pool.stats), ("pdf_render", render_service.stats),
+                          ("mail_outbox", outbox.stats), ("login_audit", login_audit.stats)):
+        lines.extend(gauges(prefix, stats()))
+    return lines
+
+
+metrics.collectors.append(_service_gauges)
+
+
+@app.route("/api/quote", methods=["GET"])
+def api_quote():
+    """Price ranges for every route and car type in one response.
+
+    Each ``span=YYYY-MM-DD/YYYY-MM-DD`` parameter (repeatable) adds a grid
+    restricted to the cars still free on those dates.
+    """
+    spans = []
+    for raw in request.args.getlist("span"):
+        try:
+            start, end = (datetime.date.fromisoformat(p) for p in raw.split("/", 1))
+        except ValueError:
+            abort(400)
+        if end < start:
+            abort(400)
+        spans.append((start, end))
+    if len(spans) > quotes.max_spans:
+        abort(400)
+
+    get_fares()
+    if spans:
+        get_availability()
+    elif f"fares-{quotes.version}" in request.if_none_match:
+        return app.response_class(status=304)
+
+    response = jsonify(quotes.quote(spans))
+    if spans:
+        response.cache_control.max_age = 5
+    else:
+        response.set_etag(f"fares-{quotes.version}")
+        response.cache_control.max_age = 60
+    response.cache_control.public = True
+    return response
+
+
+@app.route("/export/<dataset>.<fmt>", methods=["GET"])
+@roles_required("Admin")
+def export_data(dataset, fmt):
+    """Stream bookings/payments/logins as CSV or NDJSON.
+
+    Optional ``from``/``to`` query parameters (YYYY-MM-DD) bound the
+    export by date; rows come straight off a server-side cursor.
+    """
+    export = EXPORTS.get(dataset)
+    if export is None or fmt not in CONTENT_TYPES:
+        abort(404)
+    # args.get(type=...) maps unparseable values to None
+    start = request.args.get("from", type=datetime.date.fromisoformat)
+    end = request.args.get("to", type=datetime.date.fromisoformat)
+    if (request.args.get("from") and start is None) or (request.args.get("to") and end is None):
+        abort(400)
+
+    def generate():
+        finished = False
+        try:
+            yield from stream_export(get_db(), backend.stream_cursor, export, fmt, start, end)
+            finished = True
+        finally:
+            if not finished:
+                # client went away mid-stream: the unread result set makes
+                # this connection useless, so close it instead of pooling it
+                db = g.pop("db", None)
+                if db is not None:
+                    pool.release(db, discard=True)
+
+    response = app.response_class(stream_with_context(generate()), content_type=CONTENT_TYPES[fmt])
+    stamp = datetime.date.today().isoformat()
+    response.headers["Content-Disposition"] = f'attachment; filename="{dataset}-{stamp}.{fmt}"'
+    response.headers["X-Accel-Buffering"] = "no"      # let nginx pass chunks straight through
+    return response
 #---------------------------------END ADMIN PAGE-----------------------------------------------
 
 #----------------------------------LOGIN HISTORY----------------------------------------------
 @app.route("/logindetails/",methods=['GET','POST'])
 @roles_required("Admin")
 def logindetails():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Login_History""")
-	data5 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("loginhistory.html",data = data5)
+	return _render_listing("loginhistory.html", LISTINGS["logins"])
 #------------------------------------FEEDBACK FORM------------------------------------------------------------
 
 @app.route('/feedback/',methods=['GET','POST'])
 def feedbackdriver():
-	print("Entered") 	#Testing
 	
 	return render_template("feedback.html")
 	
@@ -519,7 +801,7 @@ def feedbackform():
     ratings_lookup = ["Excellent", "Good", "Neutral", "Poor"]
     user_rating = ratings_lookup[data["rating"]]
 
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # Verify user exists (customer only)
     cursor.execute("SELECT fName, lName FROM Cust_User WHERE userId = %s", (data["userid"],))
@@ -548,7 +830,7 @@ def feedbackform():
             today,
         ),
     )
-    conn.commit()
+    get_db().commit()
 
     flash("Feedback successfully sent!", category="success")
     return render_template("feedback.html")
@@ -570,7 +852,7 @@ def addadmin():
         return render_template("addadmin.html"), 400
 
     data = form.cleaned_data
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # ── 1. Uniqueness check ───────────────────────────────────────────
     cursor.execute("SELECT 1 FROM Admin_User WHERE userId = %s", (data["username"],))
@@ -579,7 +861,7 @@ def addadmin():
         return render_template("addadmin.html"), 409
 
     # ── 2. Hash + encrypt sensitive fields ────────────────────────────
-    hash_password = pbkdf2_sha256.hash(data["password"])
+    hash_password = hasher.hash(data["password"])
     enc_ans       = encrypt_answer(data["answer"])      # CBC, random IV
 
     today = datetime.datetime.now().strftime("%d-%m-%Y")
@@ -598,7 +880,8 @@ def addadmin():
             hash_password, str(data["squestion"]), enc_ans,
         ),
     )
-    conn.commit()
+    get_db().commit()
+    dashboard.invalidate()
 
     flash("Admin successfully registered!", "success")
     return render_template("addadmin.html")
@@ -608,12 +891,7 @@ def addadmin():
 @app.route("/admindetails/",methods=['GET','POST'])
 @roles_required("Admin")
 def admindetails():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Admin_User""")
-	data = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("admindetails.html",data = data)
+	return _render_listing("admindetails.html", LISTINGS["admins"])
 #------------------------------------------------DISPLAY ADMIN ENDS--------------------------------------------------------------------------
 
 #------------------------------------------------DELETE ADMIN---------------------------------------------------------------------------------------
@@ -625,7 +903,7 @@ def deleteadmindriver():
 @app.route("/deleteADMIN/",methods=['GET','POST'])
 @roles_required("Admin")
 def deleteadmin():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	mpassword = request.form["mpassword"]
 	dusername = str(request.form["dusername"])
 	husername = request.form["husername"]
@@ -643,8 +921,9 @@ def deleteadmin():
 		
 	if master_password == mpassword:
 		cursor.execute("""DELETE FROM Admin_User WHERE userId = %s""",[dusername])
-		conn.commit()
-		print(mpassword,dusername,husername)
+		get_db().commit()
+		user_cache.invalidate(dusername)
+		dashboard.invalidate()
 		flash("Admin Successfully Deleted !!!")
 		return render_template("deleteadmin.html")
 	else:
@@ -658,24 +937,14 @@ def deleteadmin():
 @app.route("/feedbackdisplay/",methods=['GET','POST'])
 
 def feedbackdisplay():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Feedback""")
-	data1 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("feedbackdisplay.html",data = data1)
+	return _render_listing("feedbackdisplay.html", LISTINGS["feedback"])
 	
 #------------------------------------FEEDBACK DISPLAY END -------------------------------------------------------------------------------
 #-----------------------------------Display Customer Details----------------------------
 @app.route("/displaycustomer/",methods=['GET','POST'])
 
 def displaycustomer():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Cust_User""")
-	data1 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("displaycustomers.html",data = data1)
+	return _render_listing("displaycustomers.html", LISTINGS["customers"])
 #-------------------------------------DELETE CUSTOMER USER-----------------------------------------------------------------------------
 @app.route("/deleteuser/",methods=['GET','POST'])
 
@@ -685,7 +954,7 @@ def deleteuserdriver():
 @app.route("/deleteUSER/",methods=['GET','POST'])
 
 def deleteuser():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	dusername1 = str(request.form["dusername"])
 	husername1 = request.form["husername"]
 	
@@ -702,7 +971,9 @@ def deleteuser():
 		return render_template("deleteuser.html")
 		
 	cursor.execute("""DELETE FROM Cust_User WHERE userId = %s""",[dusername1])
-	conn.commit()
+	get_db().commit()
+	user_cache.invalidate(dusername1)
+	dashboard.invalidate()
 	#print(mpassword,dusername,husername)
 	cursor.close()
 	flash("Customer Successfully Deleted !!!")
@@ -730,7 +1001,7 @@ def addcarform():
     car_types = ["Sedan", "Hatchback", "SUV"]
     car_type_name = car_types[data["type"]]
 
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # Business-level uniqueness checks
     cursor.execute(
@@ -745,8 +1016,8 @@ def addcarform():
         """
         INSERT INTO Car
             (Car_id, model_name, registeration_no,
-             seating_capacity, Car_type, price_per_km)
-        VALUES (%s, %s, %s, %s, %s, %s)
+             seating_capacity, Car_type, price_per_km, rate_per_km)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
         """,
         (
             data["carid"],
@@ -755,9 +1026,13 @@ def addcarform():
             data["seating"],
             car_type_name,
             data["price"],
+            data["price"],
         ),
     )
-    conn.commit()
+    get_db().commit()
+    availability.add_car(data["carid"], car_type_name)
+    fares.set_car(data["carid"], car_type_name, data["price"])
+    dashboard.invalidate()
 
     flash("New car successfully added!", category="success")
     return render_template("addcar.html")
@@ -770,12 +1045,7 @@ def addcarform():
 @app.route("/displaycars/",methods=['GET','POST'])
 
 def displaycars():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Car""")
-	data2 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("displaycars.html",data = data2)
+	return _render_listing("displaycars.html", LISTINGS["cars"])
 #--------------------------------------------DISPLAY CAR ENDS-------------------------------------------------------------------------------
 
 #---------------------------------------------DELETE CAR----------------------------------------------------------------------------------
@@ -788,7 +1058,7 @@ def deletecardriver():
 @app.route("/deleteCARS/",methods=['GET','POST'])
 
 def deletecar():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	carid = str(request.form["carid"])
 	
 	cflag = False
@@ -804,7 +1074,10 @@ def deletecar():
 		return render_template("deletecars.html")
 		
 	cursor.execute("""DELETE FROM Car WHERE Car_id = %s""",[carid])
-	conn.commit()
+	get_db().commit()
+	availability.remove_car(carid)
+	fares.remove_car(carid)
+	dashboard.invalidate()
 	#print(mpassword,dusername,husername)
 	cursor.close()
 	flash("Car Successfully Deleted !!!")
@@ -830,7 +1103,7 @@ def adddriverform():
         return render_template("adddriver.html"), 400
 
     data = form.cleaned_data
-    cursor = conn.cursor()
+    cursor = get_db().cursor()
 
     # Ensure license number is unique
     cursor.execute("SELECT 1 FROM Driver WHERE licence_no = %s", (data["license"],))
@@ -851,7 +1124,9 @@ def adddriverform():
             data["dage"],
         ),
     )
-    conn.commit()
+    get_db().commit()
+    availability.add_driver(cursor.lastrowid)
+    dashboard.invalidate()
     flash("New driver successfully added!", category="success")
     return render_template("adddriver.html")
 
@@ -862,12 +1137,7 @@ def adddriverform():
 @app.route("/displaydrivers/",methods=['GET','POST'])
 
 def displaydriver():
-	cursor = conn.cursor()
-	cursor.execute("""SELECT * FROM Driver""")
-	data1 = cursor.fetchall()
-	cursor.close()
-	
-	return render_template("displaydrivers.html",data = data1)
+	return _render_listing("displaydrivers.html", LISTINGS["drivers"])
 	
 #----------------------------DISPLAY DRIVER ENDS------------------------------------------------------------
 
@@ -880,7 +1150,7 @@ def delete_driver():
 @app.route("/deleteDriver/",methods=['GET','POST'])
 
 def deletedriver():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	driverid = str(request.form["driverid"])
 	
 	'''dflag = False
@@ -895,9 +1165,18 @@ def deletedriver():
 		flash("Entered DriverId does not Exist !!!")
 		return render_template("deletedriver.html")
 	'''
-	cursor.execute("""DELETE FROM Booking WHERE driverId = %s""",[driverid])	
+	# driverId is an integer column; anything else cannot name a driver,
+	# and must be rejected before the DELETEs rather than after the commit
+	if not driverid.strip().isdigit():
+		flash("Entered DriverId does not Exist !!!")
+		return render_template("deletedriver.html")
+	driverid = int(driverid)
+	cursor.execute("""DELETE FROM Booking WHERE driverId = %s""",[driverid])
 	cursor.execute("""DELETE FROM Driver WHERE driverId = %s""",[driverid])
-	conn.commit()
+	get_db().commit()
+	bookings.clear()
+	availability.remove_driver(driverid)
+	dashboard.invalidate()
 	#print(mpassword,dusername,husername)
 	cursor.close()
 	flash("Driver Successfully Deleted !!!")
@@ -908,7 +1187,6 @@ def deletedriver():
 @app.route('/aboutpage/',methods=['GET','POST'])
 
 def aboutpage():
-	print("Entered") 	#Testing
 	
 	return render_template("about.html")	
 	
@@ -919,8 +1197,10 @@ def aboutpage():
 @app.route("/payment",methods=["GET","POST"])
 @login_required
 def paymentdriver():
-	print("ENTERED")
-	
+	# already paid (Back, reload, a second tab): show the original payment
+	booking_id = session.get("booking_id")
+	if booking_id is not None and _is_paid(booking_id):
+		return redirect(_invoice_url(booking_id))
 	return render_template("payment.html")
 	
 # ─── shared helper ──────────────────────────────────────────────────────────
@@ -930,48 +1210,98 @@ def _process_payment(payment_type: str, *, status: str):
 
     Returns a redirect() response to /generateinvoice (or back to /payment on error).
     """
-    km_map = {
-        "Nashik-Pune": 211,
-        "Nashik-Mumbai": 165,
-        "Nashik-Nagpur": 680,
-        "Nashik-Dhule": 144,
-        "Nashik-Aurangabad": 160,
-    }
-
-    cursor = conn.cursor()
-
-    # Find the latest booking for the user / car / driver trio.
-    cursor.execute(
-        """
-        SELECT bookingId, cab_route, carid
-          FROM Booking
-         WHERE userId = %s AND carid = %s AND driverId = %s
-      ORDER BY bookingId DESC
-         LIMIT 1
-        """,
-        (custid, CARID, driverID),
-    )
-    row = cursor.fetchone()
-    if not row:
+    ref = _checkout_booking()
+    if ref is None:
         flash("Booking context lost – please start over.", "error")
         return render_template("payment.html"), 404
 
-    booking_id, cab_route, carid = row
-    km = km_map[cab_route]
+    booking_id = ref.booking_id
+    total_amount = get_fares().fare(ref.route, ref.car_id)
+    if total_amount is None:
+        flash("No fare is configured for this route and car.", "error")
+        return render_template("payment.html"), 409
 
-    cursor.execute("SELECT price_per_km FROM Car WHERE Car_id = %s", (carid,))
-    price_per_km = int(cursor.fetchone()[0])
-    total_amount = km * price_per_km
+    # One Payment row per booking: the key is the booking itself, so a
+    # resubmitted form (Back, reload, a second tab) hits the UNIQUE index
+    # however many times /payment was rendered.
+    key = f"booking:{booking_id}"
 
+    cursor = get_db().cursor()
+    try:
+        cursor.execute(
+            "INSERT INTO Payment (payment_type, status, bookingId, total_amount, idempotency_key) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            (payment_type, status, booking_id, total_amount, key),
+        )
+        get_db().commit()
+    except Exception as exc:
+        if not backend.is_duplicate_key(exc):
+            raise
+        get_db().rollback()
+        # only a "Not Paid" net banking attempt may be settled by a retry
+        settled = 0
+        if status == "Paid":
+            settled = cursor.execute(
+                "UPDATE Payment SET payment_type = %s, status = %s, total_amount = %s "
+                "WHERE idempotency_key = %s AND status <> 'Paid'",
+                (payment_type, status, total_amount, key),
+            )
+            get_db().commit()
+        if not settled:
+            # a retry of a payment that already went through: same result, no side effects
+            return redirect(_invoice_url(booking_id))
+    pdf_cache.invalidate(booking_id)
+    dashboard.invalidate()
+
+    # confirmation goes out once per payment, not on every invoice view
+    record = load_invoice(get_db(), booking_id)
+    if record is not None:
+        msg = Message(
+            "Your Cab is Successfully Booked !!!",
+            sender="Car Rentel Services",
+            recipients=[record.customer_email],
+        )
+        msg.body = "Thank you for Booking Cab from Us.Your Booking ID is " + str(booking_id)
+        outbox.send(msg)
+
+    flash("Payment recorded.", "success")
+    return redirect(_invoice_url(booking_id))
+
+
+def _invoice_url(booking_id) -> str:
+    # /generateinvoice/<int:booking_id> is GET-only: built while handling a
+    # POST without _method, url_for falls back to /generateinvoice/?booking_id=
+    return url_for("invoice", booking_id=booking_id, _method="GET")
+
+
+def _is_paid(booking_id) -> bool:
+    cursor = get_db().cursor()
     cursor.execute(
-        "INSERT INTO Payment (payment_type, status, bookingId, total_amount) "
-        "VALUES (%s, %s, %s, %s)",
-        (payment_type, status, booking_id, total_amount),
+        "SELECT 1 FROM Payment WHERE bookingId = %s AND status = 'Paid' LIMIT 1", (booking_id,)
     )
-    conn.commit()
+    paid = cursor.fetchone() is not None
+    cursor.close()
+    return paid
 
-    flash("Payment recorded.", "success")
-    return redirect(url_for("invoice"))  # existing route “/generateinvoice/”
+
+def _checkout_booking(booking_id=None):
+    """Resolve the booking a checkout page is about, or None.
+
+    Without *booking_id* it is the booking this session just created.
+    An explicit id (from the URL) must belong to the signed-in customer;
+    admins may open any booking.
+    """
+    if booking_id is None:
+        booking_id = session.get("booking_id")
+        if booking_id is None:
+            return None
+    ref = bookings.get(get_db(), booking_id)
+    if ref is None:
+        return None
+    if (ref.user_id != current_user.id and not current_user.is_admin()
+            and booking_id != session.get("booking_id")):
+        return None
+    return ref
 
 
 # ─── CREDIT CARD ────────────────────────────────────────────────────────────
@@ -1017,75 +1347,25 @@ def debit_payment():
 #-----------------------INVOICE ------------------------------------------------------------------
 
 @app.route("/generateinvoice/",methods=['GET','POST'])
+@app.route("/generateinvoice/<int:booking_id>",methods=['GET'])
+@query_budget(queries=4, repeats=2)
 @login_required
-def invoice():
-	cursor = conn.cursor()
-	
-	print("CUSTID : ",custid)
-	#user_id=request.form['user']
-	cursor.execute("""SELECT carId FROM Booking WHERE bookingId = %s""",[b_actual_id])
-	carr = cursor.fetchall()
-	carrid = carr[0][0]
-	#print(bookingid)
-	
-	cursor.execute("""SELECT model_name FROM Car WHERE car_id = %s""",[carrid])
-	modell = cursor.fetchall()
-	model = modell[0][0]
-	#print(bookingId)
-	#cursor.execute("""select Payment_id from Payment where status=%s and payment_type=%s""",(payment,payment_type))
-	#pay=cursor.fetchall()
-	#payment_id=pay[0][0]
-	cursor.execute("""SELECT fName,lName FROM Cust_User where userId=%s""",[custid])
-	#data5 = cursor.fetchall()
-	data5 = cursor.fetchall()
-	cursor.execute("""SELECT emailId FROM Cust_User WHERE userId = %s""",[custid])
-	emaill = cursor.fetchall()
-	semail = emaill[0][0]
-	print(data5)
-	data10=data5[0][0] +" "+data5[0][1]
-	cursor.execute("""SELECT phone FROM Cust_User where userId=%s""",[custid])
-	p_no=cursor.fetchall()
-	p_no1=p_no[0][0]
-	print(p_no)
-	cursor.execute("""SELECT Cab,startdate,endDate,Pickup_time,Pickup_location,Drop_off_location FROM Booking where bookingId=%s""",[b_actual_id])
-	union=cursor.fetchall()
-	Cab=union[0][0]
-	Sd=union[0][1]
-	Ed=union[0][2]
-	P_time=union[0][3]
-	P_loc=union[0][4]
-	D_loc=union[0][5]
-	cursor.execute("""SELECT driverId FROM Booking where  bookingId=%s""",[b_actual_id])
-	d_id=cursor.fetchall()
-	driverid=d_id[0][0]
-	cursor.execute("""SELECT fName,lName FROM Driver where driverId=%s""",[driverid])
-	d_name=cursor.fetchall()
-	d_full_name=d_name[0][0]+" "+d_name[0][1]
-	cursor.execute("""SELECT phone_no FROM Driver where driverId=%s""",[driverid])
-	dphone = cursor.fetchall()
-	dphoneno = dphone[0][0]
-	cursor.execute("""SELECT payment_type  FROM Payment where bookingId=%s""",[b_actual_id])
-	pType=cursor.fetchall()
-	print("PTYPE",pType)
-	P_type=pType[0][0]
-	
-	cursor.execute("""SELECT total_amount FROM Payment where bookingId=%s""",[b_actual_id])
-	amt1=cursor.fetchall()
-	amt=amt1[0][0]
-	bID = str(b_actual_id)
-	msg=Message("Your Cab is Successfully Booked !!!",sender="Car Rentel Services",recipients=[semail])
-	msg.body = "Thank you for Booking Cab from Us.Your Booking ID is "+bID
-	mail.send(msg)
-			
-	return render_template("invoice.html",data =b_actual_id,name=data10,cab=Cab,cab_model=model,sd=Sd,ed=Ed,p_time=P_time,p_loc=P_loc,d_loc=D_loc,dName=d_full_name,dphone1=dphoneno,p_type=P_type,amount = amt)
-	
-	
+def invoice(booking_id=None):
+    """Render the invoice for the session's (or the given) paid booking."""
+    ref = _checkout_booking(booking_id)
+    record = load_invoice(get_db(), ref.booking_id) if ref else None
+    if record is None:
+        abort(404)
+
+    return render_template("invoice.html", **record.template_context())
+
+
 #---------------------DISPLAY CAR STATUS ---------------------------------------
 
 @app.route("/displaycarstatus/",methods=['GET','POST'])
 
 def carstatusdriver():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	cursor.execute("""SELECT Car_id,model_name,registeration_no,Car_type,status FROM Car""")
 	data1 = cursor.fetchall()
 	cursor.close()
@@ -1106,7 +1386,7 @@ def changecarstatus():
 	ccflag = False
 	status_type = ['Available','Booked']
 	Car_Type = ""
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	carid1 = request.form["cari"]
 	
 	cursor.execute("""SELECT Car_id FROM Car WHERE Car_id = %s""",[carid1])
@@ -1124,7 +1404,9 @@ def changecarstatus():
 	status_Type = status_type[Type]
 	
 	cursor.execute("""UPDATE Car SET status = %s WHERE Car_id = %s""",(status_Type,carid1))
-	conn.commit()
+	get_db().commit()
+	availability.set_car_in_service(carid1, status_Type == 'Available')
+	dashboard.invalidate()
 	cursor.close()
 	#print(mpassword,dusername,husername)
 	flash("Car Status Successfully Changed !!!")
@@ -1135,7 +1417,7 @@ def changecarstatus():
 @app.route("/displaydriverstatus/",methods=['GET','POST'])
 
 def driverstatusdriver():
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	cursor.execute("""SELECT driverId,fName,lName,licence_no,status FROM Driver""")
 	data1 = cursor.fetchall()
 	cursor.close()
@@ -1156,15 +1438,13 @@ def changedriverstatus():
 	cdflag1 = False
 	status_type = ['Available','Booked']
 	Car_Type = ""
-	cursor = conn.cursor()
+	cursor = get_db().cursor()
 	driverid = request.form["driverid"]
 	driverid2 = int(driverid)
 	cursor.execute("""SELECT driverId FROM Driver WHERE driverId = %s""",[driverid])
 	did = cursor.fetchall()
 	did_list = list(did)
 	did_len = len(did_list)
-	print("DID LIST",did_list)
-	print("DRIVER ID :",driverid)
 	for a in range(0,did_len):
 		if did_list[a][0] == driverid2:
 			cdflag1 = True
@@ -1176,7 +1456,9 @@ def changedriverstatus():
 	status_Type = status_type[Type]
 	
 	cursor.execute("""UPDATE Driver SET status = %s WHERE driverId = %s""",(status_Type,driverid))
-	conn.commit()
+	get_db().commit()
+	availability.set_driver_in_service(driverid2, status_Type == 'Available')
+	dashboard.invalidate()
 	cursor.close()
 	#print(mpassword,dusername,husername)
 	flash("Driver Status Successfully Changed !!!")
@@ -1185,131 +1467,119 @@ def changedriverstatus():
 
 #-----------------------------------------------------------------------------------------------------------------
 @app.route('/pdf_download/',methods=['GET','POST'])
+@app.route('/pdf_download/<int:booking_id>',methods=['GET'])
+@query_budget(queries=4, repeats=2)
 @login_required
-def pdf_download():
-	cursor = conn.cursor()
-	
-	print("CUSTID : ",custid)
-	#user_id=request.form['user']
-	cursor.execute("""SELECT carId FROM Booking WHERE bookingId = %s""",[b_actual_id])
-	carr = cursor.fetchall()
-	carrid = carr[0][0]
-	#print(bookingid)
-	
-	cursor.execute("""SELECT model_name FROM Car WHERE car_id = %s""",[carrid])
-	modell = cursor.fetchall()
-	model = modell[0][0]
-	
-	#print(bookingId)
-	#cursor.execute("""select Payment_id from Payment where status=%s and payment_type=%s""",(payment,payment_type))
-	#pay=cursor.fetchall()
-	#payment_id=pay[0][0]
-	
-	cursor.execute("""SELECT fName,lName FROM Cust_User where userId=%s""",[custid])
-	#data5 = cursor.fetchall()
-	data5 = cursor.fetchall()
-
-	print(data5)
-	data10=data5[0][0] +" "+data5[0][1]
-	cursor.execute("""SELECT phone FROM Cust_User where userId=%s""",[custid])
-	p_no=cursor.fetchall()
-	p_no1=p_no[0][0]
-	print(p_no)
-	cursor.execute("""SELECT Cab,startdate,endDate,Pickup_time,Pickup_location,Drop_off_location FROM Booking where bookingId=%s""",[b_actual_id])
-	union=cursor.fetchall()
-	Cab=union[0][0]
-	Sd=union[0][1]
-	Ed=union[0][2]
-	P_time=union[0][3]
-	P_loc=union[0][4]
-	D_loc=union[0][5]
-	cursor.execute("""SELECT driverId FROM Booking where  bookingId=%s""",[b_actual_id])
-	d_id=cursor.fetchall()
-	driverid=d_id[0][0]
-	cursor.execute("""SELECT fName,lName FROM Driver where driverId=%s""",[driverid])
-	d_name=cursor.fetchall()
-	d_full_name=d_name[0][0]+" "+d_name[0][1]
-	cursor.execute("""SELECT phone_no FROM Driver where driverId=%s""",[driverid])
-	dphone = cursor.fetchall()
-	dphoneno = dphone[0][0]
-	cursor.execute("""SELECT payment_type  FROM Payment where bookingId=%s""",[b_actual_id])
-	pType=cursor.fetchall()
-	print("PTYPE",pType)
-	P_type=pType[0][0]
-	
-	cursor.execute("""SELECT total_amount FROM Payment where bookingId=%s""",[b_actual_id])
-	amt1=cursor.fetchall()
-	amt=amt1[0][0]
-	
-	html =  render_template("invoice.html",data = b_actual_id,name=data10,cab=Cab,cab_model=model,sd=Sd,ed=Ed,p_time=P_time,p_loc=P_loc,d_loc=D_loc,dName=d_full_name,dphone1=dphoneno,p_type=P_type,amount = amt)
-	return render_pdf(HTML(string=html))
+def pdf_download(booking_id=None):
+    ref = _checkout_booking(booking_id)
+    record = load_invoice(get_db(), ref.booking_id) if ref else None
+    if record is None:
+        abort(404)
+
+    etag = pdf_cache.key_for(record)
+    if etag in request.if_none_match:
+        return _invoice_pdf_response(None, record.booking_id, etag)
+
+    cached = pdf_cache.get(record.booking_id, etag)
+    if cached is not None:
+        return _invoice_pdf_response(cached, record.booking_id, etag)
+
+    # Render in the worker pool; wait for it unless the pool is already
+    # busy, in which case hand back a poll URL straight away.
+    html = render_template("invoice.html", **record.template_context())
+    wait = not render_service.saturated
+    try:
+        job = render_service.submit(
+            html, owner=current_user.id, booking_id=record.booking_id, etag=etag
+        )
+    except RenderQueueFull:
+        response = jsonify(status="busy", message="Invoice renderer is busy, please retry.")
+        response.status_code = 503
+        response.headers["Retry-After"] = "5"
+        return response
+
+    if wait:
+        try:
+            pdf = job.future.result(timeout=render_service.timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        else:
+            pdf_cache.put(record.booking_id, etag, pdf)
+            return _invoice_pdf_response(io.BytesIO(pdf), record.booking_id, etag)
+
+    job.future.add_done_callback(
+        lambda f: f.exception() is None and pdf_cache.put(record.booking_id, etag, f.result())
+    )
+    return _render_pending(job)
+
+
+@app.route('/pdf_download/jobs/<job_id>', methods=['GET'])
+@login_required
+def pdf_download_job(job_id):
+    """Poll target handed out by pdf_download() for queued renders."""
+    job = render_service.job(job_id)
+    if job is None or job.owner != current_user.id:
+        abort(404)
+    if not job.future.done():
+        return _render_pending(job)
+    if job.future.exception() is not None:
+        abort(500)
+
+    booking_id, etag = job.meta["booking_id"], job.meta["etag"]
+    cached = pdf_cache.get(booking_id, etag)
+    if cached is None:
+        pdf = job.future.result()
+        pdf_cache.put(booking_id, etag, pdf)
+        cached = io.BytesIO(pdf)
+    return _invoice_pdf_response(cached, booking_id, etag)
+
+
+def _render_pending(job):
+    poll_url = url_for("pdf_download_job", job_id=job.id)
+    response = jsonify(status="pending", poll=poll_url)
+    response.status_code = 202
+    response.headers["Location"] = poll_url
+    response.headers["Retry-After"] = "2"
+    return response
+
+
+def _invoice_pdf_response(pdf, booking_id, etag):
+    """Send an open PDF file (or a 304 when *pdf* is None) with its ETag."""
+    if pdf is None:
+        response = app.response_class(status=304)
+    else:
+        response = send_file(
+            pdf,
+            mimetype="application/pdf",
+            download_name=f"invoice-{booking_id}.pdf",
+            conditional=False,
+            etag=False,
+        )
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True     # always revalidate via If-None-Match
+    return response
 
 #------------------------------------------------STATUS PAGE--------------------------------------------------
 @app.route('/status/',methods=['GET','POST'])
-
+@query_budget(queries=2, repeats=2)
 def statusdriver():
-	most_used_route = ""
-	cursor = conn.cursor()
-	cursor.execute("""SELECT COUNT(*) FROM Cust_User""")
-	total_c = cursor.fetchall()
-	total_cust = total_c[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Car""")
-	total_ca = cursor.fetchall()
-	total_car1 = total_ca[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Car""")
-	total_ca = cursor.fetchall()
-	total_car1 = total_ca[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Admin_User""")
-	total_a = cursor.fetchall()
-	total_admin = int(total_a[0][0])
-	cursor.execute("""SELECT COUNT(*) FROM Driver""")
-	total_d = cursor.fetchall()
-	total_driver = int(total_d[0][0])
-	total_employ = total_driver + total_admin
-	cursor.execute("""SELECT COUNT(*) FROM Car WHERE status = 'Available' """)
-	cart = cursor.fetchall()
-	tcar = cart[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Driver WHERE status = 'Available' """)
-	drivert = cursor.fetchall()
-	drivert = drivert[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Booking""")
-	tbook = cursor.fetchall()
-	tbooking = tbook[0][0]
-	cursor.execute("""SELECT COUNT(*) FROM Booking WHERE cab_route = 'Nashik-Pune' """)
-	NP = cursor.fetchall()
-	NProute = int(NP[0][0])
-	cursor.execute("""SELECT COUNT(*) FROM Booking WHERE cab_route = 'Nashik-Nagpur' """)
-	NN = cursor.fetchall()
-	NNroute = int(NN[0][0])
-	cursor.execute("""SELECT COUNT(*) FROM Booking WHERE cab_route = 'Nashik-Mumbai' """)
-	NM = cursor.fetchall()
-	NMroute = int(NM[0][0])
-	cursor.execute("""SELECT COUNT(*) FROM Booking WHERE cab_route = 'Nashik-Aurangabad' """)
-	NA = cursor.fetchall()
-	NAroute = int(NA[0][0])
-	cursor.execute("""SELECT COUNT(*) FROM Booking WHERE cab_route = 'Nashik-Dhule' """)
-	ND = cursor.fetchall()
-	NDroute = int(ND[0][0])
-	if NProute > NNroute and NProute > NMroute and NProute > NAroute and NProute > NDroute:
-		most_used_route = "Nashik-Pune"
-	elif NNroute > NProute and NNroute > NMroute and NNroute > NAroute and NNroute > NDroute:
-		most_used_route = "Nashik-Nagpur"
-	elif NMroute > NNroute and NMroute > NProute and NMroute > NAroute and NMroute > NDroute:
-		most_used_route = "Nashik-Mumbai"
-	elif NAroute > NNroute and NAroute > NMroute and NAroute > NProute and NAroute > NDroute:
-		most_used_route = "Nashik-Aurangabad"
-	elif NDroute > NNroute and NDroute > NMroute and NDroute > NAroute and NDroute > NProute:
-		most_used_route = "Nashik-Dhule"
-
-	cursor.execute("SELECT COALESCE(SUM(total_amount), 0) FROM Payment")
-	row = cursor.fetchone() or (0,)
-	tsum = int(row[0])
-	print("TOTAL CUST",total_cust)
-	return render_template('Status.html',total = total_cust,tcar=total_car1,total_e=total_employ,total_car = tcar,total_driver=drivert,total_booking=tbooking,mroute=most_used_route,total_sum1=tsum)
+	counts = dashboard.counts(get_db())
+	return render_template(
+		'Status.html',
+		total=counts.customers,
+		tcar=counts.cars,
+		total_e=counts.employees,
+		total_car=counts.cars_available,
+		total_driver=counts.drivers_available,
+		total_booking=counts.bookings,
+		mroute=", ".join(counts.busiest_routes()),
+		routes=sorted(counts.routes.items(), key=lambda kv: (-kv[1], kv[0])),
+		total_sum1=counts.revenue,
+	)
 
 @app.route('/allbooked/',methods=['GET','POST'])
 def allbooked():
-	print("Entered") 	#Testing
 	
 	return render_template("allbooked.html")
 
@@ -1322,12 +1592,11 @@ def booked():
 @app.route('/lastpage/',methods=['GET','POST'])
 
 def lastpage():
-	print("Entered") 	#Testing
 	
 	return render_template("final.html")
 	
 if __name__ == "__main__":
     # listen on all interfaces so Docker can route in
-    app.run(host="0.0.0.0", port=5000, debug=True, use_reloader=False)
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 5000)), debug=True, use_reloader=False)
 
 	
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""Per-request performance metrics in Prometheus text format.
+
+    metrics = Metrics()
+    pool = ConnectionPool(metrics.instrument(backend.connect), ...)
+    metrics.init_app(app)          # request latency, SQL and template time
+    app.add_url_rule("/metrics", view_func=metrics.view)
+
+Every request is timed and labelled with its URL rule (not the raw path,
+so ``/generateinvoice/<int:booking_id>`` is one series). Connections made
+by the instrumented connect factory time each ``execute``; the queries a
+request runs are added up into its SQL count and SQL time. Template
+renders are timed through Flask's template signals. Mail and PDF render
+timings come from the services themselves (see ``observe_*``).
+"""
+import bisect
+import contextvars
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, before_render_template, g, request, template_rendered
+
+# seconds; the last bucket is always +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+Labels = Tuple[str, ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a fixed tuple of label names."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help = name, help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> ([per-bucket counts..., +Inf], sum)
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(labels, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[idx] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(k, list(c), t[0]) for k, (c, t) in sorted(self._series.items())]
+        for labels, counts, total in series:
+            pairs = list(zip(self.labelnames, labels))
+            running = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else _num(bound)
+                lines.append(f"{self.name}_bucket{_labels(pairs + [('le', le)])} {running}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {_num(total)}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {running}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help = name, help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_labels(list(zip(self.labelnames, labels)))} {_num(value)}")
+        return lines
+
+
+class _Tally:
+    """SQL work done on behalf of the current request."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_current: contextvars.ContextVar[Optional[_Tally]] = contextvars.ContextVar("sql_tally", default=None)
+
+
+class Metrics:
+    def __init__(self, *, token: Optional[str] = None):
+        self.token = token                          # optional bearer token for /metrics
+        self.requests = Counter(
+            "http_requests_total", "Requests by endpoint, method and status.",
+            ("endpoint", "method", "status"))
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency.", ("endpoint", "method"))
+        self.sql_queries = Histogram(
+            "http_request_sql_queries", "SQL statements executed per request.", ("endpoint",),
+            buckets=QUERY_COUNT_BUCKETS)
+        self.sql_time = Histogram(
+            "http_request_sql_seconds", "Time spent in SQL per request.", ("endpoint",))
+        self.sql_background = Histogram(
+            "sql_background_query_seconds", "SQL executed outside a request (background threads).")
+        self.template_time = Histogram(
+            "template_render_seconds", "Jinja template render time.", ("template",))
+        self.mail_time = Histogram(
+            "mail_send_seconds", "SMTP send time per message.", ("result",))
+        self.pdf_time = Histogram(
+            "pdf_render_seconds", "PDF render time, submit to done.", ("result",))
+        self.collectors: List[Callable[[], List[str]]] = []
+        # called as listener(sql, seconds) after every statement (query_tracer)
+        self.query_listeners: List[Callable[[str, float], None]] = []
+
+    # ------------------------------------------------------------------
+    # Wiring
+    # ------------------------------------------------------------------
+    def init_app(self, app) -> None:
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+        before_render_template.connect(self._template_started, app)
+        template_rendered.connect(self._template_done, app)
+
+    def instrument(self, connect: Callable[[], object]) -> Callable[[], object]:
+        """Wrap a DB connect factory so every cursor's execute is timed."""
+        def factory():
+            return _TimedConnection(connect(), self)
+        return factory
+
+    def observe_mail(self, seconds: float, ok: bool) -> None:
+        self.mail_time.observe(seconds, "ok" if ok else "error")
+
+    def observe_pdf(self, seconds: float, ok: bool) -> None:
+        self.pdf_time.observe(seconds, "ok" if ok else "error")
+
+    def view(self):
+        if self.token and request.headers.get("Authorization") != f"Bearer {self.token}":
+            return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (self.requests, self.latency, self.sql_queries, self.sql_time,
+                       self.sql_background, self.template_time, self.mail_time, self.pdf_time):
+            lines.extend(metric.render())
+        for collect in self.collectors:
+            lines.extend(collect())
+        return "\n".join(lines) + "\n"
+
+    # ------------------------------------------------------------------
+    # Hooks
+    # ------------------------------------------------------------------
+    def record_query(self, sql: str, seconds: float) -> None:
+        for listener in self.query_listeners:
+            listener(sql, seconds)
+        tally = _current.get()
+        if tally is None:
+            self.sql_background.observe(seconds)
+        else:
+            tally.queries += 1
+            tally.seconds += seconds
+
+    def _before(self):
+        g._metrics_started = time.perf_counter()
+        g._metrics_token = _current.set(_Tally())
+
+    def _after(self, response):
+        started = g.pop("_metrics_started", None)
+        tally = _current.get()
+        if started is None or tally is None:
+            return response
+        endpoint = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        self.requests.inc(endpoint, request.method, str(response.status_code))
+        self.latency.observe(time.perf_counter() - started, endpoint, request.method)
+        self.sql_queries.observe(tally.queries, endpoint)
+        self.sql_time.observe(tally.seconds, endpoint)
+        return response
+
+    def _teardown(self, exc):
+        token = g.pop("_metrics_token", None)
+        if token is not None:
+            _current.reset(token)
+
+    def _template_started(self, sender, template, context, **extra):
+        g.setdefault("_template_started", []).append(time.perf_counter())
+
+    def _template_done(self, sender, template, context, **extra):
+        stack = g.get("_template_started")
+        if stack:
+            self.template_time.observe(time.perf_counter() - stack.pop(), template.name or "<string>")
+
+
+# ─── DB-API wrappers ─────────────────────────────────────────────────
+class _TimedConnection:
+    """Proxy that hands out timed cursors; everything else passes through."""
+
+    def __init__(self, conn, metrics: Metrics):
+        self._conn = conn
+        self._metrics = metrics
+
+    def cursor(self, *args, **kwargs):
+        return _TimedCursor(self._conn.cursor(*args, **kwargs), self._metrics)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class _TimedCursor:
+    def __init__(self, cursor, metrics: Metrics):
+        self._cursor = cursor
+        self._metrics = metrics
+
+    def execute(self, sql, params=None):
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(sql, params)
+        finally:
+            self._metrics.record_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_params):
+        started = time.perf_counter()
+        try:
+            return self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._metrics.record_query(sql, time.perf_counter() - started)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def gauges(prefix: str, stats: Dict[str, object]) -> List[str]:
+    """Flatten a service's stats() dict into gauge lines (numbers only)."""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            lines.extend(gauges(f"{prefix}_{key}", value))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {_num(value)}")
+    return lines
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
@@ -0,0 +1,234 @@
+"""Forward-only schema migrations.
+
+Migrations live in ``migrations/`` as ``NNNN_description.sql`` or
+``NNNN_description.py`` (defining ``up(conn)``) and are applied in
+version order. Applied versions are recorded in ``schema_migrations``;
+a migration is never re-run or rolled back.
+
+    python migrate.py status
+    python migrate.py up [--dry-run] [--explain]
+    python migrate.py explain
+
+``--explain`` prints the EXPLAIN plan of the hot queries (HOT_QUERIES)
+before and after the pending migrations are applied.
+
+MySQL commits DDL implicitly, so a migration that fails half-way is not
+rolled back: keep one DDL change per statement and write Python
+migrations so they can be re-run over a partial result.
+"""
+import argparse
+import datetime
+import hashlib
+import importlib.util
+import os
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from allocation import CAR_LOCK_SQL, CAR_OVERLAP_SQL, DRIVER_LOCK_SQL, DRIVER_OVERLAP_SQL
+from db_pool import ConnectionPool
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+VERSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version     INT          NOT NULL PRIMARY KEY,
+    name        VARCHAR(200) NOT NULL,
+    checksum    CHAR(64)     NOT NULL,
+    applied_at  DATETIME     NOT NULL
+) ENGINE=InnoDB
+"""
+
+# The queries the request path runs most, with representative parameters.
+# Allocation's are imported from allocation.py so the check follows them.
+_DAYS = ("2030-01-12", "2030-01-10", "2030-01-12", "2030-01-10")
+HOT_QUERIES: Dict[str, Tuple[str, tuple]] = {
+    "allocation: lock car": (CAR_LOCK_SQL, ("CAR1",)),
+    "allocation: lock driver": (DRIVER_LOCK_SQL, (1,)),
+    "allocation: car overlap": (CAR_OVERLAP_SQL, ("CAR1",) + _DAYS),
+    "allocation: driver overlap": (DRIVER_OVERLAP_SQL, (1,) + _DAYS),
+    "status: bookings per route":
+        ("SELECT cab_route, COUNT(*) FROM Booking GROUP BY cab_route", ()),
+    "payment: paid rows of a booking":
+        ("SELECT Payment_id FROM Payment WHERE bookingId = %s AND status = 'Paid'", (1,)),
+    "login history: user on a day":
+        ("SELECT user, logged_at FROM Login_History "
+         " WHERE userId = %s AND logged_at >= %s AND logged_at < %s",
+         ("alice", "2030-01-01", "2030-01-02")),
+}
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    path: str
+
+    @property
+    def checksum(self) -> str:
+        with open(self.path, "rb") as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+
+    def statements(self) -> List[str]:
+        """SQL migrations split into single statements (Python: a placeholder)."""
+        if self.path.endswith(".py"):
+            return [f"-- python: {os.path.basename(self.path)} up(conn)"]
+        with open(self.path) as fh:
+            sql = re.sub(r"^\s*--.*$", "", fh.read(), flags=re.MULTILINE)
+        return [stmt.strip() for stmt in sql.split(";") if stmt.strip()]
+
+    def apply(self, conn) -> None:
+        if self.path.endswith(".py"):
+            spec = importlib.util.spec_from_file_location(f"migration_{self.version}", self.path)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            module.up(conn)
+        else:
+            cur = conn.cursor()
+            for stmt in self.statements():
+                cur.execute(stmt)
+            cur.close()
+
+
+# ─── helpers for Python migrations ───────────────────────────────────
+def column_exists(conn, table: str, column: str) -> bool:
+    return _exists(conn, "COLUMNS", "COLUMN_NAME", table, column)
+
+
+def index_exists(conn, table: str, index: str) -> bool:
+    return _exists(conn, "STATISTICS", "INDEX_NAME", table, index)
+
+
+def _exists(conn, view: str, name_col: str, table: str, name: str) -> bool:
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT 1 FROM information_schema.{view} "
+        f" WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND {name_col} = %s LIMIT 1",
+        (table, name),
+    )
+    found = cur.fetchone() is not None
+    cur.close()
+    return found
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> List[Migration]:
+    found: Dict[int, Migration] = {}
+    for entry in sorted(os.listdir(directory)):
+        m = re.fullmatch(r"(\d{4})_(\w+)\.(sql|py)", entry)
+        if not m:
+            continue
+        version = int(m.group(1))
+        if version in found:
+            raise SystemExit(f"duplicate migration version {version}: {entry}")
+        found[version] = Migration(version, m.group(2), os.path.join(directory, entry))
+    return [found[v] for v in sorted(found)]
+
+
+def applied_versions(conn) -> Dict[int, str]:
+    cur = conn.cursor()
+    cur.execute(VERSIONS_TABLE)
+    cur.execute("SELECT version, checksum FROM schema_migrations")
+    rows = dict(cur.fetchall())
+    cur.close()
+    conn.commit()
+    return rows
+
+
+def pending(conn, migrations: List[Migration]) -> List[Migration]:
+    applied = applied_versions(conn)
+    for mig in migrations:
+        if mig.version in applied and applied[mig.version] != mig.checksum:
+            print(f"warning: {mig.version:04d}_{mig.name} changed after it was applied", file=sys.stderr)
+    newest = max(applied, default=0)
+    todo = [m for m in migrations if m.version not in applied]
+    for mig in todo:
+        if mig.version < newest:
+            raise SystemExit(
+                f"{mig.version:04d}_{mig.name} is older than applied version {newest}; "
+                "migrations are forward-only, renumber it"
+            )
+    return todo
+
+
+def upgrade(conn, migrations: List[Migration], *, dry_run: bool = False) -> List[Migration]:
+    todo = pending(conn, migrations)
+    for mig in todo:
+        print(f"{'would apply' if dry_run else 'applying'} {mig.version:04d}_{mig.name}")
+        if dry_run:
+            for stmt in mig.statements():
+                print("    " + stmt.replace("\n", "\n    ") + ";")
+            continue
+        mig.apply(conn)
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, applied_at) "
+            "VALUES (%s, %s, %s, %s)",
+            (mig.version, mig.name, mig.checksum, datetime.datetime.now()),
+        )
+        cur.close()
+        conn.commit()
+    return todo
+
+
+def explain(conn) -> Dict[str, List[Tuple]]:
+    """EXPLAIN (table, type, key, rows) rows for every HOT_QUERIES entry."""
+    plans = {}
+    cur = conn.cursor()
+    for label, (sql, params) in HOT_QUERIES.items():
+        try:
+            cur.execute("EXPLAIN " + sql, params)
+        except Exception:
+            # e.g. the column it filters on arrives with a pending migration
+            plans[label] = [("(n/a)", "-", "-", "-")]
+            continue
+        cols = [d[0].lower() for d in cur.description]
+        plans[label] = [
+            tuple(row[cols.index(c)] for c in ("table", "type", "key", "rows"))
+            for row in cur.fetchall()
+        ]
+    cur.close()
+    conn.rollback()
+    return plans
+
+
+def print_plans(before, after=None) -> None:
+    for label, rows in before.items():
+        print(label)
+        for i, row in enumerate(rows):
+            line = "    {:<14} type={:<6} key={:<28} rows={}".format(*map(str, row))
+            if after is not None:
+                new = after[label][i] if i < len(after[label]) else None
+                line += "   ->   " + ("type={:<6} key={:<28} rows={}".format(*map(str, new[1:]))
+                                     if new else "(gone)")
+            print(line)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Forward-only schema migrations")
+    ap.add_argument("command", choices=["status", "up", "explain"], nargs="?", default="status")
+    ap.add_argument("--dry-run", action="store_true", help="list pending SQL without running it")
+    ap.add_argument("--explain", action="store_true", help="compare hot-query plans before/after")
+    args = ap.parse_args(argv)
+
+    pool = ConnectionPool.from_env()
+    migrations = discover()
+    with pool.connection() as conn:
+        if args.command == "explain":
+            print_plans(explain(conn))
+        elif args.command == "status":
+            applied = applied_versions(conn)
+            for mig in migrations:
+                print(f"{'applied' if mig.version in applied else 'pending'}  {mig.version:04d}_{mig.name}")
+        else:
+            before = explain(conn) if args.explain else None
+            done = upgrade(conn, migrations, dry_run=args.dry_run)
+            if not done:
+                print("schema is up to date")
+            if before is not None:
+                print_plans(before, None if args.dry_run else explain(conn))
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
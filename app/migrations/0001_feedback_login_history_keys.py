@@ -0,0 +1,21 @@
+"""Surrogate primary keys for Feedback and Login_History (keyset pagination).
+
+Databases created from the current dump already have them; only older
+ones are altered.
+"""
+from migrate import column_exists
+
+
+def up(conn):
+    cur = conn.cursor()
+    if not column_exists(conn, "Feedback", "id"):
+        cur.execute(
+            "ALTER TABLE Feedback ADD COLUMN id INT NOT NULL AUTO_INCREMENT FIRST, "
+            "ADD PRIMARY KEY (id)"
+        )
+    if not column_exists(conn, "Login_History", "id"):
+        cur.execute(
+            "ALTER TABLE Login_History ADD COLUMN id BIGINT NOT NULL AUTO_INCREMENT FIRST, "
+            "ADD PRIMARY KEY (id)"
+        )
+    cur.close()
@@ -0,0 +1,16 @@
+-- Route table behind the fare matrix, seeded with the original five routes.
+CREATE TABLE IF NOT EXISTS Route (
+  route_id    INT          NOT NULL AUTO_INCREMENT,
+  name        VARCHAR(500) NOT NULL,
+  distance_km INT          NOT NULL,
+  active      TINYINT(1)   NOT NULL DEFAULT 1,
+  PRIMARY KEY (route_id),
+  UNIQUE KEY name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=latin1;
+
+INSERT IGNORE INTO Route (route_id, name, distance_km) VALUES
+  (1, 'Nashik-Pune', 211),
+  (2, 'Nashik-Mumbai', 165),
+  (3, 'Nashik-Nagpur', 680),
+  (4, 'Nashik-Dhule', 144),
+  (5, 'Nashik-Aurangabad', 160);
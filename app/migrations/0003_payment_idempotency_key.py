@@ -0,0 +1,11 @@
+"""Payment.idempotency_key with a UNIQUE index (duplicate submissions)."""
+from migrate import column_exists, index_exists
+
+
+def up(conn):
+    cur = conn.cursor()
+    if not column_exists(conn, "Payment", "idempotency_key"):
+        cur.execute("ALTER TABLE Payment ADD COLUMN idempotency_key VARCHAR(64) DEFAULT NULL")
+    if not index_exists(conn, "Payment", "idempotency_key"):
+        cur.execute("ALTER TABLE Payment ADD UNIQUE KEY idempotency_key (idempotency_key)")
+    cur.close()
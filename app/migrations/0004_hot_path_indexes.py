@@ -0,0 +1,29 @@
+"""Indexes for the filters the request path uses (see HOT_QUERIES in migrate.py).
+
+Each index is created only if it is missing, so the migration can be
+re-run after a partial failure; databases created from the current dump
+already have them all.
+"""
+from migrate import index_exists
+
+INDEXES = [
+    # allocation candidates and the status page's per-status counts
+    ("Car", "idx_car_status_type", "(status, Car_type)"),
+    ("Driver", "idx_driver_status", "(status)"),
+    # status page: bookings per route
+    ("Booking", "idx_booking_route", "(cab_route)"),
+    # allocation: does this car already have an overlapping booking?
+    ("Booking", "idx_booking_car_dates", "(carid, startDate, endDate)"),
+    # payment/invoice look-ups by booking and status
+    ("Payment", "idx_payment_booking_status", "(bookingId, status)"),
+    # login history by user and day
+    ("Login_History", "idx_login_user_date", "(userId, Date)"),
+]
+
+
+def up(conn):
+    cur = conn.cursor()
+    for table, name, cols in INDEXES:
+        if not index_exists(conn, table, name):
+            cur.execute(f"ALTER TABLE {table} ADD INDEX {name} {cols}, ALGORITHM=INPLACE, LOCK=NONE")
+    cur.close()
@@ -0,0 +1,44 @@
+"""Typed shadow columns for the dates, times and prices stored as varchar.
+
+Step one of the switch to typed columns. The new columns are nullable and
+added in place (no table copy, writes keep flowing). The application writes
+both the old and the new column from now on, and ``backfill.py`` fills in
+the existing rows in small batches. The varchar columns are dropped by a
+later migration, once the backfill reports nothing left.
+
+    Booking.startDate / endDate   -> start_on / end_on     DATE
+    Booking.Pickup_time           -> pickup_at             TIME
+    Cust_User.registration_Date   -> registered_on         DATE
+    Login_History.Date + Time     -> logged_at             DATETIME
+    Car.price_per_km              -> rate_per_km           DECIMAL(10,2)
+"""
+from migrate import column_exists, index_exists
+
+COLUMNS = [
+    ("Booking", "start_on", "DATE DEFAULT NULL"),
+    ("Booking", "end_on", "DATE DEFAULT NULL"),
+    ("Booking", "pickup_at", "TIME DEFAULT NULL"),
+    ("Cust_User", "registered_on", "DATE DEFAULT NULL"),
+    ("Login_History", "logged_at", "DATETIME DEFAULT NULL"),
+    ("Car", "rate_per_km", "DECIMAL(10,2) DEFAULT NULL"),
+]
+
+INDEXES = [
+    ("Booking", "idx_booking_car_days", "(carid, start_on, end_on)"),
+    ("Booking", "idx_booking_driver_days", "(driverId, start_on, end_on)"),
+    ("Booking", "idx_booking_start_on", "(start_on)"),
+    ("Login_History", "idx_login_user_at", "(userId, logged_at)"),
+]
+
+
+def up(conn):
+    cur = conn.cursor()
+    for table, column, ddl in COLUMNS:
+        if not column_exists(conn, table, column):
+            cur.execute(
+                f"ALTER TABLE {table} ADD COLUMN {column} {ddl}, ALGORITHM=INPLACE, LOCK=NONE"
+            )
+    for table, name, cols in INDEXES:
+        if not index_exists(conn, table, name):
+            cur.execute(f"ALTER TABLE {table} ADD INDEX {name} {cols}, ALGORITHM=INPLACE, LOCK=NONE")
+    cur.close()
@@ -0,0 +1,20 @@
+"""Put cars and drivers the old booking flow marked 'BOOKED' back in service.
+
+The booking flow used to set ``status = 'BOOKED'`` on the car and driver it
+allocated and never reset it. Allocation now checks the Booking table for
+overlapping dates and treats any status other than 'Available' as "taken
+out of service by an admin", so those rows would never be offered again.
+
+Admins mark cars and drivers out of service as 'Booked'. The columns use a
+case-insensitive collation, so the flow's rows are matched with a binary
+comparison and the admin's 'Booked' rows are left alone.
+"""
+
+TABLES = ["Car", "Driver"]
+
+
+def up(conn):
+    cur = conn.cursor()
+    for table in TABLES:
+        cur.execute(f"UPDATE {table} SET status = 'Available' WHERE BINARY status = 'BOOKED'")
+    cur.close()
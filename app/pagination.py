@@ -0,0 +1,141 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+class BadCursor(ValueError):
+    """Raised for a cursor or sort order that cannot be decoded."""
+
+
+@dataclass(frozen=True)
+class Listing:
+    """A table browsed page by page on its (unique) key column."""
+
+    table: str
+    key: str
+    columns: Tuple[str, ...]            # what the template renders, in order
+    default_order: str = "asc"
+
+
+LISTINGS = {
+    "bookings": Listing(
+        "Booking", "bookingId",
+        ("bookingId", "userId", "Cab", "startDate", "endDate", "Pickup_time",
+         "Pickup_location", "Drop_off_location", "driverId", "carid", "cab_route"),
+        default_order="desc",
+    ),
+    "customers": Listing(
+        "Cust_User", "userId",
+        ("userId", "fName", "lName", "emailId", "phone", "registration_Date",
+         "password", "reset_Question", "reset_Ans_Type"),
+    ),
+    "admins": Listing(
+        "Admin_User", "userId",
+        ("userId", "fName", "lName", "emailId", "phone", "registration_Date",
+         "password", "reset_Question", "reset_Ans_Type"),
+    ),
+    "cars": Listing(
+        "Car", "Car_id",
+        ("Car_id", "model_name", "registeration_no", "seating_capacity",
+         "Car_type", "price_per_km", "status"),
+    ),
+    "drivers": Listing(
+        "Driver", "driverId",
+        ("driverId", "fName", "lName", "phone_no", "licence_no", "age", "status"),
+    ),
+    "feedback": Listing(
+        "Feedback", "id",
+        ("userId", "fName", "lName", "emailId", "rating", "comments", "Date"),
+        default_order="desc",
+    ),
+    "logins": Listing(
+        "Login_History", "id",
+        ("user", "userId", "Date", "Time"),
+        default_order="desc",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Page:
+    rows: List[tuple]
+    size: int
+    order: str
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+def encode_cursor(value: Any) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Any:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise BadCursor(f"malformed cursor {cursor!r}") from exc
+    if not isinstance(value, (int, str)) or isinstance(value, bool):
+        raise BadCursor(f"malformed cursor {cursor!r}")
+    return value
+
+
+def keyset_page(
+    conn,
+    listing: Listing,
+    *,
+    size: int,
+    order: Optional[str] = None,
+    after: Optional[str] = None,
+    before: Optional[str] = None,
+) -> Page:
+    """Fetch one page of *listing* using a seek on its key column.
+
+    *after* returns the page following that cursor, *before* the page
+    preceding it; with neither, the first page. The cost is one index
+    range scan of ``size + 1`` rows however deep the page is.
+    """
+    order = (order or listing.default_order).lower()
+    if order not in ("asc", "desc"):
+        raise BadCursor(f"unknown sort order {order!r}")
+    backwards = before is not None and after is None
+    cursor_value = decode_cursor(before if backwards else after) if (after or before) else None
+
+    # Walking backwards is the same seek with comparison and order flipped.
+    ascending = (order == "asc") != backwards
+    op, direction = (">", "ASC") if ascending else ("<", "DESC")
+    where, params = "", []
+    if cursor_value is not None:
+        where, params = f"WHERE {listing.key} {op} %s", [cursor_value]
+
+    columns = ", ".join((listing.key,) + listing.columns)
+    cur = conn.cursor()
+    cur.execute(
+        f"SELECT {columns} FROM {listing.table} {where} "
+        f"ORDER BY {listing.key} {direction} LIMIT %s",
+        params + [size + 1],
+    )
+    rows: Sequence[tuple] = cur.fetchall()
+    cur.close()
+
+    more = len(rows) > size
+    rows = list(rows[:size])
+    if backwards:
+        rows.reverse()
+
+    # an empty page (rows deleted since the link was made) still links back
+    first = encode_cursor(rows[0][0]) if rows else after
+    last = encode_cursor(rows[-1][0]) if rows else before
+    if backwards:
+        next_cursor, prev_cursor = last, first if more else None
+    else:
+        next_cursor, prev_cursor = last if more else None, first if cursor_value is not None else None
+    return Page(
+        rows=[row[1:] for row in rows],
+        size=size,
+        order=order,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
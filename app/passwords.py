@@ -0,0 +1,103 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+class HashingBusy(Exception):
+    """Raised when *max_pending* hash/verify jobs are already queued, or
+    when a job did not finish within *timeout*."""
+
+
+class PasswordHasher:
+    """PBKDF2 hashing on a small dedicated thread pool.
+
+    hashlib's PBKDF2 releases the GIL, so up to *workers* hashes run in
+    parallel while the web threads stay free for cheap requests. The queue
+    is bounded: past *max_pending* jobs, or when a job does not finish
+    within *timeout*, callers get HashingBusy (→ 503) instead of piling up
+    behind a login storm.
+
+    *rounds* sets the cost for new hashes. verify() reports a replacement
+    hash whenever the stored one was made with different parameters, so
+    accounts migrate to the current cost the next time they log in.
+    """
+
+    def __init__(
+        self,
+        *,
+        rounds: Optional[int] = None,
+        workers: int = 2,
+        max_pending: int = 32,
+        timeout: float = 10.0,
+    ):
+        settings = {"pbkdf2_sha256__rounds": rounds} if rounds else {}
+        self.context = CryptContext(schemes=["pbkdf2_sha256"], **settings)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pbkdf2")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.hashed = self.verified = self.upgraded = self.rejected = self.timed_out = 0
+
+    def hash(self, password: str) -> str:
+        return self._run("hashed", self.context.hash, password)
+
+    def verify(self, password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Return (ok, new_hash); *new_hash* is set when *stored* is outdated."""
+        if not stored:
+            return False, None
+        ok, new_hash = self._run("verified", self.context.verify_and_update, password, stored)
+        if new_hash:
+            with self._lock:
+                self.upgraded += 1
+        return ok, new_hash
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._pending
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "rounds": self.context.to_dict().get("pbkdf2_sha256__rounds")
+                      or self.context.handler().default_rounds,
+            "hashed": self.hashed,
+            "verified": self.verified,
+            "upgraded": self.upgraded,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, counter: str, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusy(f"{self._pending} password jobs already pending")
+            self._pending += 1
+            setattr(self, counter, getattr(self, counter) + 1)
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._job_done(None)
+            raise
+        # a job stays pending until it actually finishes (or is cancelled),
+        # even when the caller gave up waiting on it
+        future.add_done_callback(self._job_done)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            future.cancel()     # only helps while it is still queued
+            with self._lock:
+                self.timed_out += 1
+            raise HashingBusy(f"password job did not finish within {self.timeout:g}s") from None
+
+    def _job_done(self, _future) -> None:
+        with self._lock:
+            self._pending -= 1
@@ -0,0 +1,170 @@
+import dataclasses
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional, Set
+
+
+def fingerprint_files(*paths: str) -> str:
+    """Short digest of file names + mtimes + sizes (template versioning)."""
+    h = hashlib.sha256()
+    for path in paths:
+        st = os.stat(path)
+        h.update(f"{path}:{st.st_mtime_ns}:{st.st_size};".encode())
+    return h.hexdigest()[:16]
+
+
+class PdfCache:
+    """Content-addressed, size-capped on-disk cache of rendered invoices.
+
+    Files are stored as ``<booking_id>-<sha256>.pdf`` where the hash covers
+    every field of the invoice record plus *salt* (the template/CSS
+    version). A changed Payment or Booking row therefore yields a new key
+    on its own; put() additionally drops the superseded files for the
+    same booking and invalidate() lets writers drop them eagerly.
+
+    Usage is tracked in LRU order by file mtime (get() touches the file)
+    and the least recently served files are deleted once the cache grows
+    beyond *max_bytes*. Several processes may share the directory: put()
+    re-reads it before evicting, so the cap covers everyone's files, and
+    get() hands out an open file, which stays readable even if another
+    process evicts it meanwhile.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, salt: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.salt = salt
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, int]" = OrderedDict()     # filename -> size
+        self._by_booking: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._scan()
+        with self._lock:
+            self._evict()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def key_for(self, record) -> str:
+        """ETag-able content hash of an invoice record."""
+        h = hashlib.sha256(self.salt.encode())
+        for value in dataclasses.astuple(record):
+            h.update(repr(value).encode())
+            h.update(b"\x1f")
+        return h.hexdigest()
+
+    def get(self, booking_id: int, key: str) -> Optional[BinaryIO]:
+        """The cached PDF opened for reading (caller closes it), or None on a miss."""
+        name = self._name(booking_id, key)
+        path = os.path.join(self.directory, name)
+        try:
+            fh = open(path, "rb")
+        except FileNotFoundError:           # never stored, or evicted by any process
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)                  # LRU order shared across processes and restarts
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            if name in self._lru:
+                self._lru.move_to_end(name)
+            else:                           # stored by another process
+                self._remember(name, os.fstat(fh.fileno()).st_size)
+            self.hits += 1
+        return fh
+
+    def put(self, booking_id: int, key: str, pdf: bytes) -> None:
+        """Store *pdf* atomically, then enforce the size cap on the directory."""
+        name = self._name(booking_id, key)
+        path = os.path.join(self.directory, name)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(pdf)
+        os.replace(tmp, path)
+
+        self._scan()
+        with self._lock:
+            stale = self._by_booking.get(str(booking_id), set()) - {name}
+            for old in stale:
+                self._drop(old)
+            self._evict()
+
+    def invalidate(self, booking_id: int) -> None:
+        """Delete every cached version of *booking_id*'s invoice."""
+        with self._lock:
+            for name in list(self._by_booking.get(str(booking_id), ())):
+                self._drop(name)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._lru),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    # ------------------------------------------------------------------
+    # Helpers (callers hold self._lock)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _name(booking_id: int, key: str) -> str:
+        return f"{booking_id}-{key}.pdf"
+
+    def _scan(self) -> None:
+        """Rebuild the LRU from the directory (takes the lock itself)."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf") and entry.is_file():
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:   # evicted by another process mid-scan
+                    continue
+                files.append((st.st_mtime, entry.name, st.st_size))
+        with self._lock:
+            self._lru.clear()
+            self._by_booking.clear()
+            self._bytes = 0
+            for _, name, size in sorted(files):
+                self._remember(name, size)
+
+    def _remember(self, name: str, size: int) -> None:
+        self._lru[name] = size
+        self._bytes += size
+        self._by_booking.setdefault(name.split("-", 1)[0], set()).add(name)
+
+    def _forget(self, name: str) -> None:
+        size = self._lru.pop(name, None)
+        if size is None:
+            return
+        self._bytes -= size
+        booking = name.split("-", 1)[0]
+        names = self._by_booking.get(booking)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._by_booking[booking]
+
+    def _drop(self, name: str) -> None:
+        self._forget(name)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and len(self._lru) > 1:
+            oldest = next(iter(self._lru))
+            self._drop(oldest)
+            self.evictions += 1
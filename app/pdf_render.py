@@ -0,0 +1,331 @@
+import os
+import queue
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue already holds *max_queue* jobs."""
+
+
+class RenderFailed(Exception):
+    """A render raised in the worker, or the worker died or failed to start."""
+
+
+class RenderTimeout(RenderFailed):
+    """A render overran the per-job timeout; its worker was killed."""
+
+
+# ─── worker-process side ─────────────────────────────────────────────
+# Populated once per worker by _init_worker(); every job reuses them.
+_STATIC_DIR = ""
+_RESOURCES: Dict[str, bytes] = {}
+
+
+def _init_worker(static_dir: str, preload: List[str]) -> None:
+    """Import WeasyPrint, read static assets and warm the font cache."""
+    global _STATIC_DIR
+    import weasyprint
+
+    _STATIC_DIR = static_dir
+    for rel in preload:
+        with open(os.path.join(static_dir, rel), "rb") as fh:
+            _RESOURCES["/static/" + rel] = fh.read()
+    # First layout pays for fontconfig/pango start-up; do it now, not per job.
+    weasyprint.HTML(string="<p>warm-up</p>", url_fetcher=_fetch).write_pdf()
+
+
+def _fetch(url: str) -> Dict[str, Any]:
+    """Serve /static/... from memory or disk; never go to the network."""
+    from weasyprint import default_url_fetcher
+
+    path = urlparse(url).path
+    if path in _RESOURCES:
+        return {"string": _RESOURCES[path], "mime_type": _guess_mime(path)}
+    if path.startswith("/static/"):
+        local = os.path.realpath(os.path.join(_STATIC_DIR, path[len("/static/"):]))
+        if local.startswith(os.path.realpath(_STATIC_DIR) + os.sep) and os.path.isfile(local):
+            return default_url_fetcher("file://" + local)
+    return {"string": b"", "mime_type": _guess_mime(path)}
+
+
+def _guess_mime(path: str) -> str:
+    return "text/css" if path.endswith(".css") else "application/octet-stream"
+
+
+def _render(html: str) -> bytes:
+    import weasyprint
+
+    return weasyprint.HTML(string=html, base_url="file:///", url_fetcher=_fetch).write_pdf()
+
+
+def _worker_main(fd: int) -> None:
+    """Serve render requests from the parent until it hangs up."""
+    conn = Connection(fd)
+    sys.path[:], static_dir, preload = conn.recv()     # import what the parent imports
+    try:
+        _init_worker(static_dir, preload)
+    except Exception as exc:
+        conn.send((False, f"{type(exc).__name__}: {exc}"))
+        return
+    conn.send((True, os.getpid()))
+    while True:
+        try:
+            html = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, _render(html)))
+        except Exception as exc:        # sent as text: not every exception pickles
+            conn.send((False, f"{type(exc).__name__}: {exc}"))
+
+
+# ─── request-process side ────────────────────────────────────────────
+class RenderJob:
+    """Handle on one submitted render, kept for polling."""
+
+    __slots__ = ("id", "future", "owner", "meta", "created")
+
+    def __init__(self, future: Future, owner: Any, meta: Dict[str, Any]):
+        self.id = secrets.token_urlsafe(16)
+        self.future = future
+        self.owner = owner
+        self.meta = meta
+        self.created = time.monotonic()
+
+
+class _Worker:
+    """One warm render process, driven over a socket pair.
+
+    Started as ``python pdf_render.py FD`` rather than forked, so it can be
+    (re)started at any time without inheriting locks held by the parent's
+    threads, and without re-importing the web app the way a multiprocessing
+    spawn/forkserver child would.
+    """
+
+    def __init__(self, static_dir: str, preload: List[str]):
+        parent, child = socket.socketpair()
+        with child:
+            self.proc = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), str(child.fileno())],
+                pass_fds=(child.fileno(),),
+                stdin=subprocess.DEVNULL,
+            )
+        self.conn = Connection(parent.detach())
+        self.conn.send((sys.path, static_dir, preload))
+
+    def wait_ready(self, timeout: float) -> None:
+        ok, detail = False, f"not ready after {timeout:.0f}s"
+        try:
+            if self.conn.poll(timeout):
+                ok, detail = self.conn.recv()
+        except (EOFError, OSError):
+            detail = f"exited with {self.proc.wait()}"
+        if not ok:
+            self.kill()
+            raise RenderFailed(f"render worker failed to start: {detail}")
+
+    def render(self, html: str, timeout: float) -> bytes:
+        """The PDF; RenderTimeout, or EOFError/OSError if the process died."""
+        self.conn.send(html)
+        if not self.conn.poll(timeout):
+            raise RenderTimeout(f"render took longer than {timeout:.0f}s")
+        ok, result = self.conn.recv()
+        if not ok:
+            raise RenderFailed(result)
+        return result
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.wait()
+        self.conn.close()
+
+
+class RenderService:
+    """Pool of warm WeasyPrint worker processes.
+
+    * Rendering runs outside the web worker, so it no longer holds the
+      request process's GIL.
+    * At most *max_queue* jobs may be pending (queued + running); further
+      submissions raise RenderQueueFull instead of piling up.
+    * Each job gets *timeout* seconds of worker time. A worker that
+      overruns it (or dies) is killed and replaced by a fresh one, and the
+      job fails with RenderTimeout / RenderFailed, so hung renders cannot
+      use up the pool.
+    * Workers are started and warmed at construction time: WeasyPrint is
+      imported, the *preload* stylesheets are read into memory and one
+      throw-away document is laid out so fonts are cached.
+
+    Each worker has a feeder thread that takes jobs off a shared queue; a
+    replacement is started by that thread alone, so restarts never race.
+    """
+
+    def __init__(
+        self,
+        static_dir: str,
+        *,
+        workers: int = 2,
+        max_queue: int = 8,
+        timeout: float = 20.0,
+        preload: Optional[List[str]] = None,
+        job_ttl: float = 600.0,
+        start_timeout: float = 60.0,
+        on_render: Optional[Callable[[float, bool], None]] = None,
+    ):
+        self.static_dir = static_dir
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.preload = list(preload or [])
+        self.job_ttl = job_ttl
+        self.start_timeout = start_timeout
+        self.on_render = on_render                  # (seconds, ok) per job, for metrics
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._jobs: Dict[str, RenderJob] = {}
+        self._queue: "queue.Queue[Optional[Tuple[Future, str]]]" = queue.Queue()
+        self.submitted = self.rejected = self.failed = self.timed_out = self.restarts = 0
+
+        # start all of them, then wait: the warm-ups run in parallel
+        started = [_Worker(static_dir, self.preload) for _ in range(workers)]
+        try:
+            for worker in started:
+                worker.wait_ready(start_timeout)
+        except RenderFailed:
+            for worker in started:
+                if worker.proc.poll() is None:
+                    worker.kill()
+            raise
+        self._threads = [
+            threading.Thread(target=self._feed, args=(worker,), name=f"pdf-render-{n}", daemon=True)
+            for n, worker in enumerate(started)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    @property
+    def saturated(self) -> bool:
+        """True when a new job would have to wait for a free worker."""
+        with self._lock:
+            return self._pending >= self.workers
+
+    def submit(self, html: str, *, owner: Any = None, **meta) -> RenderJob:
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise RenderQueueFull(f"{self._pending} render jobs already pending")
+            self._pending += 1
+            self.submitted += 1
+            self._expire_jobs()
+
+        future: Future = Future()
+        started = time.perf_counter()
+        future.add_done_callback(lambda f: self._finished(f, started))
+        self._queue.put((future, html))
+
+        job = RenderJob(future, owner, meta)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def job(self, job_id: str) -> Optional[RenderJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self._pending,
+                "tracked_jobs": len(self._jobs),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "restarts": self.restarts,
+            }
+
+    def shutdown(self) -> None:
+        while True:                     # cancel what has not started yet
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[0].cancel()
+        for _ in self._threads:
+            self._queue.put(None)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _feed(self, worker: Optional[_Worker]) -> None:
+        """Run queued jobs on *worker*, replacing it when it hangs or dies."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            future, html = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if worker is None:
+                    worker = _Worker(self.static_dir, self.preload)
+                    worker.wait_ready(self.start_timeout)
+                pdf = worker.render(html, self.timeout)
+            except RenderTimeout as exc:
+                self._replace(worker, timed_out=True)
+                worker = None
+                future.set_exception(exc)
+            except RenderFailed as exc:
+                if worker is not None and worker.proc.poll() is not None:
+                    worker = None       # failed to start: try again on the next job
+                future.set_exception(exc)
+            except (EOFError, OSError) as exc:
+                # the process died mid-job (e.g. OOM-killed)
+                self._replace(worker, timed_out=False)
+                worker = None
+                future.set_exception(RenderFailed(f"render worker died: {exc!r}"))
+            else:
+                future.set_result(pdf)
+        if worker is not None:
+            worker.kill()
+
+    def _replace(self, worker: Optional[_Worker], *, timed_out: bool) -> None:
+        if worker is not None:
+            worker.kill()               # the next job on this thread starts a new one
+        with self._lock:
+            self.restarts += 1
+            self.timed_out += timed_out
+
+    def _finished(self, future: Future, started: float) -> None:
+        ok = not future.cancelled() and future.exception() is None
+        with self._lock:
+            self._pending -= 1
+            if not ok:
+                self.failed += 1
+        if self.on_render is not None:
+            self.on_render(time.perf_counter() - started, ok)
+
+    def _expire_jobs(self) -> None:
+        cutoff = time.monotonic() - self.job_ttl
+        for job_id in [j for j, job in self._jobs.items()
+                       if job.created < cutoff and job.future.done()]:
+            del self._jobs[job_id]
+
+
+if __name__ == "__main__":
+    _worker_main(int(sys.argv[1]))
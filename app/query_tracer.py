@@ -0,0 +1,201 @@
+"""Per-request query budgets and N+1 detection.
+
+Every statement a request runs is fingerprinted (literals and placeholders
+folded to ``?``, whitespace collapsed) and counted. When the request ends
+it is checked against its budget: the number of statements, the time
+spent in SQL, and how often one fingerprint repeated (the N+1 pattern:
+the same look-up issued in a loop). Over-budget requests are logged with
+the route and, for each repeated statement, the line of application code
+that first issued it.
+
+Routes declare their own budget with a decorator; the rest get the
+defaults passed to QueryTracer:
+
+    @app.route("/generateinvoice/<int:booking_id>")
+    @query_budget(queries=6)
+    def invoice(booking_id): ...
+
+With ``strict=True`` (test mode) an over-budget request raises
+QueryBudgetExceeded instead, which fails the test that made it.
+"""
+import contextvars
+import functools
+import logging
+import os
+import re
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, g, request
+
+log = logging.getLogger("car_rental.queries")
+
+# frames from these files are plumbing, not the code that issued the query
+_INTERNAL = {
+    os.path.abspath(__file__),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "metrics.py"),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "db_backend.py"),
+}
+_APP_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+_LITERAL_RE = re.compile(
+    r"'(?:[^'\\]|\\.|'')*'"          # string literal
+    r"|\b\d+(?:\.\d+)?\b"            # number
+    r"|%s|\?"                        # placeholder
+)
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A request ran more (or slower, or more repeated) SQL than allowed."""
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int = 20
+    seconds: float = 0.5
+    repeats: int = 5              # same fingerprint this many times = N+1
+
+
+def query_budget(*, queries: Optional[int] = None, seconds: Optional[float] = None,
+                 repeats: Optional[int] = None):
+    """Declare the query budget of a view (unset fields keep the default)."""
+    def decorator(fn):
+        fn._query_budget = dict(
+            (k, v) for k, v in (("queries", queries), ("seconds", seconds), ("repeats", repeats))
+            if v is not None
+        )
+        return fn
+    return decorator
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql: str) -> str:
+    """Normalised statement text: same shape of query -> same fingerprint."""
+    text = _LITERAL_RE.sub("?", sql)
+    text = _IN_LIST_RE.sub("(?+)", text)
+    return " ".join(text.split())
+
+
+@dataclass
+class _Seen:
+    count: int = 0
+    seconds: float = 0.0
+    origin: str = ""
+
+
+@dataclass
+class Trace:
+    """The statements one request issued, by fingerprint."""
+
+    queries: int = 0
+    seconds: float = 0.0
+    statements: Dict[str, _Seen] = field(default_factory=dict)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, _Seen]]:
+        hits = [(fp, s) for fp, s in self.statements.items() if s.count >= threshold]
+        return sorted(hits, key=lambda item: -item[1].count)
+
+
+_current: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("query_trace", default=None)
+
+
+class QueryTracer:
+    """Checks each request's SQL against its budget (see module docstring)."""
+
+    def __init__(self, default: Budget = Budget(), *, strict: bool = False):
+        self.default = default
+        self.strict = strict
+        self.flagged = 0
+
+    def init_app(self, app, metrics) -> None:
+        metrics.query_listeners.append(self.record)
+        app.before_request(self._before)
+        app.after_request(self._after)
+        app.teardown_request(self._teardown)
+
+    def record(self, sql: str, seconds: float) -> None:
+        trace = _current.get()
+        if trace is None:
+            return
+        trace.queries += 1
+        trace.seconds += seconds
+        seen = trace.statements.get(fingerprint(sql))
+        if seen is None:
+            seen = trace.statements[fingerprint(sql)] = _Seen(origin=_origin())
+        seen.count += 1
+        seen.seconds += seconds
+
+    def budget_for(self, view) -> Budget:
+        overrides = getattr(view, "_query_budget", None)
+        return replace(self.default, **overrides) if overrides else self.default
+
+    def check(self, trace: Trace, budget: Budget) -> List[str]:
+        """Human-readable budget violations of *trace* (empty if within budget)."""
+        problems = []
+        if trace.queries > budget.queries:
+            problems.append(f"{trace.queries} queries (budget {budget.queries})")
+        if trace.seconds > budget.seconds:
+            problems.append(f"{trace.seconds * 1000:.1f} ms in SQL (budget {budget.seconds * 1000:.0f} ms)")
+        for fp, seen in trace.repeated(budget.repeats):
+            problems.append(f"{seen.count}x from {seen.origin}: {fp[:160]}")
+        return problems
+
+    # ------------------------------------------------------------------
+    # Request hooks
+    # ------------------------------------------------------------------
+    def _before(self):
+        g._query_trace_token = _current.set(Trace())
+
+    def _after(self, response):
+        trace = _current.get()
+        if trace is None:
+            return response
+        endpoint = request.url_rule.endpoint if request.url_rule else None
+        budget = self.budget_for(current_app.view_functions.get(endpoint))
+        problems = self.check(trace, budget)
+        if problems:
+            self.flagged += 1
+            route = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+            message = f"query budget exceeded by {route}: " + "; ".join(problems)
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            log.warning(message)
+        return response
+
+    def _teardown(self, exc):
+        token = g.pop("_query_trace_token", None)
+        if token is not None:
+            _current.reset(token)
+
+
+def _origin() -> str:
+    """file:line (function) of the innermost application frame."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if _is_app_file(path):
+            return f"{os.path.basename(path)}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return "?"
+
+
+@functools.lru_cache(maxsize=256)
+def _is_app_file(path: str) -> bool:
+    # co_filename keeps the sys.path entry as given, e.g. "bench/../app/main.py"
+    path = os.path.abspath(path)
+    return path.startswith(_APP_DIR) and path not in _INTERNAL
+
+
+def tracer_from_env() -> QueryTracer:
+    """QUERY_BUDGET / QUERY_BUDGET_MS / QUERY_REPEAT_LIMIT set the defaults;
+    QUERY_BUDGET_STRICT=1 turns violations into exceptions (tests)."""
+    return QueryTracer(
+        Budget(
+            queries=int(os.getenv("QUERY_BUDGET", 20)),
+            seconds=float(os.getenv("QUERY_BUDGET_MS", 500)) / 1000,
+            repeats=int(os.getenv("QUERY_REPEAT_LIMIT", 5)),
+        ),
+        strict=os.getenv("QUERY_BUDGET_STRICT", "0") == "1",
+    )
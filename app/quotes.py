@@ -0,0 +1,124 @@
+import datetime
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ttl_cache import TTLCache
+
+
+Span = Tuple[datetime.date, datetime.date]
+
+
+class _Arrays:
+    """NumPy view of a FareMatrix version, cars grouped by type."""
+
+    def __init__(self, fares):
+        self.version = fares.version
+        self.routes = fares.routes()
+        self.km = np.array([r.distance_km for r in self.routes], dtype=np.int64)
+
+        cars = sorted(fares.car_rates(), key=lambda c: (c[1], c[0]))
+        self.car_ids = np.array([c[0] for c in cars], dtype=object)
+        self.rates = np.array([c[2] for c in cars], dtype=np.int64)
+        self.types: List[str] = sorted({c[1] for c in cars})
+        # start offset of each type's run inside the sorted car arrays
+        type_of = np.array([self.types.index(c[1]) for c in cars], dtype=np.int64)
+        self.offsets = np.searchsorted(type_of, np.arange(len(self.types)))
+
+
+class QuoteService:
+    """Price grid for every route × car type, optionally per date span.
+
+    A car type covers cars with different per-km rates, so each cell
+    is a (min, max) range of ``distance_km * rate``. The tariff has no
+    date component; a span only narrows the range to the cars still free
+    for those dates (from the availability index).
+
+    The span-less grid is rebuilt only when the fare matrix version
+    changes; span grids are cached for *span_ttl* seconds because
+    availability moves with every booking.
+    """
+
+    def __init__(self, fares, availability, *, span_ttl: float = 5.0, max_spans: int = 31):
+        self.fares = fares
+        self.availability = availability
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._arrays: Optional[_Arrays] = None
+        self._base: Optional[Dict[str, Any]] = None
+        self._span_cache = TTLCache(maxsize=1024, ttl=span_ttl)
+
+    @property
+    def version(self) -> int:
+        return self.fares.version
+
+    def quote(self, spans: Sequence[Span] = ()) -> Dict[str, Any]:
+        arrays = self._current()
+        if not spans:
+            return self._base
+        key = (arrays.version, tuple(spans))
+        cached = self._span_cache.get(key)
+        if cached is None:
+            cached = dict(self._base, spans=self._span_grids(arrays, list(spans)))
+            self._span_cache.put(key, cached)
+        return cached
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    def _current(self) -> _Arrays:
+        with self._lock:
+            if self._arrays is None or self._arrays.version != self.fares.version:
+                arrays = _Arrays(self.fares)
+                lo, hi, count = _reduce(arrays, np.ones((1, len(arrays.rates)), dtype=bool))
+                self._base = {
+                    "version": arrays.version,
+                    "routes": [
+                        {"route_id": r.route_id, "name": r.name, "distance_km": r.distance_km}
+                        for r in arrays.routes
+                    ],
+                    "car_types": arrays.types,
+                    "cars": count[0].tolist(),
+                    "price_min": _grid(arrays.km, lo[0]),
+                    "price_max": _grid(arrays.km, hi[0]),
+                }
+                self._arrays = arrays
+            return self._arrays
+
+    def _span_grids(self, arrays: _Arrays, spans: List[Span]) -> List[Dict[str, Any]]:
+        free = np.zeros((len(spans), len(arrays.car_ids)), dtype=bool)
+        for i, (start, end) in enumerate(spans):
+            ids = [c for t in arrays.types for c in self.availability.free_cars(t, start, end)]
+            free[i] = np.isin(arrays.car_ids, np.array(ids, dtype=object))
+        lo, hi, count = _reduce(arrays, free)
+        return [
+            {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "days": (end - start).days + 1,
+                "available": count[i].tolist(),
+                "price_min": _grid(arrays.km, lo[i]),
+                "price_max": _grid(arrays.km, hi[i]),
+            }
+            for i, (start, end) in enumerate(spans)
+        ]
+
+
+def _reduce(arrays: _Arrays, mask: np.ndarray):
+    """Per-type min/max rate and car count for each row of *mask*."""
+    if not len(arrays.types):
+        empty = np.zeros((mask.shape[0], 0))
+        return empty, empty, empty.astype(np.int64)
+    rates = arrays.rates.astype(np.float64)
+    lo = np.minimum.reduceat(np.where(mask, rates, np.inf), arrays.offsets, axis=1)
+    hi = np.maximum.reduceat(np.where(mask, rates, -np.inf), arrays.offsets, axis=1)
+    count = np.add.reduceat(mask.astype(np.int64), arrays.offsets, axis=1)
+    return lo, hi, count
+
+
+def _grid(km: np.ndarray, rate: np.ndarray) -> List[List[Optional[int]]]:
+    """routes × types price matrix; None where no car of that type is left."""
+    prices = km[:, None] * rate[None, :]
+    out = np.where(np.isfinite(prices), prices, np.nan)
+    return [[None if np.isnan(v) else int(v) for v in row] for row in out]
@@ -0,0 +1,120 @@
+"""Invoice loading benchmark: legacy per-column queries vs. one JOIN.
+
+Reports queries per invoice and p50/p99 latency for both strategies
+against a real database:
+
+    DB_HOST=localhost python bench/bench_invoice.py --iterations 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from db_pool import ConnectionPool   # noqa: E402
+from invoices import load_invoice    # noqa: E402
+
+
+class CountingConnection:
+    """Proxy that counts execute() calls made through its cursors."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.queries = 0
+
+    def cursor(self, *args):
+        outer, cur = self, self._conn.cursor(*args)
+
+        class _Cursor:
+            def execute(self, *a, **kw):
+                outer.queries += 1
+                return cur.execute(*a, **kw)
+
+            def __getattr__(self, name):
+                return getattr(cur, name)
+
+        return _Cursor()
+
+
+def load_invoice_legacy(conn, booking_id):
+    """The query sequence invoice()/pdf_download() issued before the JOIN.
+
+    The old routes read the customer id from a module global; here it
+    costs one extra look-up, so "before" is 14 queries rather than 13.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT userId FROM Booking WHERE bookingId = %s", [booking_id])
+    custid = cursor.fetchall()[0][0]
+    cursor.execute("SELECT carId FROM Booking WHERE bookingId = %s", [booking_id])
+    carrid = cursor.fetchall()[0][0]
+    cursor.execute("SELECT model_name FROM Car WHERE car_id = %s", [carrid])
+    model = cursor.fetchall()[0][0]
+    cursor.execute("SELECT fName,lName FROM Cust_User where userId=%s", [custid])
+    name = cursor.fetchall()
+    cursor.execute("SELECT emailId FROM Cust_User WHERE userId = %s", [custid])
+    email = cursor.fetchall()[0][0]
+    cursor.execute("SELECT phone FROM Cust_User where userId=%s", [custid])
+    phone = cursor.fetchall()[0][0]
+    cursor.execute(
+        "SELECT Cab,startdate,endDate,Pickup_time,Pickup_location,Drop_off_location "
+        "FROM Booking where bookingId=%s", [booking_id])
+    booking = cursor.fetchall()[0]
+    cursor.execute("SELECT driverId FROM Booking where bookingId=%s", [booking_id])
+    driverid = cursor.fetchall()[0][0]
+    cursor.execute("SELECT fName,lName FROM Driver where driverId=%s", [driverid])
+    d_name = cursor.fetchall()
+    cursor.execute("SELECT phone_no FROM Driver where driverId=%s", [driverid])
+    d_phone = cursor.fetchall()[0][0]
+    cursor.execute("SELECT payment_type FROM Payment where bookingId=%s", [booking_id])
+    p_type = cursor.fetchall()[0][0]
+    cursor.execute("SELECT total_amount FROM Payment where bookingId=%s", [booking_id])
+    amount = cursor.fetchall()[0][0]
+    return (model, name, email, phone, booking, d_name, d_phone, p_type, amount)
+
+
+def measure(conn, fn, booking_id, iterations):
+    counting = CountingConnection(conn)
+    fn(counting, booking_id)                         # warm-up
+    per_call = counting.queries
+
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(conn, booking_id)
+        samples.append(time.perf_counter() - t0)
+        conn.rollback()
+    samples.sort()
+    return {
+        "queries_per_invoice": per_call,
+        "p50_ms": round(1000 * samples[len(samples) // 2], 3),
+        "p99_ms": round(1000 * samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+        "mean_ms": round(1000 * statistics.fmean(samples), 3),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--iterations", type=int, default=500)
+    ap.add_argument("--booking-id", type=int,
+                    help="paid booking to load (default: the most recent one)")
+    args = ap.parse_args(argv)
+
+    pool = ConnectionPool.from_env()
+    with pool.connection() as conn:
+        booking_id = args.booking_id
+        if booking_id is None:
+            cur = conn.cursor()
+            cur.execute("SELECT MAX(bookingId) FROM Payment")
+            booking_id = cur.fetchone()[0]
+        if booking_id is None:
+            sys.exit("No paid booking found; pass --booking-id or load a dataset first.")
+
+        for label, fn in (("before (legacy)", load_invoice_legacy), ("after (JOIN)", load_invoice)):
+            print(f"{label:16s}", measure(conn, fn, booking_id, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
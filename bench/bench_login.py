@@ -0,0 +1,115 @@
+"""Login throughput benchmark: inline PBKDF2 vs. the bounded hashing pool.
+
+In-process mode (default) replays the password check of sign() from
+N concurrent "request" threads and reports logins/second and latency
+at each concurrency level, for the old inline verify and for
+PasswordHasher:
+
+    python bench/bench_login.py --rounds 29000 --concurrency 1 2 4 8 16 32
+
+HTTP mode posts real sign-ins to a running server instead:
+
+    python bench/bench_login.py --url http://localhost:5000 \\
+        --username alice_01 --password 'secret-pass'
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from passlib.context import CryptContext              # noqa: E402
+from passwords import HashingBusy, PasswordHasher      # noqa: E402
+
+
+def run_level(check, concurrency, duration):
+    """Call *check* from *concurrency* threads for *duration* seconds."""
+    samples, busy = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        local = []
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            try:
+                check()
+            except HashingBusy:
+                with lock:
+                    busy[0] += 1
+                continue
+            local.append(time.perf_counter() - t0)
+        with lock:
+            samples.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - started
+
+    samples.sort()
+    pct = lambda q: round(1000 * samples[min(len(samples) - 1, int(len(samples) * q))], 1)  # noqa: E731
+    return {
+        "logins_per_s": round(len(samples) / elapsed, 1),
+        "p50_ms": pct(0.50) if samples else None,
+        "p99_ms": pct(0.99) if samples else None,
+        "rejected": busy[0],
+    }
+
+
+def http_check(url, username, password):
+    body = urllib.parse.urlencode({"Username": username, "Password": password}).encode()
+
+    def check():
+        req = urllib.request.Request(url.rstrip("/") + "/echo", data=body, method="POST")
+        try:
+            urllib.request.urlopen(req, timeout=30).read()
+        except urllib.error.HTTPError as exc:
+            if exc.code == 503:
+                raise HashingBusy() from exc
+            if exc.code != 401:
+                raise
+    return check
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    ap.add_argument("--duration", type=float, default=5.0, help="seconds per level")
+    ap.add_argument("--rounds", type=int, default=29000)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2,
+                    help="PasswordHasher pool size")
+    ap.add_argument("--url", help="benchmark a running server instead")
+    ap.add_argument("--username")
+    ap.add_argument("--password")
+    args = ap.parse_args(argv)
+
+    if args.url:
+        check = http_check(args.url, args.username, args.password)
+        for n in args.concurrency:
+            print(f"{'http':9s} c={n:<3d}", run_level(check, n, args.duration))
+        return
+
+    password = "correct horse battery"
+    inline = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__rounds=args.rounds)
+    stored = inline.hash(password)
+    hasher = PasswordHasher(rounds=args.rounds, workers=args.workers,
+                            max_pending=max(args.concurrency))
+
+    for n in args.concurrency:
+        print(f"{'inline':9s} c={n:<3d}", run_level(lambda: inline.verify(password, stored), n, args.duration))
+        print(f"{'pool(%d)' % args.workers:9s} c={n:<3d}",
+              run_level(lambda: hasher.verify(password, stored), n, args.duration))
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
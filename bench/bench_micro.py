@@ -0,0 +1,231 @@
+"""Micro-benchmarks for the per-request helpers: form validation, the
+security-answer crypto and fare lookup.
+
+Each case is warmed up, then timed in --repeat rounds; a round runs the
+case as many times as fit in --min-time seconds (like timeit.autorange),
+so the reported figures are per call. The median is what compare uses;
+min, mean, stdev and the spread between rounds show how noisy a run was.
+
+    python bench/bench_micro.py run --out baseline.json
+    python bench/bench_micro.py run -k Form --repeat 9
+    python bench/bench_micro.py compare baseline.json current.json --threshold 10
+
+compare exits with status 1 when a case's median slowed down by more
+than --threshold percent (run --baseline old.json does the same in one go).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from werkzeug.datastructures import ImmutableMultiDict      # noqa: E402
+
+from addAdmin_validation import AdminRegistrationForm       # noqa: E402
+from addCar_validation import CarForm                       # noqa: E402
+from addDriver_validation import DriverForm                 # noqa: E402
+from booking_validation import BookingForm                  # noqa: E402
+from crypto_utils import decrypt_answer, encrypt_answer     # noqa: E402
+from customer_validation import RegistrationForm            # noqa: E402
+from db_backend import SQLiteBackend                        # noqa: E402
+from fares import FareMatrix                                # noqa: E402
+from feedback_validation import FeedbackForm                # noqa: E402
+from login_validation import LoginForm                      # noqa: E402
+from payment_validation import CardPaymentForm, NetbankingForm   # noqa: E402
+from reset_validation import ResetPasswordForm              # noqa: E402
+
+# Valid submissions, as the browser posts them (request.form is a MultiDict)
+_PERSON = {
+    "FName": "Alice", "lName": "Smith", "username": "asmith_01",
+    "email": "alice@example.com", "PhoneNumber": "9876543210", "age": "29",
+    "Password": "S3cure!pass", "ConfirmPassword": "S3cure!pass",
+    "squestion": "2", "answer": "Greenwood",
+}
+FORMS = [
+    (RegistrationForm, _PERSON),
+    (AdminRegistrationForm, _PERSON),
+    (LoginForm, {"Username": "asmith_01", "Password": "S3cure!pass"}),
+    (ResetPasswordForm, {"username": "asmith_01", "squestion": "2", "answer": "Greenwood",
+                         "password": "N3w!password"}),
+    (BookingForm, {"userId": "asmith_01", "cab": "1", "startDate": "2025-07-15",
+                   "endDate": "2025-07-16", "time": "09:00", "route": "2",
+                   "pickupLocation": "College Road", "dropoffLocation": "Nagpur Station"}),
+    (CardPaymentForm, {"name": "Alice Smith", "cardnumber": "4111-1111-1111-1111"}),
+    (NetbankingForm, {"radio": "0"}),
+    (FeedbackForm, {"view": "1", "comments": "Smooth ride, polite driver.",
+                    "userid": "asmith_01", "email": "alice@example.com"}),
+    (CarForm, {"carid": "MH15-0042", "model": "Swift Dzire", "registration": "MH15AB1234",
+               "seating": "4", "type": "1", "price": "12"}),
+    (DriverForm, {"dfname": "Ravi", "dlname": "Patil", "dphone": "9822012345",
+                  "dage": "41", "license": "MH15-2011-0042"}),
+]
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def form_cases() -> List[Case]:
+    cases = []
+    for form_cls, payload in FORMS:
+        data = ImmutableMultiDict(payload)
+        form = form_cls(data)
+        if not form.is_valid():     # time the accepting path, not an early error
+            raise SystemExit(f"sample {form_cls.__name__} payload no longer validates: {form.errors}")
+
+        def case(form_cls=form_cls, data=data):
+            return form_cls(data).is_valid()
+        cases.append((f"{form_cls.__name__}.is_valid", case))
+    return cases
+
+
+def crypto_cases() -> List[Case]:
+    token = encrypt_answer("Greenwood")
+    return [
+        ("crypto_utils.encrypt_answer", lambda: encrypt_answer("Greenwood")),
+        ("crypto_utils.decrypt_answer", lambda: decrypt_answer(token)),
+    ]
+
+
+def fare_cases(workdir: str) -> List[Case]:
+    """FareMatrix loaded from a scratch SQLite DB with the shipped routes."""
+    conn = SQLiteBackend(os.path.join(workdir, "fares.sqlite3")).connect()
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO Car (Car_id, Car_type, price_per_km, rate_per_km) VALUES (%s, %s, %s, %s)",
+        [(f"CAR{i:03d}", ("Hatchback", "Sedan", "SUV")[i % 3], str(10 + i % 8), 10 + i % 8)
+         for i in range(300)],
+    )
+    conn.commit()
+    fares = FareMatrix()
+    fares.load(conn)
+    conn.close()
+    route = fares.routes()[1].name
+    return [
+        ("FareMatrix.fare", lambda: fares.fare(route, "CAR123")),
+        ("FareMatrix.fare (unknown car)", lambda: fares.fare(route, "NOPE")),
+    ]
+
+
+# ─── timing ──────────────────────────────────────────────────────────
+def calibrate(fn: Callable[[], object], min_time: float) -> int:
+    """Smallest 1/2/5 x 10**k loop count that takes at least *min_time*."""
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            loops = number * factor
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            if time.perf_counter() - started >= min_time:
+                return loops
+        number *= 10
+
+
+def measure(fn: Callable[[], object], *, repeat: int, min_time: float, warmup: float) -> Dict:
+    deadline = time.perf_counter() + warmup
+    while time.perf_counter() < deadline:
+        fn()
+    loops = calibrate(fn, min_time)
+    rounds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        rounds.append((time.perf_counter() - started) / loops)
+    us = [1e6 * r for r in rounds]
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "median_us": round(statistics.median(us), 3),
+        "min_us": round(min(us), 3),
+        "mean_us": round(statistics.fmean(us), 3),
+        "stdev_us": round(statistics.stdev(us), 3) if len(us) > 1 else 0.0,
+        "spread_pct": round(100 * (max(us) - min(us)) / statistics.median(us), 1),
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> bool:
+    """Print per-case median changes; True if any slowed beyond *threshold*."""
+    regressed = False
+    print(f"{'case':<36} {'base µs':>10} {'now µs':>10} {'change':>8}")
+    for name, now in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<36} {'-':>10} {now['median_us']:>10} {'new':>8}")
+            continue
+        delta = 100 * (now["median_us"] - old["median_us"]) / old["median_us"]
+        slower = delta > threshold
+        regressed |= slower
+        print(f"{name:<36} {old['median_us']:>10} {now['median_us']:>10} {delta:>+7.1f}%"
+              f"{'  SLOWER' if slower else ''}")
+    return regressed
+
+
+def run(args) -> Dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        cases = form_cases() + crypto_cases() + fare_cases(workdir)
+    if args.k:
+        cases = [(name, fn) for name, fn in cases if args.k.lower() in name.lower()]
+
+    results = {}
+    print(f"{'case':<36} {'median µs':>10} {'min':>9} {'stdev':>9} {'spread':>7} {'loops':>8}")
+    for name, fn in cases:
+        r = results[name] = measure(fn, repeat=args.repeat, min_time=args.min_time, warmup=args.warmup)
+        print(f"{name:<36} {r['median_us']:>10} {r['min_us']:>9} {r['stdev_us']:>9} "
+              f"{r['spread_pct']:>6}% {r['loops']:>8}")
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="run the benchmarks")
+    r.add_argument("-k", help="only cases whose name contains this")
+    r.add_argument("--repeat", type=int, default=7, help="timed rounds per case")
+    r.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    r.add_argument("--warmup", type=float, default=0.2, help="seconds of warmup per case")
+    r.add_argument("--out", help="write results as JSON here")
+    r.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    r.add_argument("--threshold", type=float, default=10.0, help="slowdown threshold, percent")
+    c = sub.add_parser("compare", help="compare two JSON results")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=10.0, help="slowdown threshold, percent")
+    args = ap.parse_args(argv)
+
+    if args.command == "run":
+        current = run(args)
+        if args.out:
+            with open(args.out, "w") as fh:
+                json.dump(current, fh, indent=2)
+        if not args.baseline:
+            return
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+    else:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+        with open(args.current) as fh:
+            current = json.load(fh)
+    if compare(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Minimal in-process SMTP sink used in place of MailHog.
+
+Speaks just enough SMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+for smtplib and records every accepted message. It can also be told to
+answer the next few transactions with a temporary or permanent error,
+to exercise the outbox's retry and dead-letter paths.
+
+    python bench/fake_smtp.py --port 1025      # then MAIL_SERVER=localhost
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.connections = 0
+        self.fail_next: List[str] = []     # replies used instead of "250 OK" after DATA
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def wait_for(self, count: int, timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if len(self.messages) >= count:
+                return True
+            time.sleep(0.01)
+        return False
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server: FakeSMTPServer = self.server
+        with server._lock:
+            server.connections += 1
+        self._reply("220 fake-smtp ready")
+        sender, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode("latin-1").strip()
+            verb = cmd.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 fake-smtp")
+            elif verb == "MAIL":
+                sender, rcpts = cmd.split(":", 1)[1].strip(" <>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpts.append(cmd.split(":", 1)[1].strip(" <>"))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b".\n", b""):
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                with server._lock:
+                    failure = server.fail_next.pop(0) if server.fail_next else None
+                    if failure is None:
+                        server.messages.append((sender, rcpts, b"".join(data)))
+                self._reply(failure or "250 OK queued")
+            elif verb == "RSET":
+                sender, rcpts = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+    def _reply(self, text: str) -> None:
+        self.wfile.write(text.encode("latin-1") + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=1025)
+    args = ap.parse_args(argv)
+
+    server = FakeSMTPServer(args.host, args.port)
+    print(f"fake SMTP listening on {args.host}:{server.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"{len(server.messages)} messages over {server.connections} connections")
+
+
+if __name__ == "__main__":
+    main()
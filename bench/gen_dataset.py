@@ -0,0 +1,361 @@
+"""Deterministic synthetic dataset for scale testing.
+
+Fills Cust_User, Car, Driver, Booking, Payment, Feedback and
+Login_History with referentially consistent rows, sized by the total
+row count wanted (suffixes k/M accepted):
+
+    python bench/gen_dataset.py --rows 10k --dry-run     # just print the plan
+    python bench/gen_dataset.py --rows 1M --seed 7
+    python bench/gen_dataset.py --rows 100M --chunk 20000 --load-data --truncate
+
+The same --rows and --seed always give the same rows, whatever --chunk.
+Per user there are 3 bookings (90% of them paid), 8 logins and one
+feedback in four; one car and its driver serve every 40 users, and a
+car's bookings never overlap, so the allocation queries see a realistic
+busy fleet rather than a fully booked one. Legacy varchar columns and
+their typed twins (migration 0005) are both filled.
+
+Every customer signs in with --password and answers the security
+question with "blue"; both are hashed/encrypted once, with a salt and IV
+taken from the seed.
+
+Rows are loaded --chunk at a time, one transaction per chunk, through
+executemany() (a multi-row INSERT on MySQL) or, with --load-data,
+LOAD DATA LOCAL INFILE from a temporary file (MySQL only). Uses the
+DB_BACKEND / DB_* settings of the app; the target tables must be empty
+unless --truncate is given.
+"""
+import argparse
+import base64
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterator, List, Sequence, Tuple
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from Crypto.Cipher import AES                       # noqa: E402
+from passlib.hash import pbkdf2_sha256              # noqa: E402
+
+from crypto_utils import SECRET_KEY, pad            # noqa: E402
+from db_backend import MySQLBackend, backend_from_env   # noqa: E402
+
+# column order of the generated rows
+COLUMNS = {
+    "Cust_User": ("userId", "fName", "lName", "emailId", "phone", "registration_Date",
+                  "registered_on", "password", "reset_Question", "reset_Ans_Type"),
+    "Car": ("Car_id", "model_name", "registeration_no", "seating_capacity", "Car_type",
+            "price_per_km", "rate_per_km"),
+    "Driver": ("driverId", "fName", "lName", "phone_no", "licence_no", "age"),
+    "Booking": ("bookingId", "userId", "Cab", "startDate", "endDate", "Pickup_time",
+                "start_on", "end_on", "pickup_at", "Pickup_location", "Drop_off_location",
+                "driverId", "carid", "cab_route"),
+    "Payment": ("Payment_id", "payment_type", "status", "bookingId", "total_amount",
+                "idempotency_key"),
+    "Feedback": ("id", "userId", "fName", "lName", "emailId", "rating", "comments", "Date"),
+    "Login_History": ("id", "user", "userId", "Date", "Time", "logged_at"),
+}
+TABLES = tuple(COLUMNS)        # parents before children
+
+BOOKINGS_PER_USER = 3
+PAID_SHARE = 0.9
+LOGINS_PER_USER = 8
+FEEDBACK_PER_USER = 0.25
+USERS_PER_CAR = 40
+SLOT_DAYS = 4                  # a car's n-th booking falls in days [4n, 4n+3]
+
+FIRST_NAMES = ("Aarav", "Vivaan", "Aditya", "Ananya", "Diya", "Ishaan", "Kavya", "Meera",
+               "Rohan", "Saanvi", "Arjun", "Priya", "Neha", "Kabir", "Riya", "Vihaan")
+LAST_NAMES = ("Patil", "Sharma", "Deshmukh", "Joshi", "Kulkarni", "Pawar", "Shinde",
+              "Jadhav", "Gupta", "Iyer", "Nair", "Reddy", "Mehta", "Chavan", "Rao")
+CAR_TYPES = ("Hatchback", "Sedan", "SUV")
+MODELS = {
+    "Hatchback": ("Swift", "i20", "Baleno", "Tiago"),
+    "Sedan": ("City", "Verna", "Dzire", "Ciaz"),
+    "SUV": ("Innova", "XUV700", "Creta", "Ertiga"),
+}
+SEATS = {"Hatchback": "4", "Sedan": "5", "SUV": "7"}
+BASE_RATE = {"Hatchback": 10, "Sedan": 13, "SUV": 17}
+PLACES = ("College Road", "Gangapur Road", "CBS Nashik", "Nashik Road Station", "Pune Station",
+          "Mumbai Central", "Nagpur Station", "Dhule Bus Stand", "Aurangabad Airport", "Panchavati")
+PAYMENT_TYPES = ("Credit Card", "Debit Card", "Net Banking")
+RATINGS = ("Excellent", "Good", "Neutral", "Poor")
+COMMENTS = ("Clean car and a punctual driver.", "Smooth ride.", "Pickup was a bit late.",
+            "Good value for money.", "Driver was very polite.", "Car could have been cleaner.")
+
+
+@dataclass(frozen=True)
+class Plan:
+    users: int
+    fleet: int                 # cars, each with its own driver
+    bookings: int
+    feedback: int
+    logins: int
+
+    @classmethod
+    def for_rows(cls, rows: int) -> "Plan":
+        per_user = (1 + 2 / USERS_PER_CAR + BOOKINGS_PER_USER * (1 + PAID_SHARE)
+                    + FEEDBACK_PER_USER + LOGINS_PER_USER)
+        users = max(USERS_PER_CAR, round(rows / per_user))
+        return cls(
+            users=users,
+            fleet=max(len(CAR_TYPES), users // USERS_PER_CAR),
+            bookings=users * BOOKINGS_PER_USER,
+            feedback=int(users * FEEDBACK_PER_USER),
+            logins=users * LOGINS_PER_USER,
+        )
+
+    @property
+    def days(self) -> int:
+        """Length of the booking period."""
+        return SLOT_DAYS * -(-self.bookings // self.fleet)
+
+
+def parse_size(text: str) -> int:
+    scale = {"k": 10 ** 3, "m": 10 ** 6}.get(text[-1:].lower(), 1)
+    return int(float(text[:-1] if scale > 1 else text) * scale)
+
+
+def _rng(seed: int, table: str) -> random.Random:
+    """One independent stream per table, so tables can be regenerated alone."""
+    return random.Random(f"{seed}:{table}")
+
+
+# ─── rows ────────────────────────────────────────────────────────────
+def person(n: int) -> Tuple[str, str, str, str, str]:
+    """userId, first name, last name, email and phone of customer *n*."""
+    first = FIRST_NAMES[n % len(FIRST_NAMES)]
+    last = LAST_NAMES[(n // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    user_id = f"{first.lower()}_{n:07d}"
+    return user_id, first, last, f"{user_id}@example.com", f"9{n % 10 ** 9:09d}"
+
+
+def car(c: int) -> Tuple[str, str, int]:
+    """Car_id, type and per-km rate of car *c* (driver c + 1 drives it)."""
+    kind = CAR_TYPES[c % len(CAR_TYPES)]
+    return f"CAR{c:06d}", kind, BASE_RATE[kind] + (c * 7) % 4
+
+
+def credentials(seed: int, password: str) -> Tuple[str, str]:
+    """Password hash and encrypted security answer shared by every customer."""
+    rng = _rng(seed, "credentials")
+    hashed = pbkdf2_sha256.using(salt=rng.randbytes(16)).hash(password)
+    iv = rng.randbytes(16)
+    answer = iv + AES.new(SECRET_KEY, AES.MODE_CBC, iv).encrypt(pad("blue"))
+    return hashed, base64.b64encode(answer).decode("ascii")
+
+
+def users(plan: Plan, seed: int, start: datetime.date, password_hash: str, answer: str):
+    rng = _rng(seed, "Cust_User")
+    for n in range(plan.users):
+        user_id, first, last, email, phone = person(n)
+        day = start - datetime.timedelta(days=rng.randrange(730))
+        yield (user_id, first, last, email, phone, day.strftime("%d-%m-%Y"), day,
+               password_hash, str(rng.randint(1, 4)), answer)
+
+
+def cars(plan: Plan, seed: int):
+    rng = _rng(seed, "Car")
+    for c in range(plan.fleet):
+        car_id, kind, rate = car(c)
+        yield (car_id, rng.choice(MODELS[kind]), f"MH{c % 50 + 1:02d}{c:07d}", SEATS[kind],
+               kind, str(rate), Decimal(rate))
+
+
+def drivers(plan: Plan, seed: int):
+    rng = _rng(seed, "Driver")
+    for c in range(plan.fleet):
+        first = rng.choice(FIRST_NAMES)
+        yield (c + 1, first, rng.choice(LAST_NAMES), f"8{rng.randrange(10 ** 9):09d}",
+               f"MH{c % 50 + 1:02d}DL{c:09d}", rng.randint(22, 60))
+
+
+def bookings(plan: Plan, seed: int, start: datetime.date, routes: Sequence[Tuple[str, int]]):
+    rng = _rng(seed, "Booking")
+    for i in range(plan.bookings):
+        c, slot = i % plan.fleet, i // plan.fleet
+        car_id, kind, _ = car(c)
+        first = start + datetime.timedelta(days=SLOT_DAYS * slot + rng.randrange(2))
+        last = first + datetime.timedelta(days=rng.randrange(3))
+        clock = f"{rng.randint(6, 21):02d}:{rng.choice((0, 30)):02d}"
+        pickup, dropoff = rng.sample(PLACES, 2)
+        route = rng.choice(routes)[0]
+        yield (i + 1, person(rng.randrange(plan.users))[0], kind, first.isoformat(),
+               last.isoformat(), clock, first, last, clock, pickup, dropoff, c + 1, car_id, route)
+
+
+def payments(plan: Plan, seed: int, start: datetime.date, routes: Sequence[Tuple[str, int]]):
+    rng = _rng(seed, "Payment")
+    distance = dict(routes)
+    payment_id = 0
+    for booking in bookings(plan, seed, start, routes):
+        if rng.random() >= PAID_SHARE:
+            continue
+        booking_id, rate = booking[0], car(booking[11] - 1)[2]
+        kind = rng.choice(PAYMENT_TYPES)
+        status = "Not Paid" if kind == "Net Banking" and rng.random() < 0.05 else "Paid"
+        payment_id += 1
+        yield (payment_id, kind, status, booking_id, distance[booking[13]] * rate,
+               f"booking:{booking_id}")
+
+
+def feedback(plan: Plan, seed: int, start: datetime.date):
+    rng = _rng(seed, "Feedback")
+    for i in range(plan.feedback):
+        user_id, first, last, email, _ = person(rng.randrange(plan.users))
+        day = start + datetime.timedelta(days=rng.randrange(plan.days))
+        rating = rng.choices(RATINGS, weights=(40, 35, 15, 10))[0]
+        yield (i + 1, user_id, first, last, email, rating, rng.choice(COMMENTS),
+               day.strftime("%d-%m-%Y"))
+
+
+def logins(plan: Plan, seed: int, start: datetime.date):
+    rng = _rng(seed, "Login_History")
+    origin = datetime.datetime.combine(start, datetime.time())
+    for i in range(plan.logins):
+        at = origin + datetime.timedelta(seconds=rng.randrange(plan.days * 86400))
+        yield (i + 1, "Customer", person(rng.randrange(plan.users))[0],
+               at.strftime("%d-%m-%Y"), at.strftime("%H:%M:%S"), at)
+
+
+# ─── loading ─────────────────────────────────────────────────────────
+class Loader:
+    """Writes rows *chunk* at a time, committing after each chunk."""
+
+    def __init__(self, conn, *, chunk: int, load_data: bool):
+        self.conn = conn
+        self.chunk = chunk
+        self.load_data = load_data
+        self.cur = conn.cursor()
+        # generated rows are consistent by construction; on MySQL skip the
+        # per-row FK/unique checks (no-ops on SQLite)
+        self.cur.execute("SET SESSION foreign_key_checks = 0")
+        self.cur.execute("SET SESSION unique_checks = 0")
+
+    def load(self, table: str, rows: Iterator[tuple]) -> int:
+        count, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.chunk:
+                count += self._write(table, batch)
+                batch = []
+        if batch:
+            count += self._write(table, batch)
+        return count
+
+    def _write(self, table: str, batch: List[tuple]) -> int:
+        columns = COLUMNS[table]
+        if self.load_data:
+            with tempfile.NamedTemporaryFile("w", suffix=".tsv", delete=False) as fh:
+                fh.writelines("\t".join(map(_tsv, row)) + "\n" for row in batch)
+            try:
+                self.cur.execute(
+                    f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                    f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                    (fh.name,),
+                )
+            finally:
+                os.unlink(fh.name)
+        else:
+            self.cur.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join(['%s'] * len(columns))})",
+                batch,
+            )
+        self.conn.commit()
+        return len(batch)
+
+
+def _tsv(value) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime.datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def load_routes(conn) -> List[Tuple[str, int]]:
+    cur = conn.cursor()
+    cur.execute("SELECT name, distance_km FROM Route WHERE active = 1 ORDER BY route_id")
+    routes = [(name, int(km)) for name, km in cur.fetchall()]
+    cur.close()
+    if not routes:
+        raise SystemExit("the Route table is empty; apply the migrations first")
+    return routes
+
+
+def prepare(conn, backend, truncate: bool) -> None:
+    """Make sure the target tables are empty, emptying them if asked to."""
+    cur = conn.cursor()
+    cur.execute("SET SESSION foreign_key_checks = 0")
+    for table in reversed(TABLES):
+        if truncate:
+            cur.execute(f"TRUNCATE TABLE {table}" if backend.name == "mysql" else f"DELETE FROM {table}")
+        else:
+            cur.execute(f"SELECT 1 FROM {table} LIMIT 1")
+            if cur.fetchone():
+                raise SystemExit(f"{table} already has rows; use --truncate to replace them")
+    conn.commit()
+    cur.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate a synthetic car rental dataset")
+    ap.add_argument("--rows", type=parse_size, default=parse_size("10k"),
+                    help="approximate total rows, e.g. 10k, 1M, 100M")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--start", type=datetime.date.fromisoformat, default=datetime.date(2024, 1, 1),
+                    help="first day of the booking period")
+    ap.add_argument("--chunk", type=int, default=5000, help="rows per transaction")
+    ap.add_argument("--password", default="Bench#2024", help="password of every generated customer")
+    ap.add_argument("--load-data", action="store_true", help="use LOAD DATA LOCAL INFILE (MySQL)")
+    ap.add_argument("--truncate", action="store_true", help="empty the target tables first")
+    ap.add_argument("--dry-run", action="store_true", help="print the plan and exit")
+    args = ap.parse_args(argv)
+
+    plan = Plan.for_rows(args.rows)
+    print(f"users={plan.users} cars=drivers={plan.fleet} bookings={plan.bookings} "
+          f"payments~{int(plan.bookings * PAID_SHARE)} feedback={plan.feedback} "
+          f"logins={plan.logins}; bookings span {plan.days} days from {args.start}")
+    if args.dry_run:
+        return
+
+    backend = backend_from_env()
+    if args.load_data:
+        if backend.name != "mysql":
+            raise SystemExit("--load-data needs DB_BACKEND=mysql")
+        backend = MySQLBackend(**backend.params, local_infile=1)
+    conn = backend.connect()
+    prepare(conn, backend, args.truncate)
+    routes = load_routes(conn)
+    password_hash, answer = credentials(args.seed, args.password)
+
+    loader = Loader(conn, chunk=args.chunk, load_data=args.load_data)
+    jobs = (
+        ("Cust_User", users(plan, args.seed, args.start, password_hash, answer)),
+        ("Car", cars(plan, args.seed)),
+        ("Driver", drivers(plan, args.seed)),
+        ("Booking", bookings(plan, args.seed, args.start, routes)),
+        ("Payment", payments(plan, args.seed, args.start, routes)),
+        ("Feedback", feedback(plan, args.seed, args.start)),
+        ("Login_History", logins(plan, args.seed, args.start)),
+    )
+    total, started = 0, time.monotonic()
+    for table, rows in jobs:
+        t0 = time.monotonic()
+        count = loader.load(table, rows)
+        elapsed = time.monotonic() - t0
+        total += count
+        print(f"{table:<14} {count:>11} rows  {elapsed:7.1f}s  {count / max(elapsed, 1e-9):>9.0f} rows/s")
+    conn.close()
+    print(f"{total} rows in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""End-to-end load test: register -> sign in -> book -> pay -> invoice.
+
+Starts the app locally on an embedded SQLite database (DB_BACKEND=sqlite)
+with a seeded fleet and FakeSMTPServer as mail relay, so it runs fully
+offline, then drives the whole customer flow from --users concurrent
+virtual users, each with its own cookie jar:
+
+    adduser -> /echo -> /bookingNow/ -> /payment -> credit/debit/net
+    banking payment (round robin) -> /generateinvoice/
+
+Per step it reports requests, error rate, throughput and latency
+percentiles, and writes them to --out as JSON. --baseline compares with
+an earlier run and flags steps whose p50/p99 rose by more than
+--threshold percent, or whose throughput fell by as much (exit status 1):
+
+    python bench/load_flow.py --users 16 --iterations 10 --out run.json
+    python bench/load_flow.py --users 16 --iterations 10 --baseline run.json
+
+--url drives an already running instance instead; it must have free
+Hatchback cars and drivers, and a session cookie usable over its scheme.
+"""
+import argparse
+import datetime
+import http.cookiejar
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCH_DIR, "..", "app")
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from db_backend import SQLiteBackend   # noqa: E402
+from fake_smtp import FakeSMTPServer   # noqa: E402
+
+STEPS = ("register", "signin", "book", "payment_page", "pay", "invoice")
+PAYMENTS = (
+    ("/creditPAYMENT", {"name": "Load Tester", "cardnumber": "4111111111111111"}),
+    ("/debitPAYMENT", {"name": "Load Tester", "cardnumber": "5500000000000004"}),
+    ("/netbankingPAYMENT", {"radio": "0"}),
+)
+PASSWORD = "Load#Test1"
+FIRST_DAY = datetime.date(2031, 1, 1)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None                     # surface the 302 and its Location
+
+
+class VirtualUser:
+    """One browser: a cookie jar and a timed request helper."""
+
+    def __init__(self, base_url: str, record):
+        self.base_url = base_url.rstrip("/")
+        self.record = record
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect()
+        )
+
+    def call(self, step: str, path: str, form=None, expect=(200,)):
+        data = urllib.parse.urlencode(form).encode() if form is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=60) as resp:
+                status, headers, body = resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as exc:
+            status, headers, body = exc.code, exc.headers, exc.read()
+        except OSError:
+            status, headers, body = 0, {}, b""
+        ok = status in expect
+        self.record(step, time.perf_counter() - started, ok)
+        return ok, headers.get("Location", ""), body
+
+
+def run_flow(vu: VirtualUser, username: str, day: datetime.date, payment) -> bool:
+    ok, _, _ = vu.call("register", "/adduser/", {
+        "FName": "Load", "lName": "Tester", "username": username,
+        "email": f"{username}@example.com", "PhoneNumber": "9876543210", "age": "30",
+        "Password": PASSWORD, "ConfirmPassword": PASSWORD, "squestion": "1", "answer": "blue",
+    }, expect=(302,))
+    if not ok:
+        return False
+    ok, _, _ = vu.call("signin", "/echo", {"Username": username, "Password": PASSWORD}, expect=(302,))
+    if not ok:
+        return False
+    ok, location, _ = vu.call("book", "/bookingNow/", {
+        "userId": username, "cab": "0", "route": "1", "time": "09:30",
+        "startDate": day.isoformat(), "endDate": (day + datetime.timedelta(days=1)).isoformat(),
+        "pickupLocation": "College Road", "dropoffLocation": "Pune Station",
+    }, expect=(302,))
+    if not ok or "/payment" not in location:
+        return False
+    ok, _, _ = vu.call("payment_page", "/payment")
+    if not ok:
+        return False
+    path, form = payment
+    ok, location, _ = vu.call("pay", path, form, expect=(302,))
+    if not ok or "generateinvoice" not in location:
+        return False
+    ok, _, _ = vu.call("invoice", urllib.parse.urlsplit(location)._replace(scheme="", netloc="").geturl())
+    return ok
+
+
+def run_load(base_url: str, users: int, iterations: int, run_id: str):
+    samples = defaultdict(list)         # step -> [(seconds, ok)]
+    lock = threading.Lock()
+    days = itertools.count()            # every booking gets its own dates
+
+    def record(step, seconds, ok):
+        with lock:
+            samples[step].append((seconds, ok))
+
+    def user(n):
+        vu = VirtualUser(base_url, record)
+        done = 0
+        for i in range(iterations):
+            day = FIRST_DAY + datetime.timedelta(days=3 * next(days))
+            if run_flow(vu, f"lt{run_id}u{n}i{i}", day, PAYMENTS[(n + i) % len(PAYMENTS)]):
+                done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(users) as pool:
+        completed = sum(pool.map(user, range(users)))
+    return samples, completed, time.perf_counter() - started
+
+
+def summarise(samples, completed, total, elapsed):
+    steps = {}
+    for step in STEPS:
+        rows = samples.get(step, [])
+        if not rows:
+            continue
+        times = sorted(s for s, _ in rows)
+        errors = sum(1 for _, ok in rows if not ok)
+        pct = lambda q: round(1000 * times[min(len(times) - 1, int(len(times) * q))], 1)  # noqa: E731
+        steps[step] = {
+            "requests": len(rows),
+            "errors": errors,
+            "error_rate": round(errors / len(rows), 4),
+            "rps": round(len(rows) / elapsed, 1),
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "max_ms": round(1000 * times[-1], 1),
+        }
+    return {
+        "flows": {"started": total, "completed": completed,
+                  "flows_per_s": round(completed / elapsed, 2), "elapsed_s": round(elapsed, 2)},
+        "steps": steps,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Lines describing per-step changes; flags p50/p99 regressions."""
+    lines, regressed = [], False
+    for step, now in current["steps"].items():
+        old = baseline.get("steps", {}).get(step)
+        if not old:
+            continue
+        parts = []
+        for key in ("p50_ms", "p99_ms", "rps"):
+            if old[key]:
+                delta = 100 * (now[key] - old[key]) / old[key]
+                slower = delta > threshold if key != "rps" else delta < -threshold
+                regressed |= slower
+                parts.append(f"{key} {old[key]} -> {now[key]} ({delta:+.0f}%{' !' if slower else ''})")
+        lines.append(f"  {step:<13} " + "   ".join(parts))
+    return lines, regressed
+
+
+# ─── local instance ──────────────────────────────────────────────────
+def seed(db_path: str, cars: int, drivers: int) -> None:
+    conn = SQLiteBackend(db_path).connect()        # creates the schema
+    cur = conn.cursor()
+    cur.executemany(
+        "INSERT INTO Car (Car_id, model_name, registeration_no, seating_capacity, Car_type, "
+        "                 price_per_km, rate_per_km) VALUES (%s, 'Load', %s, '4', %s, '12', 12)",
+        [(f"LT-{t}-{i}", f"MH15{t[:2].upper()}{i:04d}", t)
+         for t in ("Hatchback", "Sedan", "SUV") for i in range(cars)],
+    )
+    cur.executemany(
+        "INSERT INTO Driver (fName, lName, phone_no, licence_no, age) VALUES ('Load', 'Driver', '9000000000', %s, 40)",
+        [(f"LT-D{i}",) for i in range(drivers)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(workdir: str, smtp_port: int, extra_env) -> Tuple[subprocess.Popen, str]:
+    port = free_port()
+    env = dict(
+        os.environ,
+        DB_BACKEND="sqlite",
+        DB_PATH=os.path.join(workdir, "car_rental.sqlite3"),
+        MAIL_SERVER="127.0.0.1",
+        MAIL_PORT=str(smtp_port),
+        MAIL_OUTBOX_PATH=os.path.join(workdir, "outbox.sqlite3"),
+        PDF_CACHE_DIR=os.path.join(workdir, "pdf"),
+        SECRET_KEY="load-test",
+        SESSION_COOKIE_SECURE="0",      # the harness talks plain HTTP
+        PORT=str(port),
+        **extra_env,
+    )
+    log = open(os.path.join(workdir, "server.log"), "wb")
+    proc = subprocess.Popen([sys.executable, "main.py"], cwd=APP_DIR, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"server exited with {proc.returncode}; see {log.name}")
+        try:
+            urllib.request.urlopen(base_url + "/", timeout=2).read()
+            return proc, base_url
+        except OSError:
+            time.sleep(0.25)
+    proc.terminate()
+    raise SystemExit(f"server did not come up; see {log.name}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    ap.add_argument("--iterations", type=int, default=5, help="flows per user")
+    ap.add_argument("--cars", type=int, default=20, help="seeded cars per type")
+    ap.add_argument("--drivers", type=int, default=20)
+    ap.add_argument("--pbkdf2-rounds", type=int, help="PBKDF2_ROUNDS for the local server")
+    ap.add_argument("--url", help="drive a running instance instead of starting one")
+    ap.add_argument("--out", help="write results as JSON here")
+    ap.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    ap.add_argument("--threshold", type=float, default=10.0, help="regression threshold, percent")
+    args = ap.parse_args(argv)
+
+    run_id = format(int(time.time()) % 100000, "05d")
+    smtp = proc = None
+    workdir = tempfile.mkdtemp(prefix="car_rental_load_")
+    try:
+        if args.url:
+            base_url = args.url
+        else:
+            smtp = FakeSMTPServer()
+            smtp.start()
+            seed(os.path.join(workdir, "car_rental.sqlite3"), args.cars, args.drivers)
+            extra = {"PBKDF2_ROUNDS": str(args.pbkdf2_rounds)} if args.pbkdf2_rounds else {}
+            proc, base_url = start_app(workdir, smtp.port, extra)
+
+        samples, completed, elapsed = run_load(base_url, args.users, args.iterations, run_id)
+        result = summarise(samples, completed, args.users * args.iterations, elapsed)
+        result["meta"] = {
+            "url": base_url if args.url else "local sqlite",
+            "users": args.users,
+            "iterations": args.iterations,
+            "started": datetime.datetime.now().isoformat(timespec="seconds"),
+        }
+        if smtp is not None:
+            smtp.wait_for(completed * 2, timeout=10)      # welcome + payment confirmation
+            result["flows"]["mails_received"] = len(smtp.messages)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(10)
+        if smtp is not None:
+            smtp.stop()
+
+    flows = result["flows"]
+    print(f"{flows['completed']}/{flows['started']} flows in {flows['elapsed_s']}s "
+          f"({flows['flows_per_s']} flows/s)")
+    print(f"  {'step':<13} {'reqs':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for step, s in result["steps"].items():
+        print(f"  {step:<13} {s['requests']:>6} {100 * s['error_rate']:>6.1f} {s['rps']:>7} "
+              f"{s['p50_ms']:>8} {s['p90_ms']:>8} {s['p99_ms']:>8} {s['max_ms']:>8}")
+    if not args.url:
+        print(f"server log: {os.path.join(workdir, 'server.log')}")
+
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(result, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            lines, regressed = compare(result, json.load(fh), args.threshold)
+        print(f"vs {args.baseline}:")
+        print("\n".join(lines))
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
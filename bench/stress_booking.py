@@ -0,0 +1,190 @@
+"""Concurrency stress test for car/driver allocation.
+
+Seeds a small throw-away fleet, fires hundreds of bookings for the same
+dates at it in parallel through ``allocation.reserve_car_and_driver`` and
+asserts that no car or driver ended up on two overlapping bookings.
+With ``--stale-index`` the in-memory index is never told about new
+bookings, as in a multi-process deployment, so only the database-side
+checks stand between the workers and a double booking.
+
+It never runs against the application's database: by default it creates
+a temporary SQLite file, and ``--mysql-db`` names a dedicated MySQL schema
+(loaded from db/car_rental_db.sql) on the server DB_HOST points at.
+
+    python bench/stress_booking.py --bookings 400 --cars 12 --drivers 10
+    DB_HOST=localhost python bench/stress_booking.py --mysql-db car_rental_stress --stale-index
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+from allocation import reserve_car_and_driver  # noqa: E402
+from availability import AvailabilityIndex      # noqa: E402
+from db_backend import MySQLBackend, SQLiteBackend   # noqa: E402
+from db_pool import ConnectionPool              # noqa: E402
+
+PREFIX = "stress"
+CAR_TYPE = "Sedan"
+START = datetime.date(2030, 1, 10)
+END = datetime.date(2030, 1, 12)
+
+
+def seed(pool, n_cars: int, n_drivers: int):
+    """Insert the stress fleet and park every other available car/driver.
+
+    Returns the ids of the rows it parked, so restore() can put back
+    exactly those and leave everything else as it found it.
+    """
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        cleanup(cur)
+        cur.execute(
+            "INSERT INTO Cust_User (userId, fName, lName) VALUES (%s, 'Stress', 'Test')",
+            (PREFIX + "_user",),
+        )
+        cur.executemany(
+            "INSERT INTO Car (Car_id, model_name, Car_type, price_per_km, status) "
+            "VALUES (%s, 'Stress', %s, '10', 'Available')",
+            [(f"{PREFIX}-{i}", CAR_TYPE) for i in range(n_cars)],
+        )
+        cur.executemany(
+            "INSERT INTO Driver (fName, lName, licence_no, status) "
+            "VALUES ('Stress', 'Driver', %s, 'Available')",
+            [(f"{PREFIX}-{i}",) for i in range(n_drivers)],
+        )
+        # park the pre-existing available cars/drivers so only the stress fleet is claimable
+        cur.execute("SELECT Car_id FROM Car WHERE status = 'Available' AND Car_id NOT LIKE %s",
+                    (PREFIX + "-%",))
+        cars = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT driverId FROM Driver WHERE status = 'Available' AND licence_no NOT LIKE %s",
+                    (PREFIX + "-%",))
+        drivers = [row[0] for row in cur.fetchall()]
+        cur.executemany("UPDATE Car SET status = 'Parked' WHERE Car_id = %s AND status = 'Available'",
+                        [(c,) for c in cars])
+        cur.executemany("UPDATE Driver SET status = 'Parked' WHERE driverId = %s AND status = 'Available'",
+                        [(d,) for d in drivers])
+        conn.commit()
+    return cars, drivers
+
+
+def restore(cur, cars, drivers):
+    """Un-park the rows seed() parked, and only those."""
+    cur.executemany("UPDATE Car SET status = 'Available' WHERE Car_id = %s AND status = 'Parked'",
+                    [(c,) for c in cars])
+    cur.executemany("UPDATE Driver SET status = 'Available' WHERE driverId = %s AND status = 'Parked'",
+                    [(d,) for d in drivers])
+
+
+def cleanup(cur):
+    cur.execute("DELETE FROM Booking WHERE userId = %s", (PREFIX + "_user",))
+    cur.execute("DELETE FROM Car WHERE Car_id LIKE %s", (PREFIX + "-%",))
+    cur.execute("DELETE FROM Driver WHERE licence_no LIKE %s", (PREFIX + "-%",))
+    cur.execute("DELETE FROM Cust_User WHERE userId = %s", (PREFIX + "_user",))
+
+
+def book_once(pool, index, start_gate: threading.Event, update_index: bool):
+    start_gate.wait()
+    with pool.connection() as conn:
+        reserved = reserve_car_and_driver(conn, index, CAR_TYPE, START, END)
+        if reserved is None:
+            return None
+        carid, driverid = reserved
+        cur = conn.cursor()
+        cur.execute(
+            "INSERT INTO Booking (userId, Cab, startDate, endDate, driverId, carid, cab_route) "
+            "VALUES (%s, %s, %s, %s, %s, %s, 'Nashik-Pune')",
+            (PREFIX + "_user", CAR_TYPE, str(START), str(END), driverid, carid),
+        )
+        booking_id = cur.lastrowid
+        conn.commit()
+        if update_index:
+            index.add_booking(booking_id, carid, driverid, START, END)
+        return reserved
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--bookings", type=int, default=300)
+    ap.add_argument("--cars", type=int, default=12)
+    ap.add_argument("--drivers", type=int, default=10)
+    ap.add_argument("--workers", type=int, default=64)
+    ap.add_argument("--stale-index", action="store_true",
+                    help="never update the in-memory index after booking")
+    ap.add_argument("--mysql-db", metavar="NAME",
+                    help="dedicated MySQL schema to use instead of a temporary SQLite file")
+    args = ap.parse_args(argv)
+
+    if args.mysql_db is None:
+        with tempfile.TemporaryDirectory(prefix="stress_booking_") as workdir:
+            run(SQLiteBackend(os.path.join(workdir, "stress.sqlite3")), args)
+        return
+    if args.mysql_db == os.getenv("DB_NAME", "car_rental"):
+        raise SystemExit(f"refusing to stress the application database {args.mysql_db!r}; "
+                         "give --mysql-db a dedicated schema")
+    run(MySQLBackend(
+        host=os.getenv("DB_HOST", "db"),
+        user=os.getenv("DB_USER", "root"),
+        passwd=os.getenv("DB_PASSWORD", "root"),
+        db=args.mysql_db,
+    ), args)
+
+
+def run(backend, args):
+    pool = ConnectionPool(backend.connect, min_size=1, max_size=args.workers)
+    parked = [], []
+    try:
+        parked = seed(pool, args.cars, args.drivers)
+        index = AvailabilityIndex()
+        with pool.connection() as conn:
+            index.load(conn)
+
+        gate = threading.Event()
+        with ThreadPoolExecutor(max_workers=args.workers) as ex:
+            futures = [
+                ex.submit(book_once, pool, index, gate, not args.stale_index)
+                for _ in range(args.bookings)
+            ]
+            started = time.perf_counter()
+            gate.set()
+            results = [f.result() for f in futures]
+            elapsed = time.perf_counter() - started
+
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT carid, driverId FROM Booking WHERE userId = %s", (PREFIX + "_user",))
+            rows = cur.fetchall()
+    finally:
+        with pool.connection() as conn:
+            cur = conn.cursor()
+            cleanup(cur)
+            restore(cur, *parked)
+            conn.commit()
+        pool.close()
+
+    won = [r for r in results if r is not None]
+    car_dupes = [k for k, n in Counter(r[0] for r in rows).items() if n > 1]
+    drv_dupes = [k for k, n in Counter(r[1] for r in rows).items() if n > 1]
+    expected = min(args.cars, args.drivers, args.bookings)
+
+    print(f"{args.bookings} booking attempts in {elapsed:.3f}s "
+          f"({args.bookings / elapsed:.0f}/s), {len(won)} allocated, "
+          f"{len(rows)} Booking rows, expected {expected}")
+    print("pool:", pool.stats())
+
+    assert not car_dupes, f"cars double-booked: {car_dupes}"
+    assert not drv_dupes, f"drivers double-booked: {drv_dupes}"
+    assert len(won) == len(rows) == expected, "allocation count mismatch"
+    print("OK: no double assignment")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,6 +59,9 @@ CREATE TABLE `Booking` (
   `startDate` varchar(100) DEFAULT NULL,
   `endDate` varchar(100) DEFAULT NULL,
   `Pickup_time` varchar(100) DEFAULT NULL,
+  `start_on` date DEFAULT NULL,
+  `end_on` date DEFAULT NULL,
+  `pickup_at` time DEFAULT NULL,
   `Pickup_location` varchar(100) DEFAULT NULL,
   `Drop_off_location` varchar(100) DEFAULT NULL,
   `driverId` int(50) DEFAULT NULL,
@@ -67,6 +70,11 @@ CREATE TABLE `Booking` (
   PRIMARY KEY (`bookingId`),
   KEY `userId` (`userId`),
   KEY `driverId` (`driverId`),
+  KEY `idx_booking_route` (`cab_route`),
+  KEY `idx_booking_car_dates` (`carid`,`startDate`,`endDate`),
+  KEY `idx_booking_car_days` (`carid`,`start_on`,`end_on`),
+  KEY `idx_booking_driver_days` (`driverId`,`start_on`,`end_on`),
+  KEY `idx_booking_start_on` (`start_on`),
   CONSTRAINT `Booking_ibfk_1` FOREIGN KEY (`userId`) REFERENCES `Cust_User` (`userId`),
   CONSTRAINT `Booking_ibfk_2` FOREIGN KEY (`driverId`) REFERENCES `Driver` (`driverId`)
 ) ENGINE=InnoDB AUTO_INCREMENT=60 DEFAULT CHARSET=latin1;
@@ -95,8 +103,10 @@ CREATE TABLE `Car` (
   `seating_capacity` varchar(100) DEFAULT NULL,
   `Car_type` varchar(100) DEFAULT NULL,
   `price_per_km` varchar(100) DEFAULT NULL,
+  `rate_per_km` decimal(10,2) DEFAULT NULL,
   `status` varchar(100) DEFAULT 'Available',
-  PRIMARY KEY (`Car_id`)
+  PRIMARY KEY (`Car_id`),
+  KEY `idx_car_status_type` (`status`,`Car_type`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -123,6 +133,7 @@ CREATE TABLE `Cust_User` (
   `emailId` varchar(100) DEFAULT NULL,
   `phone` varchar(100) DEFAULT NULL,
   `registration_Date` varchar(100) DEFAULT NULL,
+  `registered_on` date DEFAULT NULL,
   `password` varchar(1000) DEFAULT NULL,
   `reset_Question` varchar(100) DEFAULT NULL,
   `reset_Ans_Type` varchar(100) DEFAULT NULL,
@@ -154,7 +165,8 @@ CREATE TABLE `Driver` (
   `licence_no` varchar(50) DEFAULT NULL,
   `age` int(10) DEFAULT NULL,
   `status` varchar(100) DEFAULT 'Available',
-  PRIMARY KEY (`driverId`)
+  PRIMARY KEY (`driverId`),
+  KEY `idx_driver_status` (`status`)
 ) ENGINE=InnoDB AUTO_INCREMENT=9 DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -175,6 +187,7 @@ DROP TABLE IF EXISTS `Feedback`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!40101 SET character_set_client = utf8 */;
 CREATE TABLE `Feedback` (
+  `id` int(11) NOT NULL AUTO_INCREMENT,
   `userId` varchar(100) DEFAULT NULL,
   `fName` varchar(100) DEFAULT NULL,
   `lName` varchar(100) DEFAULT NULL,
@@ -182,6 +195,7 @@ CREATE TABLE `Feedback` (
   `rating` varchar(100) DEFAULT NULL,
   `comments` varchar(100) DEFAULT NULL,
   `Date` varchar(100) DEFAULT NULL,
+  PRIMARY KEY (`id`),
   KEY `userId` (`userId`),
   CONSTRAINT `Feedback_ibfk_1` FOREIGN KEY (`userId`) REFERENCES `Cust_User` (`userId`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
@@ -204,10 +218,15 @@ DROP TABLE IF EXISTS `Login_History`;
 /*!40101 SET @saved_cs_client     = @@character_set_client */;
 /*!40101 SET character_set_client = utf8 */;
 CREATE TABLE `Login_History` (
+  `id` bigint(20) NOT NULL AUTO_INCREMENT,
   `user` varchar(100) DEFAULT NULL,
   `userId` varchar(100) DEFAULT NULL,
   `Date` varchar(100) DEFAULT NULL,
-  `Time` varchar(100) DEFAULT NULL
+  `Time` varchar(100) DEFAULT NULL,
+  `logged_at` datetime DEFAULT NULL,
+  PRIMARY KEY (`id`),
+  KEY `idx_login_user_at` (`userId`,`logged_at`),
+  KEY `idx_login_user_date` (`userId`,`Date`)
 ) ENGINE=InnoDB DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
 
@@ -233,8 +252,11 @@ CREATE TABLE `Payment` (
   `status` varchar(100) DEFAULT NULL,
   `bookingId` int(50) DEFAULT NULL,
   `total_amount` int(255) DEFAULT NULL,
+  `idempotency_key` varchar(64) DEFAULT NULL,
   PRIMARY KEY (`Payment_id`),
+  UNIQUE KEY `idempotency_key` (`idempotency_key`),
   KEY `bookingId` (`bookingId`),
+  KEY `idx_payment_booking_status` (`bookingId`,`status`),
   CONSTRAINT `Payment_ibfk_1` FOREIGN KEY (`bookingId`) REFERENCES `Booking` (`bookingId`)
 ) ENGINE=InnoDB AUTO_INCREMENT=49 DEFAULT CHARSET=latin1;
 /*!40101 SET character_set_client = @saved_cs_client */;
@@ -247,6 +269,33 @@ LOCK TABLES `Payment` WRITE;
 /*!40000 ALTER TABLE `Payment` DISABLE KEYS */;
 /*!40000 ALTER TABLE `Payment` ENABLE KEYS */;
 UNLOCK TABLES;
+
+--
+-- Table structure for table `Route`
+--
+
+DROP TABLE IF EXISTS `Route`;
+/*!40101 SET @saved_cs_client     = @@character_set_client */;
+/*!40101 SET character_set_client = utf8 */;
+CREATE TABLE `Route` (
+  `route_id` int(11) NOT NULL AUTO_INCREMENT,
+  `name` varchar(500) NOT NULL,
+  `distance_km` int(11) NOT NULL,
+  `active` tinyint(1) NOT NULL DEFAULT '1',
+  PRIMARY KEY (`route_id`),
+  UNIQUE KEY `name` (`name`)
+) ENGINE=InnoDB AUTO_INCREMENT=6 DEFAULT CHARSET=latin1;
+/*!40101 SET character_set_client = @saved_cs_client */;
+
+--
+-- Dumping data for table `Route`
+--
+
+LOCK TABLES `Route` WRITE;
+/*!40000 ALTER TABLE `Route` DISABLE KEYS */;
+INSERT INTO `Route` VALUES (1,'Nashik-Pune',211,1),(2,'Nashik-Mumbai',165,1),(3,'Nashik-Nagpur',680,1),(4,'Nashik-Dhule',144,1),(5,'Nashik-Aurangabad',160,1);
+/*!40000 ALTER TABLE `Route` ENABLE KEYS */;
+UNLOCK TABLES;
 /*!40103 SET TIME_ZONE=@OLD_TIME_ZONE */;
 
 /*!40101 SET SQL_MODE=@OLD_SQL_MODE */;
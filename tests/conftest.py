@@ -0,0 +1,40 @@
+"""Shared test setup: the app runs on a throw-away SQLite database.
+
+The environment is set before anything from app/ is imported, so the
+pool, outbox, caches and audit buffer all point into a temporary
+directory and no render worker (which needs weasyprint's native
+libraries) is started.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+_WORKDIR = tempfile.mkdtemp(prefix="car_rental_tests_")
+os.environ.update(
+    DB_BACKEND="sqlite",
+    DB_PATH=os.path.join(_WORKDIR, "car_rental.sqlite3"),
+    SECRET_KEY="test-secret",
+    SESSION_COOKIE_SECURE="0",
+    MAIL_OUTBOX_PATH=os.path.join(_WORKDIR, "outbox.sqlite3"),
+    PDF_CACHE_DIR=os.path.join(_WORKDIR, "pdf"),
+    PDF_RENDER_WORKERS="0",
+    AUDIT_DEAD_LETTER_PATH=os.path.join(_WORKDIR, "audit_dead.jsonl"),
+)
+
+
+@pytest.fixture(scope="session")
+def workdir():
+    return _WORKDIR
+
+
+@pytest.fixture(scope="session")
+def main():
+    """The Flask application module, imported once per session."""
+    import main as app_module
+    app_module.app.config["TESTING"] = True
+    return app_module
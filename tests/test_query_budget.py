@@ -0,0 +1,65 @@
+import inspect
+import logging
+
+import pytest
+
+from query_tracer import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture(scope="module")
+def client(main):
+    app = main.app
+
+    # routes must be added before the app serves its first request
+    @app.route("/_test/over-budget")
+    @query_budget(queries=1)
+    def over_budget():
+        main._is_paid(1)
+        main._is_paid(2)
+        return "ok"
+
+    @app.route("/_test/n-plus-one")
+    @query_budget(queries=50, repeats=3)
+    def n_plus_one():
+        for booking_id in range(5):
+            main._is_paid(booking_id)
+        return "ok"
+
+    @app.route("/_test/within-budget")
+    @query_budget(queries=1)
+    def within_budget():
+        main._is_paid(1)
+        return "ok"
+
+    return app.test_client()
+
+
+@pytest.fixture
+def strict(main, monkeypatch):
+    monkeypatch.setattr(main.query_tracer, "strict", True)
+
+
+def _is_paid_query_line(main):
+    lines, first = inspect.getsourcelines(main._is_paid)
+    return first + next(i for i, line in enumerate(lines) if "cursor.execute(" in line)
+
+
+def test_view_over_its_budget_raises(client, strict):
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /_test/over-budget: 2 queries \(budget 1\)"):
+        client.get("/_test/over-budget")
+
+
+def test_view_within_its_budget_passes(client, strict):
+    assert client.get("/_test/within-budget").status_code == 200
+
+
+def test_n_plus_one_is_reported_with_its_origin(client, main, caplog):
+    with caplog.at_level(logging.WARNING, logger="car_rental.queries"):
+        assert client.get("/_test/n-plus-one").status_code == 200
+    origin = f"5x from main.py:{_is_paid_query_line(main)} (_is_paid)"
+    assert any(origin in record.getMessage() for record in caplog.records)
+
+
+def test_n_plus_one_fails_in_strict_mode(client, main, strict):
+    with pytest.raises(QueryBudgetExceeded, match=rf"5x from main\.py:{_is_paid_query_line(main)} "):
+        client.get("/_test/n-plus-one")
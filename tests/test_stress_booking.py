@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bench"))
+
+import stress_booking  # noqa: E402
+
+
+@pytest.mark.parametrize("stale_index", [False, True], ids=["fresh-index", "stale-index"])
+def test_no_double_assignment(stale_index):
+    # more vehicles than allocation takes from the index per attempt, so a
+    # stale index has to fall back to the database to hand them all out
+    argv = ["--bookings", "60", "--cars", "24", "--drivers", "20", "--workers", "8"]
+    stress_booking.main(argv + ["--stale-index"] * stale_index)
+
+
+def test_refuses_the_application_database(monkeypatch):
+    monkeypatch.setenv("DB_NAME", "car_rental")
+    with pytest.raises(SystemExit, match="refusing"):
+        stress_booking.main(["--mysql-db", "car_rental"])